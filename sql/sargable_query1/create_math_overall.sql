@@ -0,0 +1,8 @@
+CREATE TEMP VIEW math_overall AS
+SELECT
+  m.ENTITY_CD AS entity_cd,
+  m.YEAR_INT AS year,
+  SUM(CAST(NULLIF(REPLACE(m.NUM_PROF,   ',', ''), '') AS INTEGER)) AS num_prof,
+  SUM(CAST(NULLIF(REPLACE(m.NUM_TESTED, ',', ''), '') AS INTEGER)) AS num_tested
+FROM math_src m
+GROUP BY m.ENTITY_CD, m.YEAR_INT;
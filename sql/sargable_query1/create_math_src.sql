@@ -0,0 +1,20 @@
+-- The rows of baseline_query1 that create_math_overall.sql keeps: the first
+-- :n_limit rows (in rowid order) that are 'All Students' MATH rows. The
+-- rowid bound keeps the sample, the codes make the filter an index lookup.
+CREATE TEMP TABLE math_src AS
+SELECT
+  m.ENTITY_CD,
+  m.YEAR_INT,
+  m.NUM_PROF,
+  m.NUM_TESTED
+FROM reportcard_database_23_24_derived."Annual EM MATH" m
+WHERE m.SUBJECT_CODE = 'MATH'
+  AND m.SUBGROUP_CODE = 'ALL'
+  AND m.rowid <= (
+    SELECT MAX(r) FROM (
+      SELECT rowid AS r
+      FROM reportcard_database_23_24_derived."Annual EM MATH"
+      ORDER BY rowid
+      LIMIT CAST(:n_limit AS INTEGER)
+    )
+  );
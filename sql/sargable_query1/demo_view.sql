@@ -0,0 +1,13 @@
+DROP VIEW IF EXISTS demo;
+CREATE TEMP VIEW demo AS
+SELECT
+  d.ENTITY_CD AS entity_cd,
+  d.YEAR_INT  AS year,  -- indexed with ENTITY_CD, so the join of pairs_year is a lookup
+  CAST(d.PER_ELL   AS REAL) AS per_ell,
+  CAST(d.PER_SWD   AS REAL) AS per_swd,
+  CAST(d.PER_ECDIS AS REAL) AS per_ecdis,
+  CAST(d.PER_BLACK AS REAL) AS per_black,
+  CAST(d.PER_HISP  AS REAL) AS per_hisp,
+  CAST(d.PER_ASIAN AS REAL) AS per_asian,
+  CAST(d.PER_WHITE AS REAL) AS per_white
+FROM enrollment_database_23_24_derived."Demographic Factors" d;
@@ -0,0 +1,4 @@
+DROP VIEW IF EXISTS pairs_year;
+DROP VIEW IF EXISTS math_outcome;
+DROP VIEW IF EXISTS math_overall;
+DROP TABLE IF EXISTS math_src;
\ No newline at end of file
@@ -0,0 +1,51 @@
+WITH math_src AS (
+    SELECT ENTITY_CD, YEAR_INT, NUM_PROF, TOTAL_COUNT
+    FROM reportcard_database_23_24_derived."Annual EM MATH"
+    WHERE YEAR_INT = 2024
+      AND SUBGROUP_CODE = 'ALL'
+      AND SUBGROUP_NAME = 'All Students'  -- exact name of the baseline, checked on the looked-up rows only
+    LIMIT CAST(:n_limit AS INTEGER)
+),
+math_school AS (
+    SELECT
+        ENTITY_CD,
+        YEAR_INT,
+        CASE
+            WHEN SUM(CAST(TOTAL_COUNT AS REAL)) > 0
+            THEN 100.0 * SUM(CAST(NUM_PROF AS REAL))
+                       / SUM(CAST(TOTAL_COUNT AS REAL))
+            ELSE NULL
+        END AS math_prof_rate
+    FROM math_src
+    GROUP BY ENTITY_CD, YEAR_INT
+),
+att_src AS (
+    SELECT ENTITY_CD, YEAR_INT, IS_DISTRICT, ATTENDANCE_RATE
+    FROM student_educator_database_23_24_derived.Attendance
+    WHERE YEAR_INT = 2024
+    LIMIT CAST(:n_limit AS INTEGER)
+)
+SELECT
+    (AVG(attendance_rate * math_prof_rate)
+     - AVG(attendance_rate) * AVG(math_prof_rate))
+    /
+    (SQRT(AVG(attendance_rate * attendance_rate)
+          - AVG(attendance_rate) * AVG(attendance_rate))
+     *
+     SQRT(AVG(math_prof_rate * math_prof_rate)
+          - AVG(math_prof_rate) * AVG(math_prof_rate))
+    ) AS correlation
+FROM (
+    SELECT
+        a.ATTENDANCE_RATE AS attendance_rate,
+        m.math_prof_rate  AS math_prof_rate
+    FROM att_src AS a
+    JOIN math_school AS m
+      ON a.ENTITY_CD = m.ENTITY_CD
+     AND a.YEAR_INT  = m.YEAR_INT
+    WHERE a.IS_DISTRICT = 0
+      AND m.math_prof_rate IS NOT NULL
+      AND m.math_prof_rate > 0
+      AND a.ATTENDANCE_RATE IS NOT NULL
+      AND a.ATTENDANCE_RATE > 0
+);
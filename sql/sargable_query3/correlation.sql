@@ -0,0 +1,55 @@
+WITH math_src AS (
+    SELECT ENTITY_CD, YEAR_INT, NUM_PROF, TOTAL_COUNT
+    FROM reportcard_database_23_24_derived."Annual EM MATH"
+    WHERE YEAR_INT = 2024
+      AND SUBGROUP_CODE = 'ALL'
+      AND SUBGROUP_NAME = 'All Students'  -- exact name of the baseline, checked on the looked-up rows only
+    LIMIT CAST(:n_limit AS INTEGER)
+),
+math_school AS (
+    SELECT
+        ENTITY_CD,
+        YEAR_INT,
+        CASE
+            WHEN SUM(CAST(TOTAL_COUNT AS REAL)) > 0
+            THEN 100.0 * SUM(CAST(NUM_PROF AS REAL))
+                       / SUM(CAST(TOTAL_COUNT AS REAL))
+            ELSE NULL
+        END AS math_prof_rate
+    FROM math_src
+    GROUP BY ENTITY_CD, YEAR_INT
+),
+exp_src AS (
+    SELECT ENTITY_CD, YEAR_INT, IS_DISTRICT, PER_FED_STATE_LOCAL_EXP
+    FROM reportcard_database_23_24_derived."Expenditures per Pupil"
+    WHERE YEAR_INT = 2024
+      AND DATA_REPORTED_EXP = 'Y'
+      AND DATA_REPORTED_ENR = 'Y'
+    LIMIT CAST(:n_limit AS INTEGER)
+),
+pairs AS (
+    SELECT
+        e.PER_FED_STATE_LOCAL_EXP AS per_pupil_expenditure,
+        m.math_prof_rate          AS math_prof_rate
+    FROM exp_src AS e
+    JOIN math_school AS m
+      ON e.ENTITY_CD = m.ENTITY_CD
+     AND e.YEAR_INT  = m.YEAR_INT
+    WHERE e.IS_DISTRICT = 0
+      AND e.PER_FED_STATE_LOCAL_EXP IS NOT NULL
+      AND e.PER_FED_STATE_LOCAL_EXP > 0
+      AND m.math_prof_rate IS NOT NULL
+      AND m.math_prof_rate > 0
+)
+
+SELECT
+    (AVG(per_pupil_expenditure * math_prof_rate)
+     - AVG(per_pupil_expenditure) * AVG(math_prof_rate))
+    /
+    (SQRT(AVG(per_pupil_expenditure * per_pupil_expenditure)
+          - AVG(per_pupil_expenditure) * AVG(per_pupil_expenditure))
+     *
+     SQRT(AVG(math_prof_rate * math_prof_rate)
+          - AVG(math_prof_rate) * AVG(math_prof_rate))
+    ) AS correlation
+FROM pairs;
@@ -1,7 +1,7 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from pathlib import Path
-from typing import Dict, List, Union
+from typing import Any, Dict, List, Optional, Union
 
 import yaml
 
@@ -10,7 +10,43 @@ class ExecutionConfig:
     runs_per_query: int
     timeout_seconds: int
     queries_to_run: List[str]
-    dataset_partitions_per_query: Dict[str, List[int]]
+    # a list of dataset limits, or "auto" for a sweep (see execute.sweep)
+    dataset_partitions_per_query: Dict[str, Union[List[int], str]]
+    parallel_workers: int = 1
+    pin_workers_to_cores: bool = False
+    drain_policy: str = "preview"
+    fetch_arraysize: int = 1000
+    cache_mode: str = "warm"
+    vm_step_granularity: int = 0  # > 0 counts VM steps through a progress handler, inside the timed region
+    on_failure: str = "next_size"
+    result_batch_size: int = 50
+    result_flush_seconds: float = 5.0
+    adaptive_runs: bool = False
+    min_runs: int = 5
+    max_runs: int = 50
+    target_rel_ci: float = 0.05
+    regression_threshold: float = 0.05
+    regression_alpha: float = 0.05
+    auto_partition_start: int = 1000
+    auto_partition_growth: float = 2.0
+    auto_partition_budget_seconds: float = 300.0
+    auto_partition_max: int = 10_000_000
+    warmup_runs: int = 0
+    low_noise: bool = False
+    resource_accounting: bool = True
+    cpu_affinity: List[int] = field(default_factory=list)
+    process_nice: Optional[int] = None
+    attach_strategy: str = "file"
+    mmap_size: int = 1 << 30
+    event_sinks: List[str] = field(default_factory=lambda: ["console"])
+    event_log_path: str = "data/logs/events.jsonl"
+    # name -> PRAGMA settings that differ from the default profile (see execute.pragmas)
+    pragma_profiles: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    pragma_profiles_to_run: List[str] = field(default_factory=lambda: ["default"])
+    load_test_clients: List[int] = field(default_factory=lambda: [1, 2, 4, 8])
+    load_test_duration_seconds: Optional[float] = 30.0
+    load_test_requests: Optional[int] = None
+    load_test_client_mode: str = "thread"
 
 def _to_int_list(values: List[Union[int, str]]) -> List[int]:
     out: List[int] = []
@@ -25,6 +61,41 @@ def _to_int_list(values: List[Union[int, str]]) -> List[int]:
         else:
             raise TypeError(f"Unsupported partition type: {type(v).__name__}")
     return out
+
+# PRAGMA profile keys holding text, every other key is an integer
+_PRAGMA_TEXT_KEYS = ("temp_store", "journal_mode", "synchronous")
+_PRAGMA_INT_KEYS = ("cache_size", "mmap_size", "threads", "page_size", "soft_heap_limit", "hard_heap_limit")
+
+def _to_pragma_profiles(raw: Any) -> Dict[str, Dict[str, Any]]:
+    """Validate the pragma_profiles mapping of profile name -> {pragma: value}."""
+    if not isinstance(raw, dict):
+        raise ValueError("'pragma_profiles' must be a mapping of profile name -> PRAGMA settings.")
+    profiles: Dict[str, Dict[str, Any]] = {}
+    for name, values in raw.items():
+        values = values or {}
+        if not isinstance(values, dict):
+            raise ValueError(f"PRAGMA profile {name!r} must be a mapping of PRAGMA -> value.")
+        profile: Dict[str, Any] = {}
+        for key, value in values.items():
+            if key in _PRAGMA_TEXT_KEYS:
+                profile[key] = str(value).strip().upper()
+            elif key in _PRAGMA_INT_KEYS:
+                profile[key] = None if value is None else int(value)
+            else:
+                raise ValueError(
+                    f"Unknown PRAGMA {key!r} in profile {name!r}, expected one of: "
+                    + ", ".join(_PRAGMA_INT_KEYS + _PRAGMA_TEXT_KEYS)
+                )
+        profiles[str(name)] = profile
+    return profiles
+
+def _to_partitions(values: Union[List[Union[int, str]], str]) -> Union[List[int], str]:
+    """A partition list, or "auto" for an automatic dataset-size sweep."""
+    if isinstance(values, str):
+        if values.strip().lower() != "auto":
+            raise ValueError(f"Partitions must be a list of integers or 'auto', got {values!r}")
+        return "auto"
+    return _to_int_list(values)
     
 @dataclass(frozen=True)
 class AppConfig:
@@ -36,6 +107,8 @@ class AppConfig:
     graphs = data_dir + "/graphs" # output graphs directory
     star = data_dir + "/star" # star schema datasets in sqlite
     star_schema_db = star + "/star_schema.db"
+    columnar_dir = data_dir + "/columnar" # per-column .npy exports for the numpy engine (transform.columnar)
+    logs = data_dir + "/logs" # event logs (event_sinks: jsonl)
 
     @staticmethod
     def load_execution_config() -> ExecutionConfig:
@@ -54,16 +127,121 @@ class AppConfig:
         
         parts_raw = root.get("dataset_partitions_per_query", {}) or {}
         if not isinstance(parts_raw, dict):
-            raise ValueError("'dataset_partitions_per_query' must be a mapping of query->list of integers.")
+            raise ValueError("'dataset_partitions_per_query' must be a mapping of query->list of integers or 'auto'.")
 
-        partitions = {k: _to_int_list(v) for k, v in parts_raw.items()}
+        partitions = {k: _to_partitions(v) for k, v in parts_raw.items()}
 
 
         if runs <= 0:
             raise ValueError("'runs_per_query' must be > 0.")
         if timeout < 0:
             raise ValueError("'timeout_seconds' must be >= 0.")
-        
+
+        workers = int(root.get("parallel_workers", 1))
+        if workers <= 0:
+            raise ValueError("'parallel_workers' must be > 0.")
+        pin_workers = bool(root.get("pin_workers_to_cores", False))
+
+        drain_policy = str(root.get("drain_policy", "preview")).strip().lower()
+        if drain_policy not in ("none", "preview", "full"):
+            raise ValueError("'drain_policy' must be one of: none, preview, full.")
+        fetch_arraysize = int(root.get("fetch_arraysize", 1000))
+        if fetch_arraysize <= 0:
+            raise ValueError("'fetch_arraysize' must be > 0.")
+
+        cache_mode = str(root.get("cache_mode", "warm")).strip().lower()
+        if cache_mode not in ("warm", "cold-connection", "cold-os"):
+            raise ValueError("'cache_mode' must be one of: warm, cold-connection, cold-os.")
+
+        vm_step_granularity = int(root.get("vm_step_granularity", 0))
+        if vm_step_granularity < 0:
+            raise ValueError("'vm_step_granularity' must be >= 0.")
+
+        on_failure = str(root.get("on_failure", "next_size")).strip().lower()
+        if on_failure not in ("next_size", "skip_larger"):
+            raise ValueError("'on_failure' must be one of: next_size, skip_larger.")
+
+        result_batch_size = int(root.get("result_batch_size", 50))
+        if result_batch_size <= 0:
+            raise ValueError("'result_batch_size' must be > 0.")
+        result_flush_seconds = float(root.get("result_flush_seconds", 5.0))
+        if result_flush_seconds < 0:
+            raise ValueError("'result_flush_seconds' must be >= 0.")
+
+        adaptive_runs = bool(root.get("adaptive_runs", False))
+        min_runs = int(root.get("min_runs", 5))
+        max_runs = int(root.get("max_runs", 50))
+        if min_runs < 2 or max_runs < min_runs:
+            raise ValueError("'min_runs' must be >= 2 and 'max_runs' >= 'min_runs'.")
+        target_rel_ci = float(root.get("target_rel_ci", 0.05))
+        if target_rel_ci <= 0:
+            raise ValueError("'target_rel_ci' must be > 0.")
+        regression_threshold = float(root.get("regression_threshold", 0.05))
+        if regression_threshold < 0:
+            raise ValueError("'regression_threshold' must be >= 0.")
+        regression_alpha = float(root.get("regression_alpha", 0.05))
+        if not 0 < regression_alpha < 1:
+            raise ValueError("'regression_alpha' must be between 0 and 1.")
+
+        auto_partition_start = int(root.get("auto_partition_start", 1000))
+        auto_partition_growth = float(root.get("auto_partition_growth", 2.0))
+        auto_partition_budget_seconds = float(root.get("auto_partition_budget_seconds", 300.0))
+        auto_partition_max = int(root.get("auto_partition_max", 10_000_000))
+        if auto_partition_start <= 0 or auto_partition_max < auto_partition_start:
+            raise ValueError("'auto_partition_start' must be > 0 and 'auto_partition_max' >= 'auto_partition_start'.")
+        if auto_partition_growth <= 1.0:
+            raise ValueError("'auto_partition_growth' must be > 1.")
+        if auto_partition_budget_seconds <= 0:
+            raise ValueError("'auto_partition_budget_seconds' must be > 0.")
+
+        warmup_runs = int(root.get("warmup_runs", 0))
+        if warmup_runs < 0:
+            raise ValueError("'warmup_runs' must be >= 0.")
+        low_noise = bool(root.get("low_noise", False))
+        resource_accounting = bool(root.get("resource_accounting", True))
+        cpu_affinity = _to_int_list(root.get("cpu_affinity") or [])
+        nice_raw = root.get("process_nice")
+        process_nice = None if nice_raw is None else int(nice_raw)
+        if process_nice is not None and not -20 <= process_nice <= 19:
+            raise ValueError("'process_nice' must be between -20 and 19.")
+
+        attach_strategy = str(root.get("attach_strategy", "file")).strip().lower()
+        if attach_strategy not in ("file", "immutable", "mmap", "memory"):
+            raise ValueError("'attach_strategy' must be one of: file, immutable, mmap, memory.")
+        mmap_size = int(root.get("mmap_size", 1 << 30))
+        if mmap_size < 0:
+            raise ValueError("'mmap_size' must be >= 0.")
+
+        sinks_raw = root.get("event_sinks", ["console"])
+        event_sinks = [sinks_raw] if isinstance(sinks_raw, str) else list(sinks_raw or [])
+        event_sinks = [str(x).strip().lower() for x in event_sinks]
+        if not event_sinks or any(x not in ("console", "jsonl", "silent") for x in event_sinks):
+            raise ValueError("'event_sinks' must be a list of: console, jsonl, silent.")
+        event_log_path = str(root.get("event_log_path") or f"{AppConfig.logs}/events.jsonl")
+
+        pragma_profiles = _to_pragma_profiles(root.get("pragma_profiles") or {})
+        ptr_raw = root.get("pragma_profiles_to_run") or ["default"]
+        pragma_profiles_to_run = [ptr_raw] if isinstance(ptr_raw, str) else [str(x) for x in ptr_raw]
+        unknown = [x for x in pragma_profiles_to_run if x != "default" and x not in pragma_profiles]
+        if unknown:
+            raise ValueError(f"'pragma_profiles_to_run' names profiles missing from 'pragma_profiles': {unknown}")
+
+        load_test_clients = _to_int_list(root.get("load_test_clients") or [1, 2, 4, 8])
+        if any(x <= 0 for x in load_test_clients):
+            raise ValueError("'load_test_clients' must be a list of positive integers.")
+        duration_raw = root.get("load_test_duration_seconds", 30.0)
+        load_test_duration_seconds = None if duration_raw is None else float(duration_raw)
+        requests_raw = root.get("load_test_requests")
+        load_test_requests = None if requests_raw is None else int(requests_raw)
+        if load_test_duration_seconds is None and load_test_requests is None:
+            raise ValueError("Set 'load_test_duration_seconds', 'load_test_requests' or both.")
+        if (load_test_duration_seconds is not None and load_test_duration_seconds <= 0) or (
+            load_test_requests is not None and load_test_requests <= 0
+        ):
+            raise ValueError("'load_test_duration_seconds' and 'load_test_requests' must be > 0.")
+        load_test_client_mode = str(root.get("load_test_client_mode", "thread")).strip().lower()
+        if load_test_client_mode not in ("thread", "process"):
+            raise ValueError("'load_test_client_mode' must be one of: thread, process.")
 
         qtr_raw = root.get("queries_to_run")
         if not isinstance(qtr_raw, list) or any(not isinstance(x, str) for x in qtr_raw):
@@ -84,6 +262,40 @@ class AppConfig:
             queries_to_run=queries_to_run,
             timeout_seconds=timeout,
             dataset_partitions_per_query=partitions,
+            parallel_workers=workers,
+            pin_workers_to_cores=pin_workers,
+            drain_policy=drain_policy,
+            fetch_arraysize=fetch_arraysize,
+            cache_mode=cache_mode,
+            vm_step_granularity=vm_step_granularity,
+            on_failure=on_failure,
+            result_batch_size=result_batch_size,
+            result_flush_seconds=result_flush_seconds,
+            adaptive_runs=adaptive_runs,
+            min_runs=min_runs,
+            max_runs=max_runs,
+            target_rel_ci=target_rel_ci,
+            regression_threshold=regression_threshold,
+            regression_alpha=regression_alpha,
+            auto_partition_start=auto_partition_start,
+            auto_partition_growth=auto_partition_growth,
+            auto_partition_budget_seconds=auto_partition_budget_seconds,
+            auto_partition_max=auto_partition_max,
+            warmup_runs=warmup_runs,
+            low_noise=low_noise,
+            resource_accounting=resource_accounting,
+            cpu_affinity=cpu_affinity,
+            process_nice=process_nice,
+            attach_strategy=attach_strategy,
+            mmap_size=mmap_size,
+            event_sinks=event_sinks,
+            event_log_path=event_log_path,
+            pragma_profiles=pragma_profiles,
+            pragma_profiles_to_run=pragma_profiles_to_run,
+            load_test_clients=load_test_clients,
+            load_test_duration_seconds=load_test_duration_seconds,
+            load_test_requests=load_test_requests,
+            load_test_client_mode=load_test_client_mode,
         )
     
 def test_load_execution_config():
@@ -121,6 +121,32 @@ STAR_DATASET = DataLink(
     folder_name="star_schema"
 )
 
+# copies of baseline datasets with the indexed columns of load.derived_columns
+# (sargable_query*); materialize_dataset derives them from DERIVED_SOURCES
+REPORT_CARD_23_24_DERIVED = DataLink(
+    url="",
+    path_to_data_from_zip_root="reportcard_database_23_24.derived.db",
+    folder_name="reportcard_database_23_24_derived"
+)
+
+ENROLLMENT_23_24_DERIVED = DataLink(
+    url="",
+    path_to_data_from_zip_root="enrollment_database_23_24.derived.db",
+    folder_name="enrollment_database_23_24_derived"
+)
+
+STUDENT_EDUCATOR_DATABASE_23_24_DERIVED = DataLink(
+    url="",
+    path_to_data_from_zip_root="student_educator_database_23_24.derived.db",
+    folder_name="student_educator_database_23_24_derived"
+)
+
+DERIVED_SOURCES = {
+    REPORT_CARD_23_24_DERIVED: REPORT_CARD_23_24,
+    ENROLLMENT_23_24_DERIVED: ENROLLMENT_23_24,
+    STUDENT_EDUCATOR_DATABASE_23_24_DERIVED: STUDENT_EDUCATOR_DATABASE_23_24,
+}
+
 ALL_DATASETS = [
     STUDENT_EDUCATOR_DATABASE_23_24,
     REPORT_CARD_23_24,
@@ -0,0 +1,200 @@
+"""
+Structured event log.
+
+Execute and reporting code calls emit(kind, message, **fields) instead of
+print. emit only puts the event on a queue, and a background thread hands it
+to the configured sinks, so nothing on the timed path waits for a terminal
+or a file:
+
+  console -> prints the message, like the old print calls did
+  jsonl   -> appends one JSON object per event to event_log_path
+  silent  -> drops every event
+
+Events are also forwarded between processes: parallel workers use a
+ForwardingSink that sends them to the parent, which emits them again.
+"""
+import argparse
+import atexit
+import contextlib
+import json
+import queue
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+EVENT_SINKS = ("console", "jsonl", "silent")
+
+
+@dataclass
+class Event:
+    kind: str  # dotted name, e.g. "run.result" or "cell.summary"
+    message: str  # human readable line(s) the console sink prints
+    level: str = "info"  # info | warn | error
+    fields: Dict[str, Any] = field(default_factory=dict)
+    timestamp: float = field(default_factory=time.time)
+
+
+class ConsoleSink:
+    def handle(self, event: Event) -> None:
+        print(event.message)
+
+    def close(self) -> None:
+        sys.stdout.flush()
+
+
+class JsonlSink:
+    def __init__(self, path: str) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def handle(self, event: Event) -> None:
+        record = {"ts": event.timestamp, "kind": event.kind, "level": event.level, "message": event.message}
+        record.update(event.fields)
+        self._file.write(json.dumps(record, default=str) + "\n")
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class SilentSink:
+    def handle(self, event: Event) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class ForwardingSink:
+    """Puts every event on a (multiprocessing) queue as ("event", Event)."""
+
+    def __init__(self, target_queue) -> None:
+        self._queue = target_queue
+
+    def handle(self, event: Event) -> None:
+        self._queue.put(("event", event))
+
+    def close(self) -> None:
+        pass
+
+
+def make_sinks(names: List[str], event_log_path: Optional[str] = None) -> list:
+    """Sinks for a list of EVENT_SINKS names."""
+    sinks = []
+    for name in names:
+        if name == "console":
+            sinks.append(ConsoleSink())
+        elif name == "jsonl":
+            if not event_log_path:
+                raise ValueError("The jsonl event sink needs an event_log_path.")
+            sinks.append(JsonlSink(event_log_path))
+        elif name == "silent":
+            sinks.append(SilentSink())
+        else:
+            raise ValueError(f"Unknown event sink {name!r}, expected one of {EVENT_SINKS}")
+    return sinks
+
+
+def event_sinks_arg(value: str) -> List[str]:
+    """argparse type of the --events options: a comma-separated list of EVENT_SINKS names."""
+    sinks = [x.strip().lower() for x in value.split(",") if x.strip()]
+    if not sinks or any(x not in EVENT_SINKS for x in sinks):
+        raise argparse.ArgumentTypeError(f"expected a comma-separated list of {', '.join(EVENT_SINKS)}")
+    return sinks
+
+
+class EventLog:
+    """Queue of events drained by one daemon thread into the sinks."""
+
+    def __init__(self) -> None:
+        self._queue: "queue.Queue[Event]" = queue.Queue()
+        self._sinks: list = [ConsoleSink()]
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._running = threading.Event()
+        self._running.set()
+
+    def configure(self, sinks: list) -> None:
+        """Replace the sinks; events already queued go to the old ones first."""
+        self.flush()
+        for sink in self._sinks:
+            sink.close()
+        self._sinks = sinks
+
+    def emit(self, event: Event) -> None:
+        if self._thread is None:
+            self._start()
+        self._queue.put(event)
+
+    def flush(self) -> None:
+        """Block until every event emitted so far reached the sinks."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self) -> None:
+        self.flush()
+        for sink in self._sinks:
+            sink.close()
+
+    @contextlib.contextmanager
+    def paused(self) -> Iterator[None]:
+        """Keep the drain thread from writing anything while the block runs."""
+        self._running.clear()
+        try:
+            yield
+        finally:
+            self._running.set()
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._drain, name="event-log", daemon=True)
+                self._thread.start()
+
+    def _drain(self) -> None:
+        while True:
+            event = self._queue.get()
+            try:
+                self._running.wait()
+                for sink in self._sinks:
+                    try:
+                        sink.handle(event)
+                    except Exception as e:  # a broken sink must not stop the others
+                        print(f"[WARN] event sink {type(sink).__name__} failed: {e!r}", file=sys.stderr)
+            finally:
+                self._queue.task_done()
+
+
+_log = EventLog()
+atexit.register(_log.close)
+
+
+def emit(kind: str, message: str, level: str = "info", **fields) -> None:
+    """Queue an event for the sinks. Never does I/O itself."""
+    _log.emit(Event(kind=kind, message=message, level=level, fields=fields))
+
+
+def emit_event(event: Event) -> None:
+    """Queue an already built Event, e.g. one forwarded from a worker process."""
+    _log.emit(event)
+
+
+def configure_events(sink_names: List[str], event_log_path: Optional[str] = None) -> None:
+    """Route events to the EVENT_SINKS in sink_names (console until configured)."""
+    _log.configure(make_sinks(sink_names, event_log_path))
+
+
+def forward_events(target_queue) -> None:
+    """Send every event of this process to target_queue (used by parallel workers)."""
+    _log.configure([ForwardingSink(target_queue)])
+
+
+def flush_events() -> None:
+    _log.flush()
+
+
+def events_paused():
+    """Context manager that holds event output back, see EventLog.paused."""
+    return _log.paused()
@@ -1,22 +1,38 @@
 # queries.py
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Dict, Iterable
+from typing import List, Dict, Iterable, Optional
 
 from app.datasets import DataLink
 
+ENGINES = ("sqlite", "numpy")
+
+
 @dataclass(frozen=True)
 class QuerySpec:
     name: str
-    sql_folder: Path
+    sql_folder: Optional[Path]  # None for engines that run no SQL
     sql_file_sequence: List[str]
     version: str
     dependant_datasets: List[DataLink] = None
+    # "sqlite" runs the SQL files; "numpy" runs the pipeline of execute.columnar
+    # registered under `name` and has no SQL files
+    engine: str = "sqlite"
 
     def files(self) -> List[Path]:
+        if self.sql_folder is None:
+            return []
         return [self.sql_folder / f for f in self.sql_file_sequence]
 
-from app.datasets import ENROLLMENT_23_24, REPORT_CARD_23_24, STUDENT_EDUCATOR_DATABASE_23_24, STAR_DATASET
+from app.datasets import (
+    ENROLLMENT_23_24,
+    ENROLLMENT_23_24_DERIVED,
+    REPORT_CARD_23_24,
+    REPORT_CARD_23_24_DERIVED,
+    STUDENT_EDUCATOR_DATABASE_23_24,
+    STUDENT_EDUCATOR_DATABASE_23_24_DERIVED,
+    STAR_DATASET,
+)
 
 BASELINE_QUERY_1 = QuerySpec(
     name="baseline_query1",
@@ -126,6 +142,73 @@ STAR_QUERY_3 = QuerySpec(
 )
 
 
+# execute.columnar pipeline reimplementing baseline_query1
+NUMPY_QUERY_1 = QuerySpec(
+    name="numpy_query1",
+    sql_folder=None,
+    sql_file_sequence=[],
+    version="1.0",
+    dependant_datasets=[ENROLLMENT_23_24, REPORT_CARD_23_24],
+    engine="numpy",
+)
+
+# execute.columnar pipeline reimplementing baseline_query2
+NUMPY_QUERY_2 = QuerySpec(
+    name="numpy_query2",
+    sql_folder=None,
+    sql_file_sequence=[],
+    version="1.0",
+    dependant_datasets=[REPORT_CARD_23_24, STUDENT_EDUCATOR_DATABASE_23_24],
+    engine="numpy",
+)
+
+# execute.columnar pipeline reimplementing baseline_query3
+NUMPY_QUERY_3 = QuerySpec(
+    name="numpy_query3",
+    sql_folder=None,
+    sql_file_sequence=[],
+    version="1.0",
+    dependant_datasets=[REPORT_CARD_23_24],
+    engine="numpy",
+)
+
+# baseline_query1/2/3 rewritten against the indexed columns of load.derived_columns, on
+# the *_DERIVED copies of the baseline datasets; same rows and results as the baselines
+SARGABLE_QUERY_1 = QuerySpec(
+    name="sargable_query1",
+    sql_folder=Path("sql/sargable_query1"),
+    sql_file_sequence = [
+        "reset.sql",
+        "demo_view.sql",
+        "create_math_src.sql",
+        "create_math_overall.sql",
+        "create_math_outcome.sql",
+        "create_pairs_year.sql",
+        "correlations.sql",
+    ],
+    version="1.1",
+    dependant_datasets=[ENROLLMENT_23_24_DERIVED, REPORT_CARD_23_24_DERIVED],
+)
+
+SARGABLE_QUERY_2 = QuerySpec(
+    name="sargable_query2",
+    sql_folder=Path("sql/sargable_query2"),
+    sql_file_sequence = [
+        "correlation.sql",
+    ],
+    version="1.1",
+    dependant_datasets=[REPORT_CARD_23_24_DERIVED, STUDENT_EDUCATOR_DATABASE_23_24_DERIVED],
+)
+
+SARGABLE_QUERY_3 = QuerySpec(
+    name="sargable_query3",
+    sql_folder=Path("sql/sargable_query3"),
+    sql_file_sequence = [
+        "correlation.sql",
+    ],
+    version="1.1",
+    dependant_datasets=[REPORT_CARD_23_24_DERIVED],
+)
 
 
 def print_all_queries_at_their_versions() -> None:
@@ -1,106 +1,197 @@
 #!/usr/bin/env python3
 import sys
-import argparse
-import statistics
 import time
+import argparse
+from dataclasses import replace
 from typing import List, Optional, Dict
 from types import ModuleType
 
-import sqlite3
-
-from execute.sql import run_sql, debug_sql, load_sql_sequence
+from execute.sql import ATTACH_STRATEGIES, DRAIN_POLICIES, debug_sql, load_spec_statements
+from execute.cells import CACHE_MODES, ON_FAILURE_POLICIES, RunOptions, run_options_from_config, attach_settings, pragma_settings, BenchmarkConnection, run_cell, cell_failed, summarize_cell, print_cell_summary
+from execute.adaptive import adaptive_policy_from_config
+from execute.parallel import run_queryspecs_parallel
+from execute.plans import record_query_plans
+from execute.cellhash import spec_fingerprint, cell_hash
+from execute.noise import apply_process_settings, launch_settings, process_settings_from_config
+from execute.pragmas import pragma_profiles_from_config, sweep_order
+from execute.sweep import AUTO_PARTITIONS, AutoSweep, AutoSweepPolicy, auto_sweep_policy_from_config, largest_table_rows
 from app.queries import QuerySpec
-from load.convert_to_sqlite import convert_datalink_to_sqlite, get_datalink_sqlite_path
-from ingest.downloader import fetch_accdb_from_datalink
 from app import AppConfig
-from reporting.models import QueryLaunch, ResultRecord, DataReportingModel, create_result_record, create_launch_from_query
+from app.events import EVENT_SINKS, emit, configure_events, event_sinks_arg, flush_events
+from reporting.models import QueryLaunch, ResultRecord, DataReportingModel, create_launch_from_query
 from reporting.setup import get_database_connection
-from reporting.operations import create_query_launch, insert_new_result_record
+from reporting.operations import create_query_launch, update_query_launch, count_ok_runs_by_cell_hash, insert_cell_stats, ResultWriter
 # ---------- Runner API ----------
 
 def run_queryspec(
     spec: QuerySpec,
     runs: int,
     dataset_limits: List[int],
-    timeout_s: Optional[int] = 300,
-    num_lines_to_preview: int = 5,
-) -> DataReportingModel:
+    options: RunOptions = RunOptions(),
+    result_batch_size: int = 50,
+    result_flush_seconds: float = 5.0,
+    incremental: bool = False,
+    auto_sweep: Optional[AutoSweepPolicy] = None,
+) -> Optional[DataReportingModel]:
+    """
+    Time a QuerySpec `runs` times at every dataset limit and store the results
+    under a new QueryLaunch, streamed in batches of result_batch_size records
+    or every result_flush_seconds. options shape every run (see
+    execute.cells.RunOptions); the query plans are captured at the smallest
+    limit (see execute.plans).
+
+    incremental skips the cells whose hash (see execute.cellhash) already has
+    `runs` successful runs stored and only runs the missing runs of the
+    others; returns None when nothing is left to run. With an AutoSweepPolicy
+    dataset_limits is ignored and the limits are generated until the sweep
+    stops (see execute.sweep).
+    """
+    if options.on_failure not in ON_FAILURE_POLICIES:
+        raise ValueError(f"Unknown on_failure policy {options.on_failure!r}, expected one of {ON_FAILURE_POLICIES}")
+    timeout_s = options.timeout_s
+    pragma_profile = options.pragma_profile
+
+    # Read and split the SQL files once; every run reuses the same statements
+    sql_files = load_spec_statements(spec)
+    fingerprint = spec_fingerprint(spec, sql_files, options)
+
     data_reporting_conn = get_database_connection()
-    launch = create_query_launch(data_reporting_conn, create_launch_from_query(spec))
+
+    def stored_runs(limits: List[int]) -> Dict[int, int]:
+        """Successful runs already stored per dataset limit (only looked up when incremental)."""
+        if not incremental:
+            return {limit: 0 for limit in limits}
+        hashes = {limit: cell_hash(fingerprint, limit) for limit in limits}
+        counts = count_ok_runs_by_cell_hash(data_reporting_conn, list(hashes.values()))
+        return {limit: counts.get(h, 0) for limit, h in hashes.items()}
+
+    sweep = None
+    if auto_sweep is not None:
+        sweep = AutoSweep(auto_sweep, timeout_s, largest_table_rows(spec))
+        limits = iter(sweep)
+        plan_limit = auto_sweep.start
+    else:
+        stored = stored_runs(dataset_limits)
+        limits = []
+        for limit in dataset_limits:
+            if stored[limit] >= runs:
+                emit(
+                    "cell.cached",
+                    f"[CACHED] {spec.name} v{spec.version} rows={limit:,}: {stored[limit]} runs already stored",
+                    query=spec.name,
+                    version=spec.version,
+                    dataset_size=limit,
+                    runs=stored[limit],
+                )
+            else:
+                limits.append(limit)
+        if not limits:
+            data_reporting_conn.close()
+            return None
+        plan_limit = min(limits)
+
+    launch = create_query_launch(
+        data_reporting_conn,
+        create_launch_from_query(
+            spec,
+            cache_mode=options.cache_mode,
+            dataset_sizes=None if sweep else limits,
+            settings=launch_settings(
+                options.warmup_runs,
+                options.low_noise,
+                resource_accounting=options.resource_accounting,
+                **attach_settings(options),
+                **pragma_settings(options),
+            ),
+            pragma_profile=pragma_profile.name,
+        ),
+    )
 
     results = []
-    print(f"\n[RUN] {spec.name} v{spec.version}  folder={spec.sql_folder}  runs={runs}  timeout={timeout_s}s")
-
-    conn = sqlite3.connect(":memory:")
-    conn.execute("PRAGMA temp_store=MEMORY;")
-    conn.execute("PRAGMA cache_size=-64000;")
-    conn.execute("PRAGMA journal_mode=OFF;")
-    conn.execute("PRAGMA synchronous=OFF;")
-    conn.row_factory = None
-
-    for dataset in spec.dependant_datasets:
-        dataset_sqlite_path = get_datalink_sqlite_path(dataset)  # Ensure dataset is materialized
-
-        if not dataset_sqlite_path.exists():
-            print(f"Dataset SQLite not found for {dataset.folder_name}, going to download and convert...")
-            fetch_accdb_from_datalink(dataset)
-            dataset_sqlite_path = convert_datalink_to_sqlite(dataset, verbose=True)
-
-        run_sql(
-            conn,
-            f"ATTACH DATABASE '{dataset_sqlite_path.as_posix()}' AS '{dataset.folder_name}';")
-
-    # Load SQL texts and keep filenames in the same order for logging
-    sql_texts = load_sql_sequence(spec.sql_folder, spec.sql_file_sequence)
-    sql_filenames = list(spec.sql_file_sequence)
-
-    latencies = []
-    for limit in dataset_limits:
-        print(f"\n[INFO] Dataset limit: {limit:,}")
-        latencies = []
-        for r in range(1, runs + 1):
-            t0 = time.perf_counter()
-            for i, (fname, sql) in enumerate(zip(sql_filenames, sql_texts), start=1):
-                desc = (
-                    f"{spec.name} rows={limit:,} run {r}/{runs} "
-                    f"part {i}/{len(sql_texts)} [{fname}]"
+    sweep_note = f"  sweep=auto from {auto_sweep.start:,} x{auto_sweep.growth:g}" if sweep else ""
+    emit(
+        "launch.start",
+        f"\n[RUN] {spec.name} v{spec.version}  folder={spec.sql_folder or spec.engine}  runs={runs}  timeout={timeout_s}s  drain={options.drain_policy}  cache={options.cache_mode}  attach={options.attach_strategy}  profile={pragma_profile.name}{sweep_note}",
+        query=spec.name,
+        version=spec.version,
+        launch_ID=launch.launch_ID,
+        runs=runs,
+        timeout_s=timeout_s,
+        drain_policy=options.drain_policy,
+        cache_mode=options.cache_mode,
+        attach_strategy=options.attach_strategy,
+        pragma_profile=pragma_profile.name,
+    )
+
+    bench_conn = BenchmarkConnection()
+    writer = ResultWriter(data_reporting_conn, result_batch_size, result_flush_seconds)
+    record_query_plans(data_reporting_conn, spec, sql_files, launch.launch_ID, plan_limit, timeout_s, pragma_profile)
+
+    ran_limits = []
+    try:
+        failed_limit = None
+        for limit in limits:
+            if options.on_failure == "skip_larger" and failed_limit is not None and limit > failed_limit:
+                emit(
+                    "cell.skipped",
+                    f"[SKIP] {spec.name} rows={limit:,}: rows={failed_limit:,} already failed",
+                    query=spec.name,
+                    dataset_size=limit,
+                    failed_size=failed_limit,
                 )
-                run_sql(
-                    conn,
-                    sql,
-                    desc=desc,
-                    params={"n_limit": int(limit)},
-                    preview=num_lines_to_preview,
-                    timeout_s=timeout_s,
+                continue
+            done_runs = stored_runs([limit])[limit] if sweep else stored.get(limit, 0)
+            if done_runs >= runs:
+                # only reachable in a sweep; fixed lists drop cached cells above
+                emit(
+                    "cell.cached",
+                    f"[CACHED] {spec.name} v{spec.version} rows={limit:,}: {done_runs} runs already stored",
+                    query=spec.name,
+                    version=spec.version,
+                    dataset_size=limit,
+                    runs=done_runs,
                 )
-
-            elapsed = time.perf_counter() - t0
-            #this is the end of a result and should be stored as a result record   
-            rec = create_result_record(
+                continue
+            started = time.perf_counter()
+            records = run_cell(
+                bench_conn,
+                spec,
+                sql_files,
                 launch_ID=launch.launch_ID,
-                dataset_size=limit,
-                run_index=r,
-                elapsed_seconds=elapsed,
+                limit=limit,
+                runs=runs - done_runs,
+                options=options,
+                on_record=writer.add,
+                cell_hash=cell_hash(fingerprint, limit),
+                first_run_index=done_runs + 1,
             )
-            results.append(rec)
-
-            latencies.append(elapsed)
-            print(f"[RESULT] {spec.name} rows={limit:,} run {r}/{runs} time={elapsed:.3f}s")
-            conn.execute("PRAGMA optimize;")
-            conn.execute("PRAGMA shrink_memory;")
-
-    for r in results:
-        insert_new_result_record(data_reporting_conn, r)
-
-    latencies.sort()
-    p50 = statistics.median(latencies)
-    from math import ceil
-    idx = max(0, min(len(latencies) - 1, ceil(0.95 * len(latencies)) - 1))
-    p95 = latencies[idx]
-    print(f"[SUMMARY] {spec.name} rows={limit:,} P50={p50:.3f}s P95={p95:.3f}s over {runs} runs")
+            ran_limits.append(limit)
+            results.extend(records)
+            writer.flush()
+            stats = insert_cell_stats(data_reporting_conn, summarize_cell(launch.launch_ID, limit, records, options))
+            print_cell_summary(spec, limit, records, stats)
+            if cell_failed(records):
+                failed_limit = limit if failed_limit is None else min(failed_limit, limit)
+            if sweep:
+                sweep.observe(limit, records, time.perf_counter() - started)
+        if sweep:
+            emit(
+                "sweep.stop",
+                f"[SWEEP] {spec.name} v{spec.version} stopped after {len(ran_limits)} sizes: {sweep.stop_reason}",
+                query=spec.name,
+                version=spec.version,
+                dataset_sizes=ran_limits,
+                reason=sweep.stop_reason,
+            )
+    finally:
+        # whatever finished is kept, even if the launch is aborted
+        writer.close()
+        bench_conn.close()
+        if sweep:
+            launch.dataset_sizes = ran_limits
+            update_query_launch(data_reporting_conn, launch)
+        data_reporting_conn.close()
 
-    data_reporting_conn.close()
-    # last_result = {"name": spec.name, "version": spec.version, "runs": runs, "p50": p50, "p95": p95}
     return DataReportingModel(query_launch=launch, result_records=results)
 
 
@@ -116,25 +207,223 @@ def get_query_specs_by_name(mod: ModuleType) -> Dict[str, QuerySpec]:
         if isinstance(obj, QuerySpec)
     }
 
-def run_queryspecs() -> Dict[str, DataReportingModel]:
+def run_queryspecs(
+    workers: Optional[int] = None,
+    pin_cores: Optional[bool] = None,
+    cache_mode: Optional[str] = None,
+    vm_step_granularity: Optional[int] = None,
+    on_failure: Optional[str] = None,
+    incremental: bool = False,
+    adaptive: Optional[bool] = None,
+    warmup_runs: Optional[int] = None,
+    low_noise: Optional[bool] = None,
+    event_sinks: Optional[List[str]] = None,
+    attach_strategy: Optional[str] = None,
+    pragma_profiles: Optional[List[str]] = None,
+) -> Dict[str, DataReportingModel]:
+    """
+    Run every query in execution_config.queries_to_run.
+
+    workers / pin_cores / cache_mode / vm_step_granularity / on_failure override
+    the execution_config settings of the same name (pin_cores ->
+    pin_workers_to_cores, workers -> parallel_workers). incremental only runs
+    the cells that do not have runs_per_query successful runs stored yet.
+    adaptive overrides adaptive_runs from execution_config, and warmup_runs /
+    low_noise / attach_strategy the settings of the same name. The cpu_affinity and process_nice
+    settings are applied to this process (and so to its workers) before
+    anything runs. Run output goes to event_sinks (see app.events), the
+    event_sinks setting by default. With more than one worker the (spec, dataset_limit) cells
+    are spread over a process pool, see execute.parallel. Queries whose
+    partitions are `auto` always run serially, because every next size
+    depends on the previous cell (see execute.sweep).
+
+    Every query runs once per PRAGMA profile in pragma_profiles (names from
+    the pragma_profiles setting, pragma_profiles_to_run by default), each
+    under its own launch. With more than one profile the returned results are
+    keyed "<query>@<profile>".
+    """
     exec_config = AppConfig.load_execution_config()
     all_query_specs = get_query_specs_by_name(QUERIES_MODULE)
-    results = {}
+    workers = exec_config.parallel_workers if workers is None else workers
+    pin_cores = exec_config.pin_workers_to_cores if pin_cores is None else pin_cores
+    options = run_options_from_config(
+        exec_config,
+        cache_mode=cache_mode,
+        vm_step_granularity=vm_step_granularity,
+        on_failure=on_failure,
+        warmup_runs=warmup_runs,
+        low_noise=low_noise,
+        attach_strategy=attach_strategy,
+    )
+    if adaptive is not None:
+        options = replace(options, adaptive=adaptive_policy_from_config(exec_config) if adaptive else None)
+    configure_events(exec_config.event_sinks if event_sinks is None else event_sinks, exec_config.event_log_path)
+    apply_process_settings(process_settings_from_config(exec_config))
+    sweep_policy = auto_sweep_policy_from_config(exec_config)
+    partitions = exec_config.dataset_partitions_per_query
+
+    specs = []
     for spec_name in exec_config.queries_to_run:
         if spec_name not in all_query_specs:
             raise ValueError(f"Query name '{spec_name}' not found in app.queries Check your execution_config.yaml.")
-        spec = all_query_specs[spec_name]
-        print(f"\n[INFO] Running {spec.name} with dataset limits: {exec_config.dataset_partitions_per_query[spec.name]}")
-        data = run_queryspec(
-            spec,
-            runs=exec_config.runs_per_query,
-            dataset_limits=exec_config.dataset_partitions_per_query[spec.name],
-            timeout_s=exec_config.timeout_seconds,
-            num_lines_to_preview=5,
-        )
-        results[spec.name] = data
+        specs.append(all_query_specs[spec_name])
+
+    profiles = pragma_profiles_from_config(exec_config)
+    profile_names = exec_config.pragma_profiles_to_run if pragma_profiles is None else pragma_profiles
+    unknown = [name for name in profile_names if name not in profiles]
+    if unknown:
+        raise ValueError(f"Unknown PRAGMA profile(s) {unknown}, expected names from pragma_profiles: {sorted(profiles)}")
+    profiles_to_run = sweep_order([profiles[name] for name in dict.fromkeys(profile_names)])
+
+    results = {}
+    fixed_specs = [spec for spec in specs if partitions[spec.name] != AUTO_PARTITIONS]
+    auto_specs = [spec for spec in specs if spec not in fixed_specs or workers <= 1]
+    for profile in profiles_to_run:
+        # with several profiles the results of a spec are kept per profile
+        key_suffix = f"@{profile.name}" if len(profiles_to_run) > 1 else ""
+        profile_options = replace(options, pragma_profile=profile)
+        if workers > 1 and fixed_specs:
+            parallel_results = run_queryspecs_parallel(
+                [(spec, partitions[spec.name]) for spec in fixed_specs],
+                runs=exec_config.runs_per_query,
+                options=profile_options,
+                workers=workers,
+                pin_cores=pin_cores,
+                result_batch_size=exec_config.result_batch_size,
+                result_flush_seconds=exec_config.result_flush_seconds,
+                incremental=incremental,
+            )
+            results.update({name + key_suffix: data for name, data in parallel_results.items()})
+
+        for spec in auto_specs:
+            auto = partitions[spec.name] == AUTO_PARTITIONS
+            emit(
+                "query.start",
+                f"\n[INFO] Running {spec.name} with dataset limits: {partitions[spec.name]}  profile={profile.name}",
+                query=spec.name,
+                dataset_limits=partitions[spec.name],
+                pragma_profile=profile.name,
+            )
+            data = run_queryspec(
+                spec,
+                runs=exec_config.runs_per_query,
+                dataset_limits=[] if auto else partitions[spec.name],
+                options=profile_options,
+                result_batch_size=exec_config.result_batch_size,
+                result_flush_seconds=exec_config.result_flush_seconds,
+                incremental=incremental,
+                auto_sweep=sweep_policy if auto else None,
+            )
+            if data is not None:
+                results[spec.name + key_suffix] = data
+    flush_events()
     return results
 
+def cli_run_queryspecs() -> None:
+    """
+    CLI entry point for run_all.
+
+    Example:
+        run_all
+        run_all --workers 8 --pin-cores
+        run_all --incremental
+        run_all --warmup 2 --low-noise
+        run_all --events jsonl
+        run_all --attach memory
+        run_all --profiles default,cache_2mb,cache_256mb
+    """
+    parser = argparse.ArgumentParser(
+        description="Run every query listed in execution_config.yaml."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes (defaults to parallel_workers from execution_config).",
+    )
+    parser.add_argument(
+        "--pin-cores",
+        action="store_true",
+        default=None,
+        help="Pin each worker process to its own CPU core.",
+    )
+    parser.add_argument(
+        "--cache-mode",
+        choices=CACHE_MODES,
+        default=None,
+        help="Page cache state for every run (defaults to cache_mode from execution_config).",
+    )
+    parser.add_argument(
+        "--vm-granularity",
+        type=int,
+        default=None,
+        help="Count SQLite VM steps in blocks of this size, 0 disables (defaults to vm_step_granularity from execution_config).",
+    )
+    parser.add_argument(
+        "--on-failure",
+        choices=ON_FAILURE_POLICIES,
+        default=None,
+        help="After a timeout or error: go on with the next size or skip larger sizes (defaults to on_failure from execution_config).",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only run dataset sizes whose cell hash does not have enough successful runs stored yet.",
+    )
+    parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        default=None,
+        help="Run each size until its P50/P95 confidence intervals converge (bounds from execution_config).",
+    )
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        default=None,
+        help="Warmup runs before every dataset size, left out of the stats (defaults to warmup_runs from execution_config).",
+    )
+    parser.add_argument(
+        "--low-noise",
+        action="store_true",
+        default=None,
+        help="Disable gc and hold back event output while runs are timed (defaults to low_noise from execution_config).",
+    )
+    parser.add_argument(
+        "--attach",
+        choices=ATTACH_STRATEGIES,
+        default=None,
+        help="How datasets are attached (defaults to attach_strategy from execution_config).",
+    )
+    parser.add_argument(
+        "--events",
+        type=event_sinks_arg,
+        default=None,
+        help=f"Comma-separated event sinks out of {', '.join(EVENT_SINKS)} (defaults to event_sinks from execution_config).",
+    )
+    parser.add_argument(
+        "--profiles",
+        type=lambda value: [x.strip() for x in value.split(",") if x.strip()],
+        default=None,
+        help="Comma-separated PRAGMA profiles to run every query with (defaults to pragma_profiles_to_run from execution_config).",
+    )
+
+    args = parser.parse_args()
+    run_queryspecs(
+        workers=args.workers,
+        pin_cores=args.pin_cores,
+        cache_mode=args.cache_mode,
+        vm_step_granularity=args.vm_granularity,
+        on_failure=args.on_failure,
+        incremental=args.incremental,
+        adaptive=args.adaptive,
+        warmup_runs=args.warmup,
+        low_noise=args.low_noise,
+        event_sinks=args.events,
+        attach_strategy=args.attach,
+        pragma_profiles=args.profiles,
+    )
+    flush_events()
+
 ## run single cli method
 
 def cli_run_queryspec() -> None:
@@ -144,6 +433,8 @@ def cli_run_queryspec() -> None:
     Example:
         run-queryspec baseline_query2 2.0
         run-queryspec baseline_query2 2.0 --runs 5 --dataset-limits 10000,50000
+        run-queryspec baseline_query2 2.0 --dataset-limits auto
+        run-queryspec baseline_query2 2.0 --profile cache_2mb
     """
     parser = argparse.ArgumentParser(
         description="Run a single QuerySpec by name and version."
@@ -167,7 +458,7 @@ def cli_run_queryspec() -> None:
         type=str,
         default=None,
         help=(
-            "Comma-separated dataset sizes, e.g. '10000,50000'. "
+            "Comma-separated dataset sizes, e.g. '10000,50000', or 'auto' for a sweep. "
             "Defaults to dataset_partitions_per_query[query_name] from execution_config."
         ),
     )
@@ -183,6 +474,76 @@ def cli_run_queryspec() -> None:
         default=5,
         help="Number of rows to preview per SQL file (default: 5).",
     )
+    parser.add_argument(
+        "--drain",
+        choices=DRAIN_POLICIES,
+        default=None,
+        help="How much of each result set to fetch (defaults to drain_policy from execution_config).",
+    )
+    parser.add_argument(
+        "--arraysize",
+        type=int,
+        default=None,
+        help="fetchmany batch size for --drain full (defaults to fetch_arraysize from execution_config).",
+    )
+    parser.add_argument(
+        "--cache-mode",
+        choices=CACHE_MODES,
+        default=None,
+        help="Page cache state for every run (defaults to cache_mode from execution_config).",
+    )
+    parser.add_argument(
+        "--vm-granularity",
+        type=int,
+        default=None,
+        help="Count SQLite VM steps in blocks of this size, 0 disables (defaults to vm_step_granularity from execution_config).",
+    )
+    parser.add_argument(
+        "--on-failure",
+        choices=ON_FAILURE_POLICIES,
+        default=None,
+        help="After a timeout or error: go on with the next size or skip larger sizes (defaults to on_failure from execution_config).",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only run dataset sizes whose cell hash does not have enough successful runs stored yet.",
+    )
+    parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        default=None,
+        help="Run each size until its P50/P95 confidence intervals converge (bounds from execution_config).",
+    )
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        default=None,
+        help="Warmup runs before every dataset size, left out of the stats (defaults to warmup_runs from execution_config).",
+    )
+    parser.add_argument(
+        "--low-noise",
+        action="store_true",
+        default=None,
+        help="Disable gc and hold back event output while runs are timed (defaults to low_noise from execution_config).",
+    )
+    parser.add_argument(
+        "--attach",
+        choices=ATTACH_STRATEGIES,
+        default=None,
+        help="How datasets are attached (defaults to attach_strategy from execution_config).",
+    )
+    parser.add_argument(
+        "--events",
+        type=event_sinks_arg,
+        default=None,
+        help=f"Comma-separated event sinks out of {', '.join(EVENT_SINKS)} (defaults to event_sinks from execution_config).",
+    )
+    parser.add_argument(
+        "--profile",
+        default="default",
+        help="PRAGMA profile from pragma_profiles in execution_config (default: default).",
+    )
 
     args = parser.parse_args()
 
@@ -221,7 +582,9 @@ def cli_run_queryspec() -> None:
         )
 
     # Resolve dataset limits
-    if args.dataset_limits:
+    if args.dataset_limits and args.dataset_limits.strip().lower() == AUTO_PARTITIONS:
+        dataset_limits = AUTO_PARTITIONS
+    elif args.dataset_limits:
         dataset_limits = [int(x) for x in args.dataset_limits.split(",") if x.strip()]
     else:
         dataset_limits = exec_config.dataset_partitions_per_query.get(
@@ -230,20 +593,49 @@ def cli_run_queryspec() -> None:
 
     # Resolve runs and timeout
     runs = args.runs if args.runs is not None else exec_config.runs_per_query
-    timeout_s = args.timeout if args.timeout is not None else exec_config.timeout_seconds
+    profiles = pragma_profiles_from_config(exec_config)
+    if args.profile not in profiles:
+        parser.error(f"Unknown PRAGMA profile '{args.profile}'. Available profiles: {', '.join(sorted(profiles))}")
+    options = run_options_from_config(
+        exec_config,
+        timeout_s=args.timeout,
+        num_lines_to_preview=args.preview,
+        drain_policy=args.drain,
+        fetch_arraysize=args.arraysize,
+        cache_mode=args.cache_mode,
+        vm_step_granularity=args.vm_granularity,
+        on_failure=args.on_failure,
+        adaptive=adaptive_policy_from_config(exec_config) if args.adaptive else None,
+        warmup_runs=args.warmup,
+        low_noise=args.low_noise,
+        attach_strategy=args.attach,
+        pragma_profile=profiles[args.profile],
+    )
+    configure_events(args.events or exec_config.event_sinks, exec_config.event_log_path)
+    apply_process_settings(process_settings_from_config(exec_config))
 
     # Run the query spec
-    print(
+    emit(
+        "query.start",
         f"[INFO] Running {spec.name} v{spec.version} "
-        f"with dataset limits {dataset_limits} for {runs} runs"
+        f"with dataset limits {dataset_limits} for {runs} runs",
+        query=spec.name,
+        version=spec.version,
+        dataset_limits=dataset_limits,
+        runs=runs,
     )
+    auto = dataset_limits == AUTO_PARTITIONS
     _ = run_queryspec(
         spec,
         runs=runs,
-        dataset_limits=dataset_limits,
-        timeout_s=timeout_s,
-        num_lines_to_preview=args.preview,
+        dataset_limits=[] if auto else dataset_limits,
+        options=options,
+        result_batch_size=exec_config.result_batch_size,
+        result_flush_seconds=exec_config.result_flush_seconds,
+        incremental=args.incremental,
+        auto_sweep=auto_sweep_policy_from_config(exec_config) if auto else None,
     )
 
-    print(f"[DONE] {spec.name} v{spec.version} completed.")
+    emit("query.done", f"[DONE] {spec.name} v{spec.version} completed.", query=spec.name, version=spec.version)
+    flush_events()
     sys.exit(0)
\ No newline at end of file
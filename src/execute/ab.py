@@ -0,0 +1,333 @@
+"""
+Interleaved A/B runs of several query versions.
+
+Separate launches of two versions run minutes or hours apart, so thermal
+throttling, other tenants and page-cache state end up in the comparison.
+run_ab runs the arms (two or more QuerySpecs) together instead: at every
+dataset limit, every round runs each arm once in a random order, so drift
+hits all arms alike. Run i of every arm belongs to round i, which makes the
+runs of two arms pairs (see reporting.query_specific_graphs.table_maker).
+
+Every arm has its own BenchmarkConnection, opened with the same RunOptions,
+so one arm's page cache never evicts another's. Arms are stored as ordinary
+benchmark launches tagged with one comparison_ID; the first arm is the
+baseline. The seed of the run order is stored with the Comparison.
+"""
+import argparse
+import random
+import statistics
+import sys
+from dataclasses import replace
+from typing import Dict, List, Optional
+
+from execute.sql import dataset_path, load_spec_statements
+from execute.cells import (
+    CACHE_MODES,
+    BenchmarkConnection,
+    RunOptions,
+    attach_settings,
+    cell_failed,
+    pragma_settings,
+    print_cell_summary,
+    run_cell,
+    run_options_from_config,
+    summarize_cell,
+)
+from execute.cellhash import cell_hash, spec_fingerprint
+from execute.noise import apply_process_settings, launch_settings, process_settings_from_config
+from execute.plans import record_query_plans
+from execute.columnar import prepare_columnar_store
+from execute.pragmas import pragma_profiles_from_config
+from app.queries import QuerySpec
+import app.queries as QUERIES_MODULE
+from app import AppConfig
+from app.events import emit, configure_events, event_sinks_arg, flush_events
+from reporting.models import DataReportingModel, ResultRecord, create_comparison, create_launch_from_query
+from reporting.setup import get_database_connection
+from reporting.operations import ResultWriter, create_query_launch, insert_cell_stats, insert_comparison
+
+
+def arm_label(spec: QuerySpec) -> str:
+    return f"{spec.name} v{spec.version}"
+
+
+def paired_ratio(base: List[ResultRecord], arm: List[ResultRecord]) -> Optional[float]:
+    """Median over the rounds both arms finished of arm time / baseline time."""
+    base_by_round = {r.run_index: r.elapsed_seconds for r in base if r.status == "ok"}
+    ratios = [
+        r.elapsed_seconds / base_by_round[r.run_index]
+        for r in arm
+        if r.status == "ok" and base_by_round.get(r.run_index)
+    ]
+    return statistics.median(ratios) if ratios else None
+
+
+def run_ab(
+    specs: List[QuerySpec],
+    runs: int,
+    dataset_limits: List[int],
+    options: RunOptions = RunOptions(),
+    label: Optional[str] = None,
+    seed: Optional[int] = None,
+    result_batch_size: int = 50,
+    result_flush_seconds: float = 5.0,
+) -> Dict[str, DataReportingModel]:
+    """
+    Run the arms in `specs` interleaved, `runs` rounds per dataset limit, and
+    store them as one Comparison. Returns {arm label: DataReportingModel}.
+
+    options apply to every arm alike. Warmup runs of all arms go before the
+    first round of a dataset limit. The run count is fixed: options.adaptive
+    is ignored, since adaptive arms would stop at different rounds. An arm
+    whose run times out or fails sits out the remaining rounds of that limit,
+    and with on_failure skip_larger every larger limit too.
+    """
+    if len(specs) < 2:
+        raise ValueError("An A/B comparison needs at least two QuerySpecs.")
+    labels = [arm_label(spec) for spec in specs]
+    if len(set(labels)) != len(labels):
+        raise ValueError(f"Every arm must be a different query version, got {labels}")
+    if not dataset_limits:
+        raise ValueError("An A/B comparison needs at least one dataset limit.")
+    seed = random.SystemRandom().randrange(2**31) if seed is None else seed
+    rng = random.Random(seed)
+    label = label or " vs ".join(labels)
+    limits = sorted(dataset_limits)
+    options = replace(options, adaptive=None)
+    timed_options = replace(options, warmup_runs=0)
+
+    sql_files = [load_spec_statements(spec) for spec in specs]
+    fingerprints = [spec_fingerprint(spec, files, options) for spec, files in zip(specs, sql_files)]
+    # Download / convert (and rebuild for a profile page_size) before anything is timed.
+    for spec in specs:
+        for dataset in spec.dependant_datasets or []:
+            dataset_path(dataset, options.pragma_profile.page_size)
+        if spec.engine == "numpy":
+            prepare_columnar_store(spec)
+
+    data_reporting_conn = get_database_connection()
+    comparison = insert_comparison(
+        data_reporting_conn,
+        create_comparison(
+            label,
+            seed,
+            settings={
+                "arms": labels,
+                "runs": runs,
+                "dataset_sizes": limits,
+                "cache_mode": options.cache_mode,
+                "pragma_profile": options.pragma_profile.name,
+            },
+        ),
+    )
+    launches = [
+        create_query_launch(
+            data_reporting_conn,
+            create_launch_from_query(
+                spec,
+                cache_mode=options.cache_mode,
+                dataset_sizes=limits,
+                settings=launch_settings(
+                    options.warmup_runs,
+                    options.low_noise,
+                    resource_accounting=options.resource_accounting,
+                    **attach_settings(options),
+                    **pragma_settings(options),
+                    comparison_arm=i,
+                ),
+                pragma_profile=options.pragma_profile.name,
+                comparison_ID=comparison.comparison_ID,
+            ),
+        )
+        for i, spec in enumerate(specs)
+    ]
+    emit(
+        "ab.start",
+        f"\n[A/B] comparison {comparison.comparison_ID} '{label}': {', '.join(labels)}  rounds={runs}  "
+        f"limits={limits}  cache={options.cache_mode}  profile={options.pragma_profile.name}  seed={seed}",
+        comparison_ID=comparison.comparison_ID,
+        arms=labels,
+        launch_IDs=[launch.launch_ID for launch in launches],
+        runs=runs,
+        dataset_limits=limits,
+        seed=seed,
+    )
+
+    bench_conns = [BenchmarkConnection() for _ in specs]
+    writer = ResultWriter(data_reporting_conn, result_batch_size, result_flush_seconds)
+    for spec, files, launch in zip(specs, sql_files, launches):
+        record_query_plans(
+            data_reporting_conn, spec, files, launch.launch_ID, limits[0], options.timeout_s, options.pragma_profile
+        )
+
+    results: List[List[ResultRecord]] = [[] for _ in specs]
+    failed_limit: List[Optional[int]] = [None] * len(specs)
+    arms = range(len(specs))
+    try:
+        for limit in limits:
+            active = [
+                a for a in arms
+                if not (options.on_failure == "skip_larger" and failed_limit[a] is not None and limit > failed_limit[a])
+            ]
+            for a in set(arms) - set(active):
+                emit(
+                    "cell.skipped",
+                    f"[SKIP] {labels[a]} rows={limit:,}: rows={failed_limit[a]:,} already failed",
+                    query=specs[a].name,
+                    dataset_size=limit,
+                    failed_size=failed_limit[a],
+                )
+            cell_records: Dict[int, List[ResultRecord]] = {a: [] for a in active}
+
+            def run_arm(a: int, arm_options: RunOptions, arm_runs: int, first_run_index: int) -> None:
+                records = run_cell(
+                    bench_conns[a],
+                    specs[a],
+                    sql_files[a],
+                    launch_ID=launches[a].launch_ID,
+                    limit=limit,
+                    runs=arm_runs,
+                    options=arm_options,
+                    on_record=writer.add,
+                    cell_hash=cell_hash(fingerprints[a], limit),
+                    first_run_index=first_run_index,
+                    total_runs=runs,
+                )
+                cell_records[a].extend(records)
+
+            if options.warmup_runs:
+                for a in rng.sample(active, len(active)):
+                    run_arm(a, options, 0, 1)
+            for round_index in range(1, runs + 1):
+                order = rng.sample(active, len(active))
+                for a in order:
+                    run_arm(a, timed_options, 1, round_index)
+                # an arm that failed this round would fail the same way in the next ones
+                active = sorted(a for a in order if not cell_failed(cell_records[a]))
+
+            writer.flush()
+            for a, records in cell_records.items():
+                results[a].extend(records)
+                stats = insert_cell_stats(
+                    data_reporting_conn, summarize_cell(launches[a].launch_ID, limit, records, options)
+                )
+                print_cell_summary(specs[a], limit, records, stats)
+                if cell_failed(records):
+                    failed_limit[a] = limit if failed_limit[a] is None else min(failed_limit[a], limit)
+            if 0 in cell_records:
+                for a in cell_records:
+                    if a == 0:
+                        continue
+                    ratio = paired_ratio(cell_records[0], cell_records[a])
+                    if ratio is None:
+                        continue
+                    emit(
+                        "ab.summary",
+                        f"[A/B] rows={limit:,} {labels[a]} / {labels[0]}: paired P50 ratio {ratio:.3f}",
+                        comparison_ID=comparison.comparison_ID,
+                        dataset_size=limit,
+                        arm=labels[a],
+                        baseline=labels[0],
+                        paired_ratio=ratio,
+                    )
+    finally:
+        # whatever finished is kept, even if the comparison is aborted
+        writer.close()
+        for bench_conn in bench_conns:
+            bench_conn.close()
+        data_reporting_conn.close()
+
+    return {
+        labels[a]: DataReportingModel(query_launch=launches[a], result_records=results[a])
+        for a in arms
+    }
+
+
+def cli_run_ab() -> None:
+    """
+    CLI entry point for ab.
+
+    Example:
+        ab baseline_query2 2.2 baseline_query3 1.0
+        ab baseline_query1 1.1 star_query1 2.0 --runs 20 --dataset-limits 10000,500000 --seed 7
+    """
+    parser = argparse.ArgumentParser(
+        description="Run two or more query versions interleaved in random order and store them as one comparison."
+    )
+    parser.add_argument(
+        "arms",
+        nargs="+",
+        metavar="NAME VERSION",
+        help="Query name and version of every arm; the first pair is the baseline",
+    )
+    parser.add_argument("--runs", type=int, default=None, help="Rounds per dataset limit (defaults to runs_per_query).")
+    parser.add_argument(
+        "--dataset-limits",
+        type=str,
+        default=None,
+        help="Comma-separated dataset limits (defaults to the baseline's dataset_partitions_per_query).",
+    )
+    parser.add_argument("--label", default=None, help="Name of the comparison (default: the arms joined by 'vs').")
+    parser.add_argument("--seed", type=int, default=None, help="Seed of the run order (default: random, stored).")
+    parser.add_argument(
+        "--cache-mode",
+        choices=CACHE_MODES,
+        default=None,
+        help="Cache state before each run (defaults to cache_mode from execution_config).",
+    )
+    parser.add_argument(
+        "--profile",
+        default="default",
+        help="PRAGMA profile from pragma_profiles in execution_config (default: default).",
+    )
+    parser.add_argument(
+        "--events",
+        type=event_sinks_arg,
+        default=None,
+        help="Comma-separated event sinks (defaults to event_sinks from execution_config).",
+    )
+
+    args = parser.parse_args()
+    exec_config = AppConfig.load_execution_config()
+
+    if len(args.arms) < 4 or len(args.arms) % 2:
+        parser.error("give at least two NAME VERSION pairs")
+    specs = []
+    for name, version in zip(args.arms[::2], args.arms[1::2]):
+        spec = next(
+            (
+                obj for obj in vars(QUERIES_MODULE).values()
+                if isinstance(obj, QuerySpec) and obj.name == name and str(obj.version) == str(version)
+            ),
+            None,
+        )
+        if spec is None:
+            parser.error(f"No QuerySpec found for name='{name}' with version='{version}'.")
+        specs.append(spec)
+
+    if args.dataset_limits:
+        dataset_limits = [int(x) for x in args.dataset_limits.split(",") if x.strip()]
+    else:
+        dataset_limits = exec_config.dataset_partitions_per_query.get(specs[0].name)
+        if not isinstance(dataset_limits, list) or not dataset_limits:
+            parser.error(f"No fixed dataset partitions listed for {specs[0].name}, pass --dataset-limits.")
+    profiles = pragma_profiles_from_config(exec_config)
+    if args.profile not in profiles:
+        parser.error(f"Unknown PRAGMA profile '{args.profile}'. Available profiles: {', '.join(sorted(profiles))}")
+
+    configure_events(args.events or exec_config.event_sinks, exec_config.event_log_path)
+    apply_process_settings(process_settings_from_config(exec_config))
+    run_ab(
+        specs,
+        runs=args.runs if args.runs is not None else exec_config.runs_per_query,
+        dataset_limits=dataset_limits,
+        options=run_options_from_config(
+            exec_config, cache_mode=args.cache_mode, pragma_profile=profiles[args.profile]
+        ),
+        label=args.label,
+        seed=args.seed,
+        result_batch_size=exec_config.result_batch_size,
+        result_flush_seconds=exec_config.result_flush_seconds,
+    )
+    flush_events()
+    sys.exit(0)
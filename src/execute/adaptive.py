@@ -0,0 +1,137 @@
+"""
+Adaptive run counts.
+
+Instead of a fixed runs_per_query, a cell keeps running until the bootstrap
+confidence intervals of its P50 and P95 are narrower than a relative width,
+within [min_runs, max_runs]. Runs that look like outliers (far from the
+median, or overlapping a long garbage collection) are stored with status
+'outlier' and run again.
+"""
+import gc
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class AdaptivePolicy:
+    min_runs: int = 5
+    max_runs: int = 50
+    # stop once (ci_high - ci_low) / estimate is at most this for P50 and P95
+    target_rel_ci: float = 0.05
+    confidence: float = 0.95
+    bootstrap_samples: int = 1000
+    # a run is an outlier above median + mad_threshold * 1.4826 * MAD ...
+    mad_threshold: float = 5.0
+    # ... or when garbage collection took more than this share of it
+    gc_pause_fraction: float = 0.05
+
+
+def adaptive_policy_from_config(exec_config) -> AdaptivePolicy:
+    """AdaptivePolicy from the adaptive_* / min_runs / max_runs settings of an ExecutionConfig."""
+    return AdaptivePolicy(
+        min_runs=exec_config.min_runs,
+        max_runs=exec_config.max_runs,
+        target_rel_ci=exec_config.target_rel_ci,
+    )
+
+
+# P50 is the median, P95 the nearest-rank percentile used by the plots
+QUANTILES = {"p50": (0.50, "linear"), "p95": (0.95, "inverted_cdf")}
+
+
+def percentile(values: List[float], name: str) -> float:
+    q, method = QUANTILES[name]
+    return float(np.quantile(np.asarray(values, dtype=float), q, method=method))
+
+
+def bootstrap_ci(
+    values: List[float],
+    name: str,
+    confidence: float = 0.95,
+    samples: int = 1000,
+    rng: Optional[np.random.Generator] = None,
+) -> Tuple[float, float]:
+    """Percentile-bootstrap confidence interval of P50 or P95 (see QUANTILES)."""
+    q, method = QUANTILES[name]
+    rng = rng or np.random.default_rng(0)
+    data = np.asarray(values, dtype=float)
+    resamples = data[rng.integers(0, len(data), size=(samples, len(data)))]
+    estimates = np.quantile(resamples, q, axis=1, method=method)
+    alpha = (1.0 - confidence) / 2.0
+    low, high = np.quantile(estimates, [alpha, 1.0 - alpha])
+    return float(low), float(high)
+
+
+@dataclass
+class CellEstimate:
+    runs: int
+    p50: float
+    p50_ci: Tuple[float, float]
+    p95: float
+    p95_ci: Tuple[float, float]
+
+    def rel_width(self, name: str) -> float:
+        point = getattr(self, name)
+        low, high = getattr(self, f"{name}_ci")
+        return (high - low) / point if point > 0 else float("inf")
+
+
+def estimate_cell(latencies: List[float], policy: AdaptivePolicy) -> Optional[CellEstimate]:
+    """P50/P95 with bootstrap CIs, or None without any latencies."""
+    if not latencies:
+        return None
+    return CellEstimate(
+        runs=len(latencies),
+        p50=percentile(latencies, "p50"),
+        p50_ci=bootstrap_ci(latencies, "p50", policy.confidence, policy.bootstrap_samples),
+        p95=percentile(latencies, "p95"),
+        p95_ci=bootstrap_ci(latencies, "p95", policy.confidence, policy.bootstrap_samples),
+    )
+
+
+def has_converged(estimate: Optional[CellEstimate], policy: AdaptivePolicy) -> bool:
+    if estimate is None or estimate.runs < policy.min_runs:
+        return False
+    return all(estimate.rel_width(name) <= policy.target_rel_ci for name in QUANTILES)
+
+
+def is_mad_outlier(value: float, latencies: List[float], policy: AdaptivePolicy) -> bool:
+    """True when value is far slower than the runs so far (median + k * scaled MAD)."""
+    if len(latencies) < policy.min_runs:
+        return False
+    data = np.asarray(latencies, dtype=float)
+    median = float(np.median(data))
+    mad = 1.4826 * float(np.median(np.abs(data - median)))
+    if mad == 0.0:
+        return False
+    return value > median + policy.mad_threshold * mad
+
+
+class GcPauseMonitor:
+    """
+    Adds up the time spent in garbage collection while it is installed
+    (gc.callbacks), so runs that overlap a long collection can be discarded.
+    """
+
+    def __init__(self) -> None:
+        self.seconds = 0.0
+        self._started: Optional[float] = None
+
+    def _callback(self, phase: str, info: Dict) -> None:
+        if phase == "start":
+            self._started = time.perf_counter()
+        elif self._started is not None:
+            self.seconds += time.perf_counter() - self._started
+            self._started = None
+
+    def __enter__(self) -> "GcPauseMonitor":
+        self.seconds = 0.0
+        gc.callbacks.append(self._callback)
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        gc.callbacks.remove(self._callback)
+        return False
@@ -0,0 +1,64 @@
+"""
+Content hashes of benchmark cells.
+
+A cell is one (QuerySpec, dataset limit) pair. Its hash covers everything that
+changes what a run measures: the SQL file contents (the pipeline code and
+columnar store format for numpy specs), the attached dataset files
+(name, size and mtime), the PRAGMA profile of the benchmark connection, every
+run option that shapes a run (VM-step counting included) and the dataset limit. Unlike QuerySpec.version it
+changes by itself whenever one of those does, so `run_all --incremental` can
+skip cells that already have enough runs stored.
+"""
+import hashlib
+import inspect
+from typing import Dict, List
+
+import execute.columnar as columnar
+from execute.sql import SqlFile, materialize_dataset
+from execute.cells import RunOptions
+from app.queries import QuerySpec
+from transform.columnar import COLUMNAR_FORMAT
+
+
+def spec_fingerprint(spec: QuerySpec, sql_files: List[SqlFile], options: RunOptions) -> str:
+    """sha256 over everything of a spec that is the same for all dataset limits."""
+    h = hashlib.sha256()
+    for sql_file in sql_files:
+        h.update(f"file:{sql_file.name}\n".encode())
+        for stmt in sql_file.statements:
+            h.update(stmt.encode("utf-8"))
+            h.update(b"\0")
+    if spec.engine == "numpy":
+        # the stages share the helpers of execute.columnar, so the whole module is hashed
+        h.update(f"pipeline:{spec.name}:{','.join(columnar.pipeline_for(spec).tables)}:{COLUMNAR_FORMAT}\n".encode())
+        h.update(inspect.getsource(columnar).encode("utf-8"))
+    for dataset in spec.dependant_datasets or []:
+        st = materialize_dataset(dataset).stat()
+        h.update(f"dataset:{dataset.folder_name}:{st.st_size}:{st.st_mtime_ns}\n".encode())
+    profile = options.pragma_profile
+    for pragma in profile.connection_pragmas():
+        h.update(f"pragma:{pragma}\n".encode())
+    for pragma in profile.schema_pragmas("dataset"):
+        h.update(f"schema-pragma:{pragma}\n".encode())
+    h.update(f"page_size:{profile.page_size}\n".encode())
+    h.update(
+        f"options:{options.drain_policy}:{options.fetch_arraysize}:{options.cache_mode}"
+        f":{options.vm_step_granularity}\n".encode()
+    )
+    h.update(
+        f"measurement:{options.warmup_runs}:{options.low_noise}:{options.resource_accounting}\n".encode()
+    )
+    h.update(f"attach:{options.attach_strategy}:{options.mmap_size}\n".encode())
+    h.update(f"engine:{spec.engine}\n".encode())
+    return h.hexdigest()
+
+
+def cell_hash(fingerprint: str, dataset_limit: int) -> str:
+    """Hash of one benchmark cell, from its spec_fingerprint and dataset limit."""
+    return hashlib.sha256(f"{fingerprint}:{int(dataset_limit)}".encode()).hexdigest()
+
+
+def cell_hashes(spec: QuerySpec, sql_files: List[SqlFile], options: RunOptions, limits: List[int]) -> Dict[int, str]:
+    """{dataset_limit: cell hash} for every limit of a spec."""
+    fingerprint = spec_fingerprint(spec, sql_files, options)
+    return {limit: cell_hash(fingerprint, limit) for limit in limits}
@@ -0,0 +1,432 @@
+import statistics
+import time
+from dataclasses import asdict, dataclass, replace
+from math import ceil
+from typing import Callable, Dict, List, Optional
+
+import sqlite3
+
+from execute.sql import (
+    SqlFile,
+    StatementTracer,
+    Watchdog,
+    run_statements,
+    open_benchmark_connection,
+    attach_datasets,
+    dataset_path,
+    evict_from_os_cache,
+)
+from execute.pragmas import DEFAULT_PRAGMA_PROFILE, PragmaProfile
+from execute.columnar import ColumnarError, PipelineTimeout, pipeline_for, prepare_columnar_store, run_pipeline
+from transform.columnar import ColumnStore
+from app.queries import QuerySpec
+from app.events import emit
+from execute.adaptive import AdaptivePolicy, GcPauseMonitor, adaptive_policy_from_config, estimate_cell, has_converged, is_mad_outlier
+from execute.noise import timed_region
+from execute.resources import ResourceMonitor
+from reporting.models import CellStats, ResultRecord, create_cell_stats, create_result_record, create_step_result
+
+
+# warm            -> one connection for the whole launch (page cache stays hot)
+# cold-connection -> reconnect and re-attach before every run
+# cold-os         -> cold-connection plus evicting the dataset files from the OS page cache
+CACHE_MODES = ("warm", "cold-connection", "cold-os")
+
+# What the runner does after a run of a dataset size times out or fails:
+# next_size   -> go on with the next dataset size
+# skip_larger -> skip every dataset size larger than the one that failed
+ON_FAILURE_POLICIES = ("next_size", "skip_larger")
+
+
+@dataclass(frozen=True)
+class RunOptions:
+    """Per-run settings shared by every cell of a launch."""
+    timeout_s: Optional[int] = 300
+    num_lines_to_preview: int = 5
+    drain_policy: str = "preview"
+    fetch_arraysize: int = 1000
+    cache_mode: str = "warm"
+    vm_step_granularity: int = 0
+    on_failure: str = "next_size"
+    adaptive: Optional[AdaptivePolicy] = None  # None -> exactly `runs` runs per cell
+    warmup_runs: int = 0  # uncounted runs before every cell, stored with status 'warmup'
+    low_noise: bool = False  # gc off and event output held back while a run is timed (see execute.noise)
+    attach_strategy: str = "file"  # one of execute.sql.ATTACH_STRATEGIES
+    mmap_size: int = 1 << 30  # bytes, for attach_strategy "mmap"
+    pragma_profile: PragmaProfile = DEFAULT_PRAGMA_PROFILE  # SQLite settings of the connection (see execute.pragmas)
+    resource_accounting: bool = True  # CPU time, faults, I/O bytes and peak RSS per run (see execute.resources)
+
+
+def run_options_from_config(exec_config, **overrides) -> RunOptions:
+    """
+    RunOptions from the settings of an ExecutionConfig. Keyword arguments that
+    are not None replace the RunOptions field of the same name.
+    """
+    options = RunOptions(
+        timeout_s=exec_config.timeout_seconds,
+        drain_policy=exec_config.drain_policy,
+        fetch_arraysize=exec_config.fetch_arraysize,
+        cache_mode=exec_config.cache_mode,
+        vm_step_granularity=exec_config.vm_step_granularity,
+        on_failure=exec_config.on_failure,
+        adaptive=adaptive_policy_from_config(exec_config) if exec_config.adaptive_runs else None,
+        warmup_runs=exec_config.warmup_runs,
+        low_noise=exec_config.low_noise,
+        attach_strategy=exec_config.attach_strategy,
+        mmap_size=exec_config.mmap_size,
+        resource_accounting=exec_config.resource_accounting,
+    )
+    return replace(options, **{k: v for k, v in overrides.items() if v is not None})
+
+
+def attach_settings(options: RunOptions) -> Dict:
+    """attach_strategy (and mmap_size where it applies) for QueryLaunch.settings."""
+    settings: Dict = {"attach_strategy": options.attach_strategy}
+    if options.attach_strategy == "mmap":
+        settings["mmap_size"] = options.mmap_size
+    return settings
+
+
+def pragma_settings(options: RunOptions) -> Dict:
+    """Every setting of the PRAGMA profile, for QueryLaunch.settings (the name has its own column)."""
+    return {"pragmas": options.pragma_profile.values()}
+
+
+class BenchmarkConnection:
+    """
+    Owns the connection the timed runs execute on and prepares it before each
+    run according to the cache mode. Nothing done here is inside a timed region.
+    Specs with engine "numpy" get a ColumnStore instead (for_columnar_run).
+    """
+
+    def __init__(self) -> None:
+        self.conn: Optional[sqlite3.Connection] = None
+        self.profile: PragmaProfile = DEFAULT_PRAGMA_PROFILE  # profile self.conn was opened with
+        self.store: Optional[ColumnStore] = None
+        self._prepared: set = set()  # numpy specs whose columnar tables are known to be current
+        self._warned = False
+
+    def for_run(
+        self,
+        spec: QuerySpec,
+        cache_mode: str = "warm",
+        attach_strategy: str = "file",
+        mmap_size: int = 1 << 30,
+        profile: PragmaProfile = DEFAULT_PRAGMA_PROFILE,
+    ) -> sqlite3.Connection:
+        if cache_mode not in CACHE_MODES:
+            raise ValueError(f"Unknown cache mode {cache_mode!r}, expected one of {CACHE_MODES}")
+
+        if self.conn is not None and (cache_mode != "warm" or profile != self.profile):
+            self.conn.close()
+            self.conn = None
+
+        if cache_mode == "cold-os":
+            # Other processes reading the same files (parallel workers) lose their cached pages too.
+            for dataset in spec.dependant_datasets or []:
+                if not evict_from_os_cache(dataset_path(dataset, profile.page_size)) and not self._warned:
+                    emit("warn", "[WARN] posix_fadvise is not available; cold-os behaves like cold-connection.", level="warn")
+                    self._warned = True
+
+        if self.conn is None:
+            self.conn = open_benchmark_connection(profile)
+            self.profile = profile
+        attach_datasets(self.conn, spec.dependant_datasets, attach_strategy, mmap_size, profile)
+        return self.conn
+
+    def for_columnar_run(self, spec: QuerySpec, cache_mode: str = "warm") -> ColumnStore:
+        """The columnar store a numpy spec runs on: kept open when warm, re-opened otherwise."""
+        if cache_mode not in CACHE_MODES:
+            raise ValueError(f"Unknown cache mode {cache_mode!r}, expected one of {CACHE_MODES}")
+        if spec.name not in self._prepared:
+            prepare_columnar_store(spec)
+            self._prepared.add(spec.name)
+        if self.store is None or cache_mode != "warm":
+            self.store = ColumnStore()
+        if cache_mode == "cold-os":
+            for path in self.store.files(pipeline_for(spec).tables):
+                if not evict_from_os_cache(path) and not self._warned:
+                    emit("warn", "[WARN] posix_fadvise is not available; cold-os behaves like cold-connection.", level="warn")
+                    self._warned = True
+        return self.store
+
+    def close(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+        self.store = None
+
+
+def run_cell(
+    bench_conn: BenchmarkConnection,
+    spec: QuerySpec,
+    sql_files: List[SqlFile],
+    launch_ID: str,
+    limit: int,
+    runs: int,
+    options: RunOptions = RunOptions(),
+    on_record: Optional[Callable[[ResultRecord], None]] = None,
+    cell_hash: Optional[str] = None,
+    first_run_index: int = 1,
+    total_runs: Optional[int] = None,
+) -> List[ResultRecord]:
+    """
+    Time `runs` executions of a QuerySpec at one dataset limit. The connection
+    is (re)prepared by bench_conn before every run, see CACHE_MODES. Each
+    finished run is handed to on_record as soon as it exists, so callers can
+    stream it somewhere else.
+
+    A Watchdog interrupts a run after options.timeout_s. A run that times out
+    or hits an SQLite error is recorded with that status and no elapsed time,
+    and the remaining runs of this dataset size are skipped.
+
+    Records carry cell_hash (see execute.cellhash). first_run_index lets an
+    incremental run number its runs after the ones already stored.
+    total_runs is the N of "run i/N" in the output when the runs of a cell
+    are spread over several calls (see execute.ab).
+
+    Specs with engine "numpy" run their execute.columnar pipeline instead of
+    the SQL files, one step per pipeline stage. Their timeout is checked
+    between stages, and they have no VM steps.
+
+    With options.adaptive set, `runs` is ignored: runs continue until the
+    P50/P95 bootstrap CIs are narrow enough (see execute.adaptive), within
+    the policy's min/max runs. Outlier runs are stored with status
+    'outlier' and do not count.
+
+    options.warmup_runs runs go first. They are stored with status 'warmup'
+    and run indexes up to 0, and never count towards the statistics.
+    """
+    adaptive = options.adaptive
+    max_attempts = runs if adaptive is None else adaptive.max_runs
+    last_run = first_run_index + max_attempts - 1
+    warmups = max(0, options.warmup_runs)
+
+    records = []
+    latencies: List[float] = []
+    tracer = StatementTracer()
+    monitor = ResourceMonitor() if options.resource_accounting else None
+    emit("cell.start", f"\n[INFO] Dataset limit: {limit:,}", query=spec.name, version=spec.version, dataset_size=limit)
+    columnar = spec.engine == "numpy"
+    for r in list(range(1 - warmups, 1)) + list(range(first_run_index, last_run + 1)):
+        warmup = r <= 0
+        run_label = f"warmup {r + warmups}/{warmups}" if warmup else f"run {r}/{total_runs or last_run}"
+        if columnar:
+            store = bench_conn.for_columnar_run(spec, options.cache_mode)
+            conn = None
+        else:
+            conn = bench_conn.for_run(
+                spec, options.cache_mode, options.attach_strategy, options.mmap_size, options.pragma_profile
+            )
+            tracer.attach(conn)
+        steps = []
+        status = "ok"
+        watchdog = Watchdog(conn, None if columnar else options.timeout_s)
+        resources = None
+        with GcPauseMonitor() as gc_pause, timed_region(options.low_noise):
+            if monitor is not None:
+                monitor.start()
+            t0 = time.perf_counter()
+            try:
+                if columnar:
+                    stages = run_pipeline(
+                        store,
+                        spec,
+                        limit,
+                        desc=f"{spec.name} rows={limit:,} {run_label} [numpy]",
+                        preview=options.num_lines_to_preview,
+                        timeout_s=options.timeout_s,
+                    )
+                    steps.extend(
+                        create_step_result(
+                            sql_file=st.name,
+                            statement_index=st.index,
+                            elapsed_seconds=st.elapsed_seconds,
+                            rows=st.rows,
+                        )
+                        for st in stages
+                    )
+                with watchdog:
+                    for i, sql_file in enumerate([] if columnar else sql_files, start=1):
+                        desc = (
+                            f"{spec.name} rows={limit:,} {run_label} "
+                            f"part {i}/{len(sql_files)} [{sql_file.name}]"
+                        )
+                        stats = run_statements(
+                            conn,
+                            sql_file.statements,
+                            desc=desc,
+                            params={"n_limit": int(limit)},
+                            preview=options.num_lines_to_preview,
+                            drain=options.drain_policy,
+                            arraysize=options.fetch_arraysize,
+                            tracer=tracer,
+                            vm_step_granularity=options.vm_step_granularity,
+                        )
+                        steps.extend(
+                            create_step_result(
+                                sql_file=sql_file.name,
+                                statement_index=st.index,
+                                elapsed_seconds=st.elapsed_seconds,
+                                rows=st.rows,
+                                approx_bytes=st.approx_bytes if options.drain_policy == "full" else None,
+                                vm_steps=st.vm_steps,
+                            )
+                            for st in stats
+                        )
+                elapsed = time.perf_counter() - t0
+            except (sqlite3.Error, ColumnarError) as e:
+                status = "timeout" if watchdog.fired or isinstance(e, PipelineTimeout) else "error"
+                elapsed = None
+                if conn is not None:
+                    conn.rollback()
+            finally:
+                if monitor is not None:
+                    resources = monitor.stop()
+                if conn is not None:
+                    tracer.detach(conn)
+
+        if status == "ok" and warmup:
+            status = "warmup"
+        elif status == "ok" and adaptive is not None and (
+            gc_pause.seconds > adaptive.gc_pause_fraction * elapsed
+            or is_mad_outlier(elapsed, latencies, adaptive)
+        ):
+            status = "outlier"
+
+        #this is the end of a result and should be stored as a result record
+        rec = create_result_record(
+            launch_ID=launch_ID,
+            dataset_size=limit,
+            run_index=r,
+            elapsed_seconds=elapsed,
+            steps=steps,
+            vm_steps=(
+                sum(st.vm_steps for st in steps)
+                if options.vm_step_granularity > 0 and elapsed is not None and not columnar else None
+            ),
+            status=status,
+            cell_hash=cell_hash,
+            resources=resources,
+        )
+        records.append(rec)
+        if on_record is not None:
+            on_record(rec)
+
+        if status in ("timeout", "error"):
+            # the remaining runs of this size would fail the same way
+            emit(
+                "run.failed",
+                f"[{status.upper()}] {spec.name} rows={limit:,} {run_label}, skipping the remaining runs of this size",
+                level="error",
+                query=spec.name,
+                dataset_size=limit,
+                run_index=r,
+                status=status,
+            )
+            break
+
+        vm = f" vm_steps={rec.vm_steps:,}" if rec.vm_steps is not None else ""
+        if resources is not None:
+            vm += (
+                f" cpu={resources.user_cpu_seconds + resources.sys_cpu_seconds:.3f}s"
+                f" major_faults={resources.major_faults}"
+            )
+        emit(
+            "run.result",
+            f"[{'WARMUP' if warmup else 'RESULT'}] {spec.name} rows={limit:,} {run_label} time={elapsed:.3f}s{vm}"
+            + (f" outlier (gc {gc_pause.seconds * 1000:.1f}ms), running again" if status == "outlier" else ""),
+            query=spec.name,
+            version=spec.version,
+            dataset_size=limit,
+            run_index=r,
+            status=status,
+            elapsed_seconds=elapsed,
+            vm_steps=rec.vm_steps,
+            gc_pause_seconds=gc_pause.seconds,
+            resources=asdict(resources) if resources is not None else None,
+        )
+        if conn is not None:
+            conn.execute("PRAGMA optimize;")
+            conn.execute("PRAGMA shrink_memory;")
+
+        if status == "ok":
+            latencies.append(elapsed)
+        if adaptive is not None and has_converged(estimate_cell(latencies, adaptive), adaptive):
+            emit(
+                "cell.converged",
+                f"[CONVERGED] {spec.name} rows={limit:,} after {len(latencies)} runs",
+                query=spec.name,
+                dataset_size=limit,
+                runs=len(latencies),
+            )
+            break
+
+    return records
+
+
+def summarize_cell(
+    launch_ID: str,
+    limit: int,
+    records: List[ResultRecord],
+    options: RunOptions = RunOptions(),
+) -> CellStats:
+    """P50/P95 of a cell's successful runs with their bootstrap CIs, for QueryCellStats."""
+    policy = options.adaptive or AdaptivePolicy()
+    estimate = estimate_cell([r.elapsed_seconds for r in records if r.status == "ok"], policy)
+    return create_cell_stats(
+        launch_ID=launch_ID,
+        dataset_size=limit,
+        runs=estimate.runs if estimate else 0,
+        outliers=sum(1 for r in records if r.status == "outlier"),
+        p50=estimate.p50 if estimate else None,
+        p50_ci=estimate.p50_ci if estimate else None,
+        p95=estimate.p95 if estimate else None,
+        p95_ci=estimate.p95_ci if estimate else None,
+        converged=has_converged(estimate, policy) if options.adaptive is not None else None,
+    )
+
+
+def cell_failed(records: List[ResultRecord]) -> bool:
+    """True when a run of the cell timed out or failed."""
+    return any(r.status in ("timeout", "error") for r in records)
+
+
+def print_cell_summary(spec: QuerySpec, limit: int, records: List[ResultRecord], stats: Optional[CellStats] = None) -> None:
+    """Report P50/P95 for the runs of one (spec, dataset limit) cell, with their CIs when stats are given."""
+    latencies = sorted(r.elapsed_seconds for r in records if r.status == "ok")
+    failed = sum(1 for r in records if r.status in ("timeout", "error"))
+    if failed:
+        emit(
+            "cell.summary",
+            f"[SUMMARY] {spec.name} rows={limit:,} {failed} run(s) timed out or failed",
+            level="warn",
+            query=spec.name,
+            dataset_size=limit,
+            failed=failed,
+        )
+    if not latencies:
+        return
+    p50 = statistics.median(latencies)
+    idx = max(0, min(len(latencies) - 1, ceil(0.95 * len(latencies)) - 1))
+    p95 = latencies[idx]
+    lines = [f"[SUMMARY] {spec.name} rows={limit:,} P50={p50:.3f}s P95={p95:.3f}s over {len(latencies)} runs"]
+    if stats is not None and stats.p50 is not None:
+        lines.append(
+            f"[SUMMARY] {spec.name} rows={limit:,} "
+            f"P50 CI=[{stats.p50_ci_low:.3f}, {stats.p50_ci_high:.3f}]s "
+            f"P95 CI=[{stats.p95_ci_low:.3f}, {stats.p95_ci_high:.3f}]s outliers={stats.outliers}"
+        )
+    emit(
+        "cell.summary",
+        "\n".join(lines),
+        query=spec.name,
+        version=spec.version,
+        dataset_size=limit,
+        runs=len(latencies),
+        p50=p50,
+        p95=p95,
+        p50_ci=(stats.p50_ci_low, stats.p50_ci_high) if stats is not None else None,
+        p95_ci=(stats.p95_ci_low, stats.p95_ci_high) if stats is not None else None,
+        outliers=stats.outliers if stats is not None else None,
+    )
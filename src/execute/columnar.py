@@ -0,0 +1,379 @@
+"""
+Vectorized NumPy engine for the three benchmark questions (docs/queries.md).
+
+A QuerySpec with engine="numpy" is not run through SQLite: run_cell hands it
+to run_pipeline, which runs the pipeline registered for the spec's name over
+the memory-mapped columnar store (transform.columnar). Each pipeline mirrors
+the baseline query of the same number (the spec runs no SQL), with the same dataset
+limit semantics (the first n source rows that pass the filter, in rowid
+order) and the same NULL handling, so the results can be checked against the
+SQL versions and the timings compared at the same dataset limits:
+
+  filters   -> boolean masks over column slices, scanned in chunks until the
+               limit is reached (a LIMIT stops early in SQLite too); text
+               predicates are evaluated once per dictionary value and mapped
+               onto the codes
+  group-bys -> np.bincount over the store-wide entity codes
+  joins     -> sort-merge on the codes (argsort + searchsorted)
+
+Every stage of a pipeline is stored as a step of the run (StepResult with the
+stage as sql_file), so step_plot shows where the time goes. The engine
+cannot be interrupted like SQLite; the timeout is checked between stages.
+"""
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.events import emit
+from app.queries import QuerySpec
+from execute.sql import materialize_dataset
+from transform.columnar import ColumnStore, ensure_columnar_tables
+
+# rows per chunk when scanning for the first n matches
+SCAN_CHUNK_ROWS = 1 << 16
+
+
+class ColumnarError(Exception):
+    """A numpy pipeline could not run; recorded like an SQLite error."""
+
+
+class PipelineTimeout(ColumnarError):
+    pass
+
+
+Stage = Callable[[ColumnStore, int, Dict], int]
+
+
+@dataclass(frozen=True)
+class Pipeline:
+    tables: Tuple[str, ...]  # transform.columnar tables read
+    stages: Tuple[Tuple[str, Stage], ...]  # (name, stage); a stage returns the rows it produced
+
+
+@dataclass
+class StageStats:
+    index: int
+    name: str
+    elapsed_seconds: float
+    rows: int
+
+
+# ---------- building blocks ----------
+
+def dictionary_mask(store: ColumnStore, table: str, column: str, predicate: Callable[[str], bool]) -> np.ndarray:
+    """
+    Lookup table of a predicate over a text column: index it with the codes.
+    The extra last entry is False, so NULL (-1) never matches, as in SQL.
+    """
+    values = store.dictionary(table, column)
+    mask = np.zeros(len(values) + 1, dtype=bool)
+    mask[:-1] = [bool(predicate(str(v))) for v in values]
+    return mask
+
+
+def first_matches(rows: int, limit: int, mask: Callable[[int, int], np.ndarray]) -> np.ndarray:
+    """Indexes of the first `limit` rows where mask(start, stop) holds, scanning in chunks."""
+    found: List[np.ndarray] = []
+    remaining = limit
+    for start in range(0, rows, SCAN_CHUNK_ROWS):
+        if remaining <= 0:
+            break
+        hits = np.flatnonzero(mask(start, min(rows, start + SCAN_CHUNK_ROWS)))[:remaining] + start
+        found.append(hits)
+        remaining -= len(hits)
+    return np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+
+
+def group_sum(groups: np.ndarray, values: np.ndarray, size: int) -> np.ndarray:
+    """SUM(values) GROUP BY groups (codes < size): NULLs (NaN) skipped, NaN where a group has no value."""
+    valid = ~np.isnan(values)
+    sums = np.bincount(groups[valid], weights=values[valid], minlength=size)
+    counts = np.bincount(groups[valid], minlength=size)
+    sums[counts == 0] = np.nan
+    return sums
+
+
+def merge_join(left: np.ndarray, right: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Inner equi-join of two key arrays, as (left index, right index) pairs:
+    right is sorted once, every left key finds its run of equal right keys
+    with searchsorted. Duplicate keys on either side multiply like in SQL.
+    """
+    order = np.argsort(right, kind="stable")
+    sorted_right = right[order]
+    lo = np.searchsorted(sorted_right, left, side="left")
+    hi = np.searchsorted(sorted_right, left, side="right")
+    counts = hi - lo
+    left_idx = np.repeat(np.arange(len(left)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return left_idx, order[np.repeat(lo, counts) + offsets]
+
+
+def _finite_or_none(value: float) -> Optional[float]:
+    return float(value) if np.isfinite(value) else None
+
+
+def pearson_of_averages(x: np.ndarray, y: np.ndarray) -> Optional[float]:
+    """The correlation of the SQL versions: (AVG(xy) - AVG(x)AVG(y)) / (SQRT(var x) * SQRT(var y)); NULL -> None."""
+    if len(x) == 0:
+        return None
+    mx, my = x.mean(), y.mean()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return _finite_or_none(
+            ((x * y).mean() - mx * my) / (np.sqrt((x * x).mean() - mx * mx) * np.sqrt((y * y).mean() - my * my))
+        )
+
+
+def _not_sd(name: str) -> bool:
+    """ENTITY_NAME NOT LIKE '% SD' (LIKE is case-insensitive for ASCII)."""
+    return not name.upper().endswith(" SD")
+
+
+# ---------- shared stages ----------
+
+def _math_school_2024(store: ColumnStore, limit: int, ctx: Dict) -> int:
+    """math_src + math_school of baseline_query2 / 3: proficiency rate per entity in 2024."""
+    year = store.number("math", "year")
+    subgroup = store.codes("math", "subgroup_name")
+    all_students = dictionary_mask(store, "math", "subgroup_name", lambda v: v == "All Students")
+    idx = first_matches(len(year), limit, lambda s, e: (year[s:e] == 2024) & all_students[subgroup[s:e]])
+
+    entities = len(store.key_dictionary())
+    entity = store.codes("math", "entity_cd")[idx]
+    keep = entity >= 0
+    entity = entity[keep]
+    prof = group_sum(entity, store.number("math", "num_prof")[idx][keep], entities)
+    tested = group_sum(entity, store.number("math", "total_count")[idx][keep], entities)
+    groups = np.flatnonzero(np.bincount(entity, minlength=entities))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rate = np.where(tested > 0, 100.0 * prof / tested, np.nan)
+    ctx["math_groups"] = groups
+    ctx["math_rate"] = rate[groups]
+    return len(groups)
+
+
+def _join_math_school(store: ColumnStore, table: str, idx: np.ndarray, ctx: Dict) -> Tuple[np.ndarray, np.ndarray]:
+    """Rows of table (by index) joined to math_school on the entity, with the rate of each."""
+    left, right = merge_join(store.codes(table, "entity_cd")[idx], ctx["math_groups"])
+    return idx[left], ctx["math_rate"][right]
+
+
+def _correlation(store: ColumnStore, limit: int, ctx: Dict) -> int:
+    ctx["result"] = [(pearson_of_averages(ctx["x"], ctx["y"]),)]
+    return 1
+
+
+# ---------- numpy_query2: attendance vs math proficiency (baseline_query2 correlation.sql) ----------
+
+def _attendance_src(store: ColumnStore, limit: int, ctx: Dict) -> int:
+    year = store.number("attendance", "year")
+    ctx["src"] = first_matches(len(year), limit, lambda s, e: year[s:e] == 2024)
+    return len(ctx["src"])
+
+
+def _attendance_pairs(store: ColumnStore, limit: int, ctx: Dict) -> int:
+    rows, rate = _join_math_school(store, "attendance", ctx["src"], ctx)
+    not_sd = dictionary_mask(store, "attendance", "entity_name", _not_sd)
+    attendance = store.number("attendance", "attendance_rate")[rows]
+    # comparisons with NaN are False, which covers the IS NOT NULL checks
+    keep = not_sd[store.codes("attendance", "entity_name")[rows]] & (rate > 0) & (attendance > 0)
+    ctx["x"], ctx["y"] = attendance[keep], rate[keep]
+    return int(keep.sum())
+
+
+# ---------- numpy_query3: expenditure vs math proficiency (baseline_query3 correlation.sql) ----------
+
+def _expenditure_src(store: ColumnStore, limit: int, ctx: Dict) -> int:
+    year = store.number("expenditure", "year")
+    exp = store.codes("expenditure", "data_reported_exp")
+    enr = store.codes("expenditure", "data_reported_enr")
+    exp_y = dictionary_mask(store, "expenditure", "data_reported_exp", lambda v: v == "Y")
+    enr_y = dictionary_mask(store, "expenditure", "data_reported_enr", lambda v: v == "Y")
+    ctx["src"] = first_matches(
+        len(year), limit, lambda s, e: (year[s:e] == 2024) & exp_y[exp[s:e]] & enr_y[enr[s:e]]
+    )
+    return len(ctx["src"])
+
+
+def _expenditure_pairs(store: ColumnStore, limit: int, ctx: Dict) -> int:
+    rows, rate = _join_math_school(store, "expenditure", ctx["src"], ctx)
+    not_sd = dictionary_mask(store, "expenditure", "entity_name", _not_sd)
+    per_pupil = store.number("expenditure", "per_pupil")[rows]
+    keep = not_sd[store.codes("expenditure", "entity_name")[rows]] & (per_pupil > 0) & (rate > 0)
+    ctx["x"], ctx["y"] = per_pupil[keep], rate[keep]
+    return int(keep.sum())
+
+
+# ---------- numpy_query1: subgroup composition vs math proficiency (baseline_query1) ----------
+
+DEMOGRAPHIC_COLUMNS = ("per_ell", "per_swd", "per_ecdis", "per_black", "per_hisp", "per_asian", "per_white")
+
+
+def _math_src(store: ColumnStore, limit: int, ctx: Dict) -> int:
+    ctx["src"] = np.arange(min(limit, store.rows("math")))
+    return len(ctx["src"])
+
+
+def _math_outcome(store: ColumnStore, limit: int, ctx: Dict) -> int:
+    """math_overall + math_outcome: proficiency share per (entity, year) of the all-students math rows."""
+    idx = ctx["src"]
+    all_students = dictionary_mask(
+        store, "math", "subgroup_name", lambda v: v.strip(" ").upper().startswith("ALL STUDENTS")
+    )
+    math = dictionary_mask(store, "math", "assessment_name", lambda v: "MATH" in v.upper())
+    keep = all_students[store.codes("math", "subgroup_name")[idx]] & math[store.codes("math", "assessment_name")[idx]]
+    idx = idx[keep]
+    entity = store.codes("math", "entity_cd")[idx]
+    year = np.trunc(store.number("math", "year")[idx])  # CAST(YEAR AS INTEGER)
+    keep = ~np.isnan(year)  # a NULL year is never the MAX(year)
+    idx, entity, year = idx[keep], entity[keep], year[keep]
+    ctx["max_year"] = None
+    if len(idx) == 0:
+        ctx["outcome_entity"], ctx["outcome_rate"] = np.empty(0, dtype=np.int32), np.empty(0)
+        return 0
+
+    years, year_code = np.unique(year, return_inverse=True)
+    # the NULL entity group counts for MAX(year) but never joins
+    keep = entity >= 0
+    idx, entity, year_code = idx[keep], entity[keep], year_code[keep]
+    size = len(store.key_dictionary()) * len(years)
+    group = entity.astype(np.int64) * len(years) + year_code
+    prof = group_sum(group, store.number("math", "num_prof_int")[idx], size)
+    tested = group_sum(group, store.number("math", "num_tested_int")[idx], size)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rate = np.where(tested > 0, prof / tested, np.nan)
+    groups = np.flatnonzero(np.bincount(group, minlength=size))
+
+    # pairs_year keeps only the latest year of math_outcome
+    latest = len(years) - 1
+    chosen = groups[(groups % len(years) == latest) & (rate[groups] > 0)]
+    ctx["max_year"] = years[latest]
+    ctx["outcome_entity"] = chosen // len(years)
+    ctx["outcome_rate"] = rate[chosen]
+    return len(groups)
+
+
+def _pairs_year(store: ColumnStore, limit: int, ctx: Dict) -> int:
+    if ctx["max_year"] is None:
+        ctx["y"], ctx["x"] = np.empty(0), {c: np.empty(0) for c in DEMOGRAPHIC_COLUMNS}
+        return 0
+    demo = np.flatnonzero(np.trunc(store.number("demographics", "year")) == ctx["max_year"])
+    left, right = merge_join(ctx["outcome_entity"], store.codes("demographics", "entity_cd")[demo])
+    rows = demo[right]
+    ctx["y"] = ctx["outcome_rate"][left]
+    ctx["x"] = {c: store.number("demographics", c)[rows] for c in DEMOGRAPHIC_COLUMNS}
+    return len(rows)
+
+
+def _composition_correlations(store: ColumnStore, limit: int, ctx: Dict) -> int:
+    """correlations.sql: r and slope of every composition share against the proficiency share."""
+    y = ctx["y"]
+    n, sumy, sumy2 = len(y), y.sum(), (y * y).sum()
+    result = []
+    for column in DEMOGRAPHIC_COLUMNS:
+        x = ctx["x"][column]
+        valid = ~np.isnan(x)
+        xv, yv = x[valid], y[valid]
+        a_n, sumx, sumx2, sumxy = len(xv), xv.sum(), (xv * xv).sum(), (xv * yv).sum()
+        sxx = a_n * sumx2 - sumx * sumx
+        syy = n * sumy2 - sumy * sumy
+        sxy = a_n * sumxy - sumx * sumy
+        r = None if a_n == 0 or sxx <= 0 or syy <= 0 else float(sxy / np.sqrt(sxx * syy))
+        slope = None if a_n == 0 or sxx == 0 else float(sxy / sxx)
+        result.append((column, a_n, r, slope))
+    # ORDER BY ABS(r) DESC, NULLs last
+    ctx["result"] = sorted(result, key=lambda row: (row[2] is None, -abs(row[2]) if row[2] is not None else 0.0))
+    return len(result)
+
+
+COLUMNAR_PIPELINES: Dict[str, Pipeline] = {
+    "numpy_query1": Pipeline(
+        tables=("math", "demographics"),
+        stages=(
+            ("math_src", _math_src),
+            ("math_outcome", _math_outcome),
+            ("pairs_year", _pairs_year),
+            ("correlations", _composition_correlations),
+        ),
+    ),
+    "numpy_query2": Pipeline(
+        tables=("math", "attendance"),
+        stages=(
+            ("math_school", _math_school_2024),
+            ("att_src", _attendance_src),
+            ("pairs", _attendance_pairs),
+            ("correlation", _correlation),
+        ),
+    ),
+    "numpy_query3": Pipeline(
+        tables=("math", "expenditure"),
+        stages=(
+            ("math_school", _math_school_2024),
+            ("exp_src", _expenditure_src),
+            ("pairs", _expenditure_pairs),
+            ("correlation", _correlation),
+        ),
+    ),
+}
+
+
+def pipeline_for(spec: QuerySpec) -> Pipeline:
+    if spec.name not in COLUMNAR_PIPELINES:
+        raise ValueError(f"No numpy pipeline for {spec.name!r}, expected one of {sorted(COLUMNAR_PIPELINES)}")
+    return COLUMNAR_PIPELINES[spec.name]
+
+
+def prepare_columnar_store(spec: QuerySpec) -> None:
+    """Download / convert the spec's datasets and export the tables its pipeline reads, if needed."""
+    source_paths = {dataset: materialize_dataset(dataset) for dataset in spec.dependant_datasets or []}
+    ensure_columnar_tables(pipeline_for(spec).tables, source_paths=source_paths)
+
+
+def run_pipeline(
+    store: ColumnStore,
+    spec: QuerySpec,
+    limit: int,
+    desc: str = "",
+    preview: int = 5,
+    timeout_s: Optional[float] = None,
+) -> List[StageStats]:
+    """
+    Run the pipeline of a numpy spec at one dataset limit and return the
+    stats of every stage. Raises PipelineTimeout when a stage ends after
+    timeout_s, ColumnarError when the store lacks a column.
+    """
+    pipeline = pipeline_for(spec)
+    emit("statement.start", f"\n=== {desc or spec.name}", desc=desc)
+    ctx: Dict = {}
+    stats = []
+    t0 = time.perf_counter()
+    try:
+        for i, (name, stage) in enumerate(pipeline.stages, start=1):
+            ts = time.perf_counter()
+            rows = stage(store, int(limit), ctx)
+            stats.append(StageStats(index=i, name=name, elapsed_seconds=time.perf_counter() - ts, rows=rows))
+            if timeout_s and time.perf_counter() - t0 > timeout_s:
+                raise PipelineTimeout(f"timed out after {timeout_s}s in stage {name}")
+    except (OSError, KeyError) as e:
+        emit("statement.error", f"[ERROR] {desc} -> {e!r}", level="error", desc=desc, error=repr(e))
+        raise ColumnarError(repr(e)) from e
+    except PipelineTimeout as e:
+        emit("statement.error", f"[ERROR] {desc} -> {e}", level="error", desc=desc, error=str(e))
+        raise
+    elapsed = time.perf_counter() - t0
+
+    result = ctx.get("result", [])
+    emit(
+        "statement.ok",
+        "\n".join(
+            [f"[OK] {desc} in {elapsed:.3f}s. Preview {min(preview, len(result))} row(s):"]
+            + [str(r) for r in result[:preview]]
+        ),
+        desc=desc,
+        elapsed_seconds=elapsed,
+        rows=len(result),
+        preview=result[:preview],
+    )
+    return stats
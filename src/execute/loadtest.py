@@ -0,0 +1,467 @@
+"""
+Concurrent-client load tests.
+
+run_queryspec times one query at a time on an otherwise idle connection. A
+load test instead runs a QuerySpec from N clients at once, each on its own
+benchmark connection with the datasets attached the usual way, so the clients
+compete for the same dataset files like several dashboard users do. Clients
+are threads (sqlite3 releases the GIL while SQLite works) or processes.
+
+Every client prepares its connection and runs its warmup requests, then all
+of them start together and send requests back to back until the duration is
+over or the shared request budget is used up. A client count level reports
+QPS, P50/P95/P99/max latency and error / timeout counts. Levels of one call
+(e.g. 1, 2, 4, 8 clients) are stored as LoadTestResult rows of one QueryLaunch
+with launch_type 'load', which the latency plots leave out.
+"""
+import argparse
+import multiprocessing as mp
+import queue
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from execute.sql import (
+    READ_KEYWORDS,
+    SqlFile,
+    Watchdog,
+    attach_datasets,
+    dataset_path,
+    load_spec_statements,
+    open_benchmark_connection,
+    statement_keyword,
+)
+from execute.cells import RunOptions, attach_settings, pragma_settings, run_options_from_config
+from execute.noise import apply_process_settings, launch_settings, process_settings_from_config
+from execute.pragmas import pragma_profiles_from_config
+from app.queries import QuerySpec
+import app.queries as QUERIES_MODULE
+from app import AppConfig
+from app.events import emit, configure_events, event_sinks_arg, flush_events
+from reporting.models import LoadTestResult, create_launch_from_query, create_load_test_result
+from reporting.setup import get_database_connection
+from reporting.operations import create_query_launch, insert_load_test_result
+
+# thread  -> clients are threads of this process, one connection each
+# process -> clients are spawned processes, one connection each
+CLIENT_MODES = ("thread", "process")
+
+# latency percentiles of a level; p50 is the median, the others nearest-rank
+LOAD_PERCENTILES = {"p50": (0.50, "linear"), "p95": (0.95, "inverted_cdf"), "p99": (0.99, "inverted_cdf")}
+
+
+@dataclass
+class ClientResult:
+    """Requests of one client. Times are time.monotonic(), which is system-wide on Linux."""
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+    timeouts: int = 0
+    first_error: Optional[str] = None
+    started: Optional[float] = None
+    finished: Optional[float] = None
+
+
+def _take_request(budget) -> bool:
+    """Claim one request from a shared budget (a multiprocessing Value); None is unlimited."""
+    if budget is None:
+        return True
+    with budget.get_lock():
+        if budget.value <= 0:
+            return False
+        budget.value -= 1
+        return True
+
+
+def _run_request(
+    conn: sqlite3.Connection,
+    cur: sqlite3.Cursor,
+    statements: List[str],
+    params: Dict,
+    options: RunOptions,
+) -> None:
+    """
+    One request: every statement of the spec in order, read results fetched
+    per options.drain_policy. Nothing is emitted, so clients do not contend
+    on the event queue.
+    """
+    for stmt in statements:
+        cur.execute(stmt, params)
+        if statement_keyword(stmt) not in READ_KEYWORDS or options.drain_policy == "none":
+            continue
+        if options.drain_policy == "preview":
+            cur.fetchmany(options.num_lines_to_preview)
+        else:
+            cur.arraysize = options.fetch_arraysize
+            while cur.fetchmany():
+                pass
+
+
+def _client(
+    spec: QuerySpec,
+    sql_files: List[SqlFile],
+    limit: int,
+    options: RunOptions,
+    duration_s: Optional[float],
+    budget,
+    start_barrier,
+) -> ClientResult:
+    result = ClientResult()
+    statements = [stmt for sql_file in sql_files for stmt in sql_file.statements]
+    params = {"n_limit": int(limit)}
+    conn = open_benchmark_connection(options.pragma_profile)
+    try:
+        attach_datasets(conn, spec.dependant_datasets, options.attach_strategy, options.mmap_size, options.pragma_profile)
+        cur = conn.cursor()
+        for _ in range(options.warmup_runs):
+            try:
+                _run_request(conn, cur, statements, params, options)
+            except sqlite3.Error:
+                break
+        start_barrier.wait()
+
+        result.started = time.monotonic()
+        stop_at = None if duration_s is None else result.started + duration_s
+        while (stop_at is None or time.monotonic() < stop_at) and _take_request(budget):
+            watchdog = Watchdog(conn, options.timeout_s)
+            t0 = time.perf_counter()
+            try:
+                with watchdog:
+                    _run_request(conn, cur, statements, params, options)
+                result.latencies.append(time.perf_counter() - t0)
+            except sqlite3.Error as e:
+                if watchdog.fired:
+                    result.timeouts += 1
+                else:
+                    result.errors += 1
+                    result.first_error = result.first_error or str(e)
+        result.finished = time.monotonic()
+    finally:
+        conn.close()
+    return result
+
+
+def _process_client_main(result_queue, *args) -> None:
+    try:
+        result_queue.put(("result", _client(*args)))
+    except Exception as e:
+        result_queue.put(("error", repr(e)))
+
+
+def latency_percentiles(latencies: List[float]) -> Optional[Dict[str, float]]:
+    """p50 / p95 / p99 / max of request latencies, None without any."""
+    if not latencies:
+        return None
+    data = np.asarray(latencies, dtype=float)
+    pct = {name: float(np.quantile(data, q, method=method)) for name, (q, method) in LOAD_PERCENTILES.items()}
+    pct["max"] = float(data.max())
+    return pct
+
+
+def run_load_level(
+    spec: QuerySpec,
+    limit: int,
+    clients: int,
+    options: RunOptions,
+    client_mode: str = "thread",
+    duration_s: Optional[float] = 30.0,
+    requests: Optional[int] = None,
+) -> List[ClientResult]:
+    """
+    Run one level: `clients` concurrent clients until duration_s has passed or
+    `requests` requests were sent, whichever comes first (at least one of the
+    two must be set). Returns the result of every client.
+    """
+    if client_mode not in CLIENT_MODES:
+        raise ValueError(f"Unknown client mode {client_mode!r}, expected one of {CLIENT_MODES}")
+    if duration_s is None and requests is None:
+        raise ValueError("A load test needs a duration, a request count or both.")
+    sql_files = load_spec_statements(spec)
+
+    if client_mode == "thread":
+        budget = None if requests is None else mp.Value("q", requests)
+        barrier = threading.Barrier(clients)
+        results: List[Optional[ClientResult]] = [None] * clients
+        errors: List[str] = []
+
+        def run(i: int) -> None:
+            try:
+                results[i] = _client(spec, sql_files, limit, options, duration_s, budget, barrier)
+            except Exception as e:
+                barrier.abort()
+                errors.append(repr(e))
+
+        threads = [threading.Thread(target=run, args=(i,), name=f"load-client-{i}") for i in range(clients)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    else:
+        ctx = mp.get_context("spawn")
+        budget = None if requests is None else ctx.Value("q", requests)
+        barrier = ctx.Barrier(clients)
+        result_queue = ctx.Queue()
+        procs = [
+            ctx.Process(
+                target=_process_client_main,
+                args=(result_queue, spec, sql_files, limit, options, duration_s, budget, barrier),
+                daemon=True,
+            )
+            for _ in range(clients)
+        ]
+        for p in procs:
+            p.start()
+        results, errors = [], []
+        while len(results) + len(errors) < clients:
+            try:
+                kind, payload = result_queue.get(timeout=1.0)
+            except queue.Empty:
+                if not any(p.is_alive() for p in procs):
+                    break
+                continue
+            (results if kind == "result" else errors).append(payload)
+            if kind == "error":
+                barrier.abort()
+        for p in procs:
+            p.join()
+
+    if errors:
+        raise RuntimeError(f"{len(errors)} load-test client(s) failed: {errors[0]}")
+    return [r for r in results if r is not None]
+
+
+def summarize_load_level(
+    launch_ID: str,
+    limit: int,
+    clients: int,
+    client_mode: str,
+    results: List[ClientResult],
+) -> LoadTestResult:
+    """Aggregate the client results of one level into a LoadTestResult."""
+    latencies = [lat for r in results for lat in r.latencies]
+    started = [r.started for r in results if r.started is not None]
+    finished = [r.finished for r in results if r.finished is not None]
+    window = max(finished) - min(started) if started and finished else 0.0
+    return create_load_test_result(
+        launch_ID,
+        limit,
+        clients,
+        client_mode,
+        duration_seconds=window,
+        requests=len(latencies),
+        errors=sum(r.errors for r in results),
+        timeouts=sum(r.timeouts for r in results),
+        latency_percentiles=latency_percentiles(latencies),
+    )
+
+
+def format_load_result(spec: QuerySpec, result: LoadTestResult) -> str:
+    if result.p50 is None:
+        latency = "no successful requests"
+    else:
+        latency = (
+            f"P50={result.p50:.4f}s P95={result.p95:.4f}s P99={result.p99:.4f}s max={result.max_latency:.4f}s"
+        )
+    return (
+        f"[LOAD] {spec.name} v{spec.version} rows={result.dataset_size:,} clients={result.clients:<3} "
+        f"QPS={result.qps:,.1f} requests={result.requests:,} errors={result.errors} timeouts={result.timeouts}  {latency}"
+    )
+
+
+def run_load_test(
+    spec: QuerySpec,
+    dataset_limit: int,
+    client_counts: List[int],
+    options: RunOptions = RunOptions(),
+    client_mode: str = "thread",
+    duration_s: Optional[float] = 30.0,
+    requests: Optional[int] = None,
+) -> List[LoadTestResult]:
+    """
+    Load-test a QuerySpec at one dataset limit with every client count in
+    client_counts, in order, under one QueryLaunch of launch_type 'load'.
+    duration_s / requests bound every level (see run_load_level). The options
+    that matter are the drain policy, timeout, warmup runs (per client, before
+    the clients start), attach strategy and PRAGMA profile; clients keep their
+    connection, so the launch is always stored with cache_mode 'warm'.
+    """
+    if spec.engine != "sqlite":
+        raise ValueError(f"{spec.name} runs on the {spec.engine} engine; load tests need SQL statements.")
+    # Download / convert (and rebuild for a profile page_size) before any client starts.
+    for dataset in spec.dependant_datasets or []:
+        dataset_path(dataset, options.pragma_profile.page_size)
+
+    data_reporting_conn = get_database_connection()
+    try:
+        launch = create_query_launch(
+            data_reporting_conn,
+            create_launch_from_query(
+                spec,
+                cache_mode="warm",
+                dataset_sizes=[dataset_limit],
+                settings=launch_settings(
+                    options.warmup_runs,
+                    options.low_noise,
+                    **attach_settings(options),
+                    **pragma_settings(options),
+                    client_mode=client_mode,
+                    client_counts=list(client_counts),
+                    duration_s=duration_s,
+                    requests=requests,
+                    drain_policy=options.drain_policy,
+                ),
+                pragma_profile=options.pragma_profile.name,
+                launch_type="load",
+            ),
+        )
+        bound = " and ".join(
+            x for x in (f"{duration_s:g}s" if duration_s else "", f"{requests:,} requests" if requests else "") if x
+        )
+        emit(
+            "load.start",
+            f"\n[LOAD] {spec.name} v{spec.version} rows={dataset_limit:,} clients={list(client_counts)} "
+            f"mode={client_mode} for {bound}  drain={options.drain_policy}  attach={options.attach_strategy}  "
+            f"profile={options.pragma_profile.name}",
+            query=spec.name,
+            version=spec.version,
+            launch_ID=launch.launch_ID,
+            dataset_size=dataset_limit,
+            client_counts=list(client_counts),
+            client_mode=client_mode,
+        )
+
+        stored = []
+        for clients in client_counts:
+            results = run_load_level(spec, dataset_limit, clients, options, client_mode, duration_s, requests)
+            load_result = insert_load_test_result(
+                data_reporting_conn, summarize_load_level(launch.launch_ID, dataset_limit, clients, client_mode, results)
+            )
+            stored.append(load_result)
+            emit(
+                "load.result",
+                format_load_result(spec, load_result),
+                query=spec.name,
+                version=spec.version,
+                clients=clients,
+                qps=load_result.qps,
+                p50=load_result.p50,
+                p95=load_result.p95,
+                p99=load_result.p99,
+                max_latency=load_result.max_latency,
+                errors=load_result.errors,
+                timeouts=load_result.timeouts,
+            )
+            first_error = next((r.first_error for r in results if r.first_error), None)
+            if first_error:
+                emit("load.error", f"[ERROR] first error at clients={clients}: {first_error}", level="error", error=first_error)
+        return stored
+    finally:
+        data_reporting_conn.close()
+
+
+def cli_load_test() -> None:
+    """
+    CLI entry point for load_test.
+
+    Example:
+        load_test baseline_query2 2.2
+        load_test baseline_query2 2.2 --clients 1,2,4,8,16 --duration 20 --rows 500000
+        load_test baseline_query2 2.2 --clients 4 --requests 1000 --mode process
+    """
+    parser = argparse.ArgumentParser(
+        description="Run a QuerySpec from several concurrent clients and report QPS and tail latency."
+    )
+    parser.add_argument("query_name", help="Name of the query spec (matches QuerySpec.name)")
+    parser.add_argument("version", help="Version string to match (matches QuerySpec.version)")
+    parser.add_argument(
+        "--clients",
+        type=str,
+        default=None,
+        help="Comma-separated client counts to run one after another (defaults to load_test_clients from execution_config).",
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=None,
+        help="Seconds every client count runs (defaults to load_test_duration_seconds from execution_config).",
+    )
+    parser.add_argument(
+        "--requests",
+        type=int,
+        default=None,
+        help="Stop every client count after this many requests in total (defaults to load_test_requests).",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=CLIENT_MODES,
+        default=None,
+        help="Clients as threads or processes (defaults to load_test_client_mode from execution_config).",
+    )
+    parser.add_argument(
+        "--rows",
+        type=int,
+        default=None,
+        help="Dataset limit (defaults to the largest of dataset_partitions_per_query[query_name]).",
+    )
+    parser.add_argument(
+        "--profile",
+        default="default",
+        help="PRAGMA profile from pragma_profiles in execution_config (default: default).",
+    )
+    parser.add_argument(
+        "--events",
+        type=event_sinks_arg,
+        default=None,
+        help="Comma-separated event sinks (defaults to event_sinks from execution_config).",
+    )
+
+    args = parser.parse_args()
+    exec_config = AppConfig.load_execution_config()
+
+    spec = next(
+        (
+            obj for obj in vars(QUERIES_MODULE).values()
+            if isinstance(obj, QuerySpec) and obj.name == args.query_name and str(obj.version) == str(args.version)
+        ),
+        None,
+    )
+    if spec is None:
+        parser.error(f"No QuerySpec found for name='{args.query_name}' with version='{args.version}'.")
+
+    if args.rows is not None:
+        limit = args.rows
+    else:
+        partitions = exec_config.dataset_partitions_per_query.get(spec.name)
+        if not isinstance(partitions, list) or not partitions:
+            parser.error(f"No dataset partitions listed for {spec.name}, pass --rows.")
+        limit = max(partitions)
+
+    profiles = pragma_profiles_from_config(exec_config)
+    if args.profile not in profiles:
+        parser.error(f"Unknown PRAGMA profile '{args.profile}'. Available profiles: {', '.join(sorted(profiles))}")
+    client_counts = (
+        [int(x) for x in args.clients.split(",") if x.strip()] if args.clients else exec_config.load_test_clients
+    )
+    if not client_counts or min(client_counts) <= 0:
+        parser.error("client counts must be positive integers")
+    duration_s = args.duration if args.duration is not None else exec_config.load_test_duration_seconds
+    requests = args.requests if args.requests is not None else exec_config.load_test_requests
+    if args.requests is not None and args.duration is None:
+        duration_s = None  # --requests alone means "this many requests", however long they take
+
+    configure_events(args.events or exec_config.event_sinks, exec_config.event_log_path)
+    apply_process_settings(process_settings_from_config(exec_config))
+    run_load_test(
+        spec,
+        limit,
+        client_counts,
+        # every client keeps its connection open for the whole load test
+        options=run_options_from_config(exec_config, pragma_profile=profiles[args.profile], cache_mode="warm"),
+        client_mode=args.mode or exec_config.load_test_client_mode,
+        duration_s=duration_s,
+        requests=requests,
+    )
+    flush_events()
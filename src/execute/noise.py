@@ -0,0 +1,89 @@
+"""
+Low-noise measurement settings.
+
+Warmup runs absorb statement compilation and page-cache faults before the
+timed runs of a dataset size. In low-noise mode the garbage collector is
+disabled and event output is held back while a run is timed, and the
+process can be pinned to a CPU set and given a higher priority. The settings
+in effect are stored on every launch so A/B numbers can be reproduced.
+"""
+import contextlib
+import gc
+import os
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional, Tuple
+
+from app.events import emit, events_paused, flush_events
+
+
+@dataclass(frozen=True)
+class ProcessSettings:
+    # CPU ids to pin the process to, empty -> leave the affinity alone
+    cpu_affinity: Tuple[int, ...] = ()
+    # nice value to switch to, negative raises priority (needs root / CAP_SYS_NICE)
+    process_nice: Optional[int] = None
+
+
+def process_settings_from_config(exec_config) -> ProcessSettings:
+    """ProcessSettings from the cpu_affinity / process_nice settings of an ExecutionConfig."""
+    return ProcessSettings(
+        cpu_affinity=tuple(exec_config.cpu_affinity),
+        process_nice=exec_config.process_nice,
+    )
+
+
+def apply_process_settings(settings: ProcessSettings) -> None:
+    """
+    Pin the current process and set its priority. Worker processes started
+    afterwards inherit both. Settings the platform or our privileges do not
+    allow are reported and skipped.
+    """
+    if settings.cpu_affinity:
+        if hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, set(settings.cpu_affinity))
+        else:
+            emit("warn", "[WARN] cpu_affinity is not supported on this platform, ignoring it.", level="warn")
+    if settings.process_nice is not None:
+        try:
+            os.setpriority(os.PRIO_PROCESS, 0, settings.process_nice)
+        except (AttributeError, PermissionError, OSError) as e:
+            emit("warn", f"[WARN] could not set process_nice={settings.process_nice}: {e}", level="warn")
+
+
+def current_process_settings() -> Dict:
+    """The affinity and nice value the process actually runs with, for QueryLaunch.settings."""
+    settings: Dict = {}
+    if hasattr(os, "sched_getaffinity"):
+        settings["cpu_affinity"] = sorted(os.sched_getaffinity(0))
+    if hasattr(os, "getpriority"):
+        settings["nice"] = os.getpriority(os.PRIO_PROCESS, 0)
+    return settings
+
+
+def launch_settings(warmup_runs: int, low_noise: bool, **extra) -> Dict:
+    """Measurement settings of a launch as stored in QueryLaunch.settings."""
+    settings: Dict = {"warmup_runs": warmup_runs, "low_noise": low_noise}
+    settings.update(current_process_settings())
+    settings.update(extra)
+    return settings
+
+
+@contextlib.contextmanager
+def timed_region(low_noise: bool) -> Iterator[None]:
+    """
+    Wrap the timed part of a run. In low-noise mode pending events are written
+    and garbage is collected up front, then the collector stays off and the
+    event thread writes nothing until the run is over. Otherwise this does
+    nothing.
+    """
+    if not low_noise:
+        yield
+        return
+    flush_events()
+    gc.collect()
+    gc.disable()
+    try:
+        with events_paused():
+            yield
+    finally:
+        gc.enable()
@@ -0,0 +1,308 @@
+"""
+Process-pool runner for run_all.
+
+Every worker process owns its own in-memory SQLite connection, attaches the
+datasets a cell needs on first use and pulls (spec, dataset_limit) cells from a
+shared queue. Finished ResultRecords and the workers' events are streamed back
+to the parent, which is the only process that writes to the results database
+and to the event sinks.
+"""
+import contextlib
+import multiprocessing as mp
+import os
+import queue
+from dataclasses import dataclass
+from itertools import chain, zip_longest
+from typing import Dict, List, Optional, Tuple
+
+from execute.sql import dataset_path, load_spec_statements
+from execute.cells import RunOptions, attach_settings, pragma_settings, BenchmarkConnection, run_cell, cell_failed, summarize_cell, print_cell_summary
+from execute.plans import record_query_plans
+from execute.columnar import prepare_columnar_store
+from execute.cellhash import cell_hashes
+from execute.noise import launch_settings
+from app.queries import QuerySpec
+from app.events import emit, emit_event, forward_events, flush_events
+from reporting.models import DataReportingModel, create_launch_from_query
+from reporting.setup import get_database_connection
+from reporting.operations import create_query_launch, count_ok_runs_by_cell_hash, insert_cell_stats, ResultWriter
+
+
+@dataclass(frozen=True)
+class BenchmarkCell:
+    launch_ID: str
+    spec: QuerySpec
+    dataset_limit: int
+    runs: int
+    cell_hash: Optional[str] = None
+    first_run_index: int = 1
+
+
+def available_cores() -> List[int]:
+    """CPU ids this process is allowed to run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def pin_current_process(cores: List[int]) -> bool:
+    """Restrict the calling process to the given CPU ids. Returns False where unsupported."""
+    if not hasattr(os, "sched_setaffinity"):
+        return False
+    os.sched_setaffinity(0, set(cores))
+    return True
+
+
+def _worker_main(
+    worker_index: int,
+    core: Optional[int],
+    cell_queue,
+    result_queue,
+    options: RunOptions,
+    failed_limits=None,
+    failed_lock=None,
+) -> None:
+    """
+    failed_limits is the {launch_ID: smallest failed dataset limit} dict shared
+    by every worker (a Manager dict) when on_failure is skip_larger, and
+    failed_lock the Manager lock every update of it holds.
+    """
+    forward_events(result_queue)
+    if core is not None and not pin_current_process([core]):
+        emit("warn", f"[WARN] worker {worker_index}: CPU pinning is not supported on this platform.", level="warn")
+
+    bench_conn = BenchmarkConnection()
+    if failed_limits is None:
+        failed_limits = {}
+    if failed_lock is None:
+        failed_lock = contextlib.nullcontext()
+    try:
+        while True:
+            cell = cell_queue.get()
+            if cell is None:
+                break
+
+            spec = cell.spec
+            failed_limit = failed_limits.get(cell.launch_ID)
+            if options.on_failure == "skip_larger" and failed_limit is not None and cell.dataset_limit > failed_limit:
+                emit(
+                    "cell.skipped",
+                    f"[SKIP] {spec.name} rows={cell.dataset_limit:,}: rows={failed_limit:,} already failed",
+                    query=spec.name,
+                    dataset_size=cell.dataset_limit,
+                    failed_size=failed_limit,
+                )
+                continue
+            try:
+                records = run_cell(
+                    bench_conn,
+                    spec,
+                    load_spec_statements(spec),
+                    launch_ID=cell.launch_ID,
+                    limit=cell.dataset_limit,
+                    runs=cell.runs,
+                    options=options,
+                    on_record=lambda rec: result_queue.put(("record", rec)),
+                    cell_hash=cell.cell_hash,
+                    first_run_index=cell.first_run_index,
+                )
+                if cell_failed(records):
+                    # read and write under the lock, or a concurrent larger failure could overwrite a smaller one
+                    with failed_lock:
+                        failed_limit = failed_limits.get(cell.launch_ID)
+                        failed_limits[cell.launch_ID] = min(failed_limit or cell.dataset_limit, cell.dataset_limit)
+            except Exception as e:
+                result_queue.put(("error", (cell, repr(e))))
+    finally:
+        bench_conn.close()
+        flush_events()  # every forwarded event is queued before worker_done
+        result_queue.put(("worker_done", worker_index))
+
+
+def run_queryspecs_parallel(
+    specs_and_limits: List[Tuple[QuerySpec, List[int]]],
+    runs: int,
+    options: RunOptions = RunOptions(),
+    workers: int = 2,
+    pin_cores: bool = False,
+    result_batch_size: int = 50,
+    result_flush_seconds: float = 5.0,
+    incremental: bool = False,
+) -> Dict[str, DataReportingModel]:
+    """
+    Run every (spec, dataset_limit) cell on a pool of `workers` processes.
+
+    One QueryLaunch is created per spec up front and every record coming back
+    from the workers is streamed under it through a ResultWriter. With pin_cores
+    each worker is bound to a single core so its timings stay comparable to a
+    serial run. The cells of every launch are queued smallest first and the
+    launches interleaved, so with on_failure=skip_larger the smallest failed
+    limit (shared by all workers) skips the larger cells still queued; cells
+    already running on other workers finish. incremental skips cells that
+    already have `runs` successful runs stored, as in run_queryspec.
+    """
+    data_reporting_conn = get_database_connection()
+
+    # Download / convert (and rebuild for a profile page_size) in the parent so workers never race on the same files.
+    for spec, _ in specs_and_limits:
+        for dataset in spec.dependant_datasets or []:
+            dataset_path(dataset, options.pragma_profile.page_size)
+        if spec.engine == "numpy":
+            prepare_columnar_store(spec)
+
+    models: Dict[str, DataReportingModel] = {}
+    cells: List[BenchmarkCell] = []
+    for spec, limits in specs_and_limits:
+        sql_files = load_spec_statements(spec)
+        hashes = cell_hashes(spec, sql_files, options, limits)
+        stored = count_ok_runs_by_cell_hash(data_reporting_conn, list(hashes.values())) if incremental else {}
+        todo = []
+        for limit in limits:
+            done_runs = stored.get(hashes[limit], 0)
+            if done_runs >= runs:
+                emit(
+                    "cell.cached",
+                    f"[CACHED] {spec.name} v{spec.version} rows={limit:,}: {done_runs} runs already stored",
+                    query=spec.name,
+                    version=spec.version,
+                    dataset_size=limit,
+                    runs=done_runs,
+                )
+            else:
+                todo.append((limit, done_runs))
+        if not todo:
+            continue
+
+        launch = create_query_launch(
+            data_reporting_conn,
+            create_launch_from_query(
+                spec,
+                cache_mode=options.cache_mode,
+                dataset_sizes=[limit for limit, _ in todo],
+                settings=launch_settings(
+                    options.warmup_runs,
+                    options.low_noise,
+                    resource_accounting=options.resource_accounting,
+                    **attach_settings(options),
+                    **pragma_settings(options),
+                    workers=workers,
+                    pin_cores=pin_cores,
+                ),
+                pragma_profile=options.pragma_profile.name,
+            ),
+        )
+        models[spec.name] = DataReportingModel(query_launch=launch, result_records=[])
+        record_query_plans(
+            data_reporting_conn, spec, sql_files, launch.launch_ID, min(limit for limit, _ in todo), options.timeout_s,
+            options.pragma_profile,
+        )
+        cells.extend(
+            BenchmarkCell(launch.launch_ID, spec, limit, runs - done_runs, hashes[limit], done_runs + 1)
+            for limit, done_runs in todo
+        )
+
+    if not cells:
+        data_reporting_conn.close()
+        return models
+
+    # Each launch smallest first (skip_larger needs the small sizes to fail first),
+    # launches interleaved so the workers share the large sizes of every query.
+    by_launch_cells: Dict[str, List[BenchmarkCell]] = {}
+    for cell in cells:
+        by_launch_cells.setdefault(cell.launch_ID, []).append(cell)
+    ascending = [sorted(group, key=lambda c: c.dataset_limit) for group in by_launch_cells.values()]
+    cells = [c for c in chain.from_iterable(zip_longest(*ascending)) if c is not None]
+
+    cores: List[Optional[int]] = [None] * workers
+    if pin_cores:
+        allowed = available_cores()
+        if workers > len(allowed):
+            emit("warn", f"[WARN] {workers} workers but only {len(allowed)} cores; some workers will share a core.", level="warn")
+        cores = [allowed[i % len(allowed)] for i in range(workers)]
+
+    ctx = mp.get_context("spawn")
+    manager = ctx.Manager() if options.on_failure == "skip_larger" else None
+    failed_limits = manager.dict() if manager is not None else None
+    failed_lock = manager.Lock() if manager is not None else None
+    cell_queue = ctx.Queue()
+    result_queue = ctx.Queue()
+    for cell in cells:
+        cell_queue.put(cell)
+    for _ in range(workers):
+        cell_queue.put(None)
+
+    emit(
+        "pool.start",
+        f"\n[RUN] {len(cells)} cells on {workers} workers  pin_cores={pin_cores}",
+        cells=len(cells),
+        workers=workers,
+        pin_cores=pin_cores,
+    )
+    procs = [
+        ctx.Process(
+            target=_worker_main,
+            args=(i, cores[i], cell_queue, result_queue, options, failed_limits, failed_lock),
+            daemon=True,
+        )
+        for i in range(workers)
+    ]
+    for p in procs:
+        p.start()
+
+    by_launch = {m.query_launch.launch_ID: m for m in models.values()}
+    writer = ResultWriter(data_reporting_conn, result_batch_size, result_flush_seconds)
+    errors = []
+    done = 0
+    try:
+        while done < workers:
+            try:
+                kind, payload = result_queue.get(timeout=1.0)
+            except queue.Empty:
+                if not any(p.is_alive() for p in procs):
+                    break
+                continue
+
+            if kind == "event":
+                emit_event(payload)
+            elif kind == "record":
+                writer.add(payload)
+                by_launch[payload.launch_ID].result_records.append(payload)
+            elif kind == "error":
+                cell, err = payload
+                emit(
+                    "cell.error",
+                    f"[ERROR] {cell.spec.name} rows={cell.dataset_limit:,} -> {err}",
+                    level="error",
+                    query=cell.spec.name,
+                    dataset_size=cell.dataset_limit,
+                    error=err,
+                )
+                errors.append(payload)
+            elif kind == "worker_done":
+                done += 1
+    finally:
+        for p in procs:
+            p.join()
+        writer.close()
+        if manager is not None:
+            manager.shutdown()
+
+    try:
+        for spec, limits in specs_and_limits:
+            model = models.get(spec.name)
+            if model is None:
+                continue
+            for limit in limits:
+                records = [r for r in model.result_records if r.dataset_size == limit]
+                if not records:
+                    continue
+                stats = insert_cell_stats(
+                    data_reporting_conn, summarize_cell(model.query_launch.launch_ID, limit, records, options)
+                )
+                print_cell_summary(spec, limit, records, stats)
+    finally:
+        data_reporting_conn.close()
+
+    if errors:
+        raise RuntimeError(f"{len(errors)} benchmark cell(s) failed, see [ERROR] lines above.")
+    return models
@@ -0,0 +1,103 @@
+"""
+EXPLAIN QUERY PLAN capture for a QuerySpec.
+
+Plans are captured once per launch, on a fresh connection of their own so the
+temp tables a spec creates do not leak into the timed runs. Every statement is
+explained and then executed, because later statements usually read what the
+earlier ones created.
+"""
+import sqlite3
+from typing import List, Optional, Tuple
+
+from execute.sql import SqlFile, Watchdog, open_benchmark_connection, attach_datasets
+from execute.pragmas import DEFAULT_PRAGMA_PROFILE, PragmaProfile
+from app.queries import QuerySpec
+from app.events import emit
+from reporting.models import QueryPlan, create_query_plan
+from reporting.operations import insert_query_plans
+
+
+def explain_statement(
+    conn: sqlite3.Connection,
+    stmt: str,
+    params: Optional[dict] = None,
+) -> Optional[List[Tuple[int, int, str]]]:
+    """
+    EXPLAIN QUERY PLAN rows of one statement as (id, parent, detail), or None
+    for statements SQLite cannot explain.
+    """
+    try:
+        rows = conn.execute("EXPLAIN QUERY PLAN " + stmt, params or {}).fetchall()
+    except sqlite3.Error:
+        return None
+    return [(int(r[0]), int(r[1]), str(r[3])) for r in rows]
+
+
+def capture_query_plans(
+    spec: QuerySpec,
+    sql_files: List[SqlFile],
+    launch_ID: str,
+    limit: int,
+    timeout_s: Optional[int] = None,
+    profile: PragmaProfile = DEFAULT_PRAGMA_PROFILE,
+) -> List[QueryPlan]:
+    """
+    Explain every statement of a spec at dataset limit `limit` and return one
+    QueryPlan per statement that has a plan. Statements without one (PRAGMA,
+    DROP, ...) are still executed so later statements see their effects. If a
+    statement fails or times out, capture stops and the plans so far are kept.
+    """
+    params = {"n_limit": int(limit)}
+    plans: List[QueryPlan] = []
+    conn = open_benchmark_connection(profile)
+    try:
+        attach_datasets(conn, spec.dependant_datasets, profile=profile)
+        with Watchdog(conn, timeout_s) as watchdog:
+            for sql_file in sql_files:
+                for i, stmt in enumerate(sql_file.statements, start=1):
+                    plan = explain_statement(conn, stmt, params)
+                    if plan:
+                        plans.append(create_query_plan(launch_ID, spec, sql_file.name, i, plan))
+                    try:
+                        conn.execute(stmt, params)
+                    except sqlite3.Error as e:
+                        reason = f"timed out after {timeout_s}s" if watchdog.fired else str(e)
+                        emit(
+                            "plan.warn",
+                            f"[WARN] plan capture stopped at {sql_file.name} statement {i}: {reason}",
+                            level="warn",
+                            sql_file=sql_file.name,
+                            statement_index=i,
+                            reason=reason,
+                        )
+                        return plans
+    finally:
+        conn.close()
+    return plans
+
+
+def record_query_plans(
+    data_reporting_conn: sqlite3.Connection,
+    spec: QuerySpec,
+    sql_files: List[SqlFile],
+    launch_ID: str,
+    limit: int,
+    timeout_s: Optional[int] = None,
+    profile: PragmaProfile = DEFAULT_PRAGMA_PROFILE,
+) -> List[QueryPlan]:
+    """Capture the plans of a launch, on a connection with its PRAGMA profile, and store them."""
+    if spec.engine != "sqlite":
+        return []  # a numpy pipeline has no SQLite plan
+    plans = insert_query_plans(
+        data_reporting_conn, capture_query_plans(spec, sql_files, launch_ID, limit, timeout_s, profile)
+    )
+    emit(
+        "plan.stored",
+        f"[PLAN] {spec.name} v{spec.version}: stored {len(plans)} statement plans (rows={limit:,})",
+        query=spec.name,
+        version=spec.version,
+        launch_ID=launch_ID,
+        plans=len(plans),
+        dataset_size=limit,
+    )
+    return plans
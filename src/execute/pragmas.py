@@ -0,0 +1,141 @@
+"""
+PRAGMA profiles of the benchmark connection.
+
+A profile is a named set of SQLite settings from pragma_profiles in
+execution_config.yaml. run_all can run every query once per profile, and the
+profile is stored on each launch so latency can be plotted against a knob
+like cache_size or threads (see reporting.plotter.plot_pragma_profiles).
+
+  cache_size       -> page cache of main and of every attached dataset
+                      (pages when > 0, KiB when < 0)
+  temp_store       -> DEFAULT | FILE | MEMORY
+  journal_mode,
+  synchronous      -> as before, OFF on the read-only benchmark connection
+  mmap_size        -> bytes memory-mapped per attached dataset, overrides the
+                      mmap_size of attach_strategy: mmap
+  threads          -> auxiliary threads SQLite may use for large sorts
+  page_size        -> datasets are attached from a copy rebuilt with this
+                      page size (VACUUM INTO, cached next to the original)
+  soft_heap_limit,
+  hard_heap_limit  -> process-wide heap limits in bytes
+
+Keys a profile leaves out keep the values of DEFAULT_PRAGMA_PROFILE.
+"""
+import sqlite3
+from dataclasses import asdict, dataclass, fields
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_PROFILE_NAME = "default"
+TEMP_STORES = ("DEFAULT", "FILE", "MEMORY")
+
+
+@dataclass(frozen=True)
+class PragmaProfile:
+    name: str = DEFAULT_PROFILE_NAME
+    cache_size: int = -64000
+    temp_store: str = "MEMORY"
+    journal_mode: str = "OFF"
+    synchronous: str = "OFF"
+    mmap_size: Optional[int] = None
+    threads: Optional[int] = None
+    page_size: Optional[int] = None
+    soft_heap_limit: Optional[int] = None
+    hard_heap_limit: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        if self.temp_store.upper() not in TEMP_STORES:
+            raise ValueError(f"Profile {self.name!r}: temp_store must be one of {TEMP_STORES}")
+        if self.page_size is not None and (
+            not 512 <= self.page_size <= 65536 or self.page_size & (self.page_size - 1)
+        ):
+            raise ValueError(f"Profile {self.name!r}: page_size must be a power of two between 512 and 65536")
+        for key in ("mmap_size", "threads", "soft_heap_limit", "hard_heap_limit"):
+            value = getattr(self, key)
+            if value is not None and value < 0:
+                raise ValueError(f"Profile {self.name!r}: {key} must be >= 0")
+
+    def connection_pragmas(self) -> Tuple[str, ...]:
+        """Statements run once on every new benchmark connection."""
+        statements = [
+            f"PRAGMA temp_store={self.temp_store.upper()};",
+            f"PRAGMA cache_size={self.cache_size};",
+            f"PRAGMA journal_mode={self.journal_mode};",
+            f"PRAGMA synchronous={self.synchronous};",
+            # process-wide, so always set: an earlier profile may have left a limit behind
+            f"PRAGMA soft_heap_limit={self.soft_heap_limit or 0};",
+        ]
+        if self.threads is not None:
+            statements.append(f"PRAGMA threads={self.threads};")
+        if self.hard_heap_limit is not None:
+            statements.append(f"PRAGMA hard_heap_limit={self.hard_heap_limit};")
+        return tuple(statements)
+
+    def schema_pragmas(self, schema: str) -> Tuple[str, ...]:
+        """
+        Statements run on every attached dataset. cache_size and mmap_size
+        without a schema name only change main, not the attached datasets.
+        """
+        statements = [f'PRAGMA "{schema}".cache_size={self.cache_size};']
+        if self.mmap_size is not None:
+            statements.append(f'PRAGMA "{schema}".mmap_size={self.mmap_size};')
+        return tuple(statements)
+
+    def values(self) -> Dict[str, Any]:
+        """Every setting of the profile (without its name), for QueryLaunch.settings."""
+        values = asdict(self)
+        values.pop("name")
+        return values
+
+    def cache_bytes(self, page_size: int = 4096) -> int:
+        """cache_size in bytes, for plots; positive cache sizes count pages of page_size."""
+        if self.cache_size < 0:
+            return -self.cache_size * 1024
+        return self.cache_size * (self.page_size or page_size)
+
+
+DEFAULT_PRAGMA_PROFILE = PragmaProfile()
+
+# keys a profile in execution_config.yaml may set
+PRAGMA_PROFILE_KEYS = tuple(f.name for f in fields(PragmaProfile) if f.name != "name")
+
+
+def pragma_profiles_from_config(exec_config) -> Dict[str, PragmaProfile]:
+    """
+    {name: PragmaProfile} from the pragma_profiles setting of an ExecutionConfig.
+    A "default" profile always exists; the config may redefine it.
+    """
+    profiles = {DEFAULT_PROFILE_NAME: DEFAULT_PRAGMA_PROFILE}
+    for name, values in exec_config.pragma_profiles.items():
+        profiles[name] = PragmaProfile(name=name, **values)
+    return profiles
+
+
+def sweep_order(profiles: List[PragmaProfile]) -> List[PragmaProfile]:
+    """
+    Order in which a sweep runs profiles in one process. SQLite can only lower
+    the hard heap limit, never raise it, so profiles without one go first and
+    the others follow from the largest limit to the smallest.
+    """
+    return sorted(profiles, key=lambda p: -(p.hard_heap_limit or float("inf")))
+
+
+def apply_connection_pragmas(conn: sqlite3.Connection, profile: PragmaProfile) -> List[str]:
+    """
+    Run the connection pragmas of a profile. Returns a warning for every
+    setting SQLite did not take as asked (e.g. threads above its compile-time
+    maximum, or a hard heap limit an earlier profile already set lower).
+    """
+    for pragma in profile.connection_pragmas():
+        conn.execute(pragma)
+    warnings = []
+    if profile.threads is not None:
+        (threads,) = conn.execute("PRAGMA threads;").fetchone()
+        if threads != profile.threads:
+            warnings.append(f"profile {profile.name}: threads={profile.threads} requested, SQLite uses {threads}")
+    (hard_limit,) = conn.execute("PRAGMA hard_heap_limit;").fetchone()
+    if hard_limit != (profile.hard_heap_limit or 0):
+        warnings.append(
+            f"profile {profile.name}: hard_heap_limit={profile.hard_heap_limit or 0} requested, "
+            f"the process already runs with {hard_limit}"
+        )
+    return warnings
@@ -0,0 +1,114 @@
+"""
+Per-run resource accounting.
+
+A snapshot is taken right before and right after the timed part of a run, and
+the difference is stored with the run (QueryResultResource), so a slow run
+can be told apart as CPU-bound, I/O-bound or faulting:
+
+  getrusage(RUSAGE_SELF)  -> user / sys CPU seconds, minor / major page faults,
+                             voluntary / involuntary context switches. The
+                             whole process is counted so CPU spent by SQLite's
+                             auxiliary sorter threads (PRAGMA threads) is in it.
+  /proc/self/io           -> bytes read / written from storage (read_bytes,
+                             write_bytes) and through read()/write() calls,
+                             page cache hits included (rchar, wchar)
+  /proc/self/status       -> peak RSS (VmHWM). The peak is reset before every
+                             run through /proc/self/clear_refs, so it is the
+                             peak of that run; where that is not possible it
+                             is the peak of the process so far.
+
+Sources a platform does not have are left as None.
+"""
+import resource
+import sys
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from reporting.models import ResourceUsage, create_resource_usage
+
+_PROC_IO = "/proc/self/io"
+_PROC_STATUS = "/proc/self/status"
+_PROC_CLEAR_REFS = "/proc/self/clear_refs"
+
+
+@dataclass(frozen=True)
+class ResourceSnapshot:
+    rusage: resource.struct_rusage
+    io: Optional[Dict[str, int]]
+
+
+def _read_proc_io() -> Optional[Dict[str, int]]:
+    try:
+        with open(_PROC_IO, "r", encoding="ascii") as f:
+            return {key: int(value) for key, value in (line.split(":", 1) for line in f if ":" in line)}
+    except (OSError, ValueError):
+        return None
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    try:
+        with open(_PROC_STATUS, "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    # ru_maxrss: KiB on Linux, bytes on macOS; always the peak of the whole process
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+def reset_peak_rss() -> bool:
+    """Reset the peak RSS (VmHWM) of this process to its current RSS. False where unsupported."""
+    try:
+        with open(_PROC_CLEAR_REFS, "w", encoding="ascii") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def take_snapshot() -> ResourceSnapshot:
+    return ResourceSnapshot(rusage=resource.getrusage(resource.RUSAGE_SELF), io=_read_proc_io())
+
+
+class ResourceMonitor:
+    """
+    Resource usage of one run. Call start() right before and stop() right
+    after the timed region; nothing is read in between, so the run itself
+    pays nothing. A monitor can be reused for the next run.
+    """
+
+    def __init__(self) -> None:
+        self._before: Optional[ResourceSnapshot] = None
+
+    def start(self) -> None:
+        reset_peak_rss()
+        self._before = take_snapshot()
+
+    def stop(self) -> ResourceUsage:
+        after = take_snapshot()
+        before = self._before
+        if before is None:
+            raise RuntimeError("ResourceMonitor.stop() called before start()")
+        b, a = before.rusage, after.rusage
+        io_delta: Dict[str, Optional[int]] = {}
+        for key in ("read_bytes", "write_bytes", "rchar", "wchar"):
+            io_delta[key] = (
+                after.io[key] - before.io[key]
+                if after.io is not None and before.io is not None and key in after.io and key in before.io
+                else None
+            )
+        return create_resource_usage(
+            user_cpu_seconds=a.ru_utime - b.ru_utime,
+            sys_cpu_seconds=a.ru_stime - b.ru_stime,
+            minor_faults=a.ru_minflt - b.ru_minflt,
+            major_faults=a.ru_majflt - b.ru_majflt,
+            voluntary_ctx_switches=a.ru_nvcsw - b.ru_nvcsw,
+            involuntary_ctx_switches=a.ru_nivcsw - b.ru_nivcsw,
+            read_bytes=io_delta["read_bytes"],
+            write_bytes=io_delta["write_bytes"],
+            read_chars=io_delta["rchar"],
+            write_chars=io_delta["wchar"],
+            peak_rss_bytes=_peak_rss_bytes(),
+        )
@@ -1,7 +1,13 @@
+import os
 import sqlite3
+import threading
 import time
+import urllib.parse
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
+
+from app.events import emit, flush_events
 # ---------- Debug + timeout helpers ----------
 
 def debug_sql(sql: str, params: Optional[dict] = None) -> str:
@@ -18,65 +24,352 @@ def debug_sql(sql: str, params: Optional[dict] = None) -> str:
     return out
 
 
-def run_sql(
+# ---------- Statement splitting ----------
+
+def _skip_comments(sql: str) -> str:
+    """Drop leading whitespace, -- line comments and /* block */ comments."""
+    rest = sql.lstrip()
+    while True:
+        if rest.startswith("--"):
+            nl = rest.find("\n")
+            rest = "" if nl < 0 else rest[nl + 1:].lstrip()
+        elif rest.startswith("/*"):
+            close = rest.find("*/", 2)
+            rest = "" if close < 0 else rest[close + 2:].lstrip()
+        else:
+            return rest
+
+
+def statement_keyword(sql: str) -> str:
+    """First keyword of a statement (SELECT, WITH, CREATE, ...), '' if it has none."""
+    rest = _skip_comments(sql)
+    word = []
+    for ch in rest:
+        if not (ch.isalpha() or ch == "_"):
+            break
+        word.append(ch)
+    return "".join(word).upper()
+
+
+def split_sql_statements(sql_text: str) -> List[str]:
+    """
+    Split a SQL script into single statements.
+
+    Boundaries are the semicolons at which sqlite3.complete_statement says the
+    text so far is complete, so semicolons inside string literals, comments and
+    trigger bodies do not split. Empty and comment-only pieces are dropped and a
+    final statement without a trailing semicolon is kept.
+    """
+    statements = []
+    begin = 0
+    for i, ch in enumerate(sql_text):
+        if ch == ";" and sqlite3.complete_statement(sql_text[begin:i + 1]):
+            stmt = sql_text[begin:i + 1].strip()
+            if statement_keyword(stmt):
+                statements.append(stmt)
+            begin = i + 1
+    tail = sql_text[begin:].strip()
+    if statement_keyword(tail):
+        statements.append(tail)
+    return statements
+
+
+READ_KEYWORDS = ("SELECT", "WITH", "PRAGMA", "VALUES")
+
+# How much of a read statement's result set is fetched:
+#   none    -> only execute(), SQLite stops at the first row
+#   preview -> fetch `preview` rows
+#   full    -> fetch every row in fetchmany batches of `arraysize`
+DRAIN_POLICIES = ("none", "preview", "full")
+
+
+@dataclass
+class StatementStats:
+    """
+    What one statement did. sqlite_seconds covers execute() and the fetch
+    calls, i.e. SQLite stepping plus the C-level tuple building of the sqlite3
+    module (the two are interleaved and cannot be split). python_seconds is
+    the time spent handling the fetched rows in Python.
+    """
+    index: int
+    keyword: str
+    rows: int = 0
+    approx_bytes: int = 0
+    sqlite_seconds: float = 0.0
+    python_seconds: float = 0.0
+    elapsed_seconds: float = 0.0
+    vm_steps: Optional[int] = None
+    preview_rows: Optional[list] = None
+
+
+class VmStepCounter:
+    """
+    Progress handler that runs once every `granularity` SQLite VM instructions.
+    Counting the calls gives a deterministic cost metric (calls * granularity,
+    exact to within one granularity per statement) that does not depend on
+    machine load. The handler is a Python call inside the timed statements,
+    so counting is opt-in (vm_step_granularity 0 by default).
+    """
+
+    def __init__(self, granularity: int) -> None:
+        self.granularity = granularity
+        self.calls = 0
+
+    def __call__(self) -> int:
+        self.calls += 1
+        return 0
+
+    @property
+    def steps(self) -> int:
+        return self.calls * self.granularity
+
+
+class Watchdog:
+    """
+    Interrupts a connection from a timer thread once timeout_s has passed.
+    Nothing runs inside SQLite's VM loop to check the clock, so the timed
+    region pays nothing for the timeout. Use it as a context manager around
+    the statements to bound; the interrupted statement raises
+    sqlite3.OperationalError and `fired` tells a timeout apart from other
+    errors afterwards.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, timeout_s: Optional[float]) -> None:
+        self.conn = conn
+        self.timeout_s = timeout_s
+        self.fired = False
+        self._timer: Optional[threading.Timer] = None
+
+    def _fire(self) -> None:
+        self.fired = True
+        self.conn.interrupt()
+
+    def __enter__(self) -> "Watchdog":
+        if self.timeout_s and self.timeout_s > 0:
+            self._timer = threading.Timer(self.timeout_s, self._fire)
+            self._timer.daemon = True
+            self._timer.start()
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        if self._timer is not None:
+            self._timer.cancel()
+        return False
+
+
+class StatementTracer:
+    """
+    Connection.set_trace_callback hook that timestamps every statement SQLite
+    starts, including statements run by executescript or fired by triggers.
+    run_statements marks which of its statements is current, so every traced
+    statement is attributed to one statement index; a statement lasts until
+    the next traced statement starts (or until the end passed to collect).
+    """
+
+    def __init__(self) -> None:
+        self._current: Optional[int] = None
+        self._events: List[Tuple[float, Optional[int]]] = []
+
+    def __call__(self, sql: str) -> None:
+        self._events.append((time.perf_counter(), self._current))
+
+    def attach(self, conn: sqlite3.Connection) -> None:
+        conn.set_trace_callback(self)
+
+    def detach(self, conn: sqlite3.Connection) -> None:
+        conn.set_trace_callback(None)
+
+    def mark(self, index: Optional[int]) -> None:
+        self._current = index
+
+    def collect(self, end: float) -> Dict[int, float]:
+        """Seconds per statement index since the last collect."""
+        per_index: Dict[int, float] = {}
+        events = self._events
+        for i, (t, index) in enumerate(events):
+            if index is None:
+                continue
+            t_next = events[i + 1][0] if i + 1 < len(events) else end
+            per_index[index] = per_index.get(index, 0.0) + (t_next - t)
+        self._events = []
+        self._current = None
+        return per_index
+
+
+def _approx_row_bytes(row) -> int:
+    total = 0
+    for v in row:
+        if v is None:
+            continue
+        if isinstance(v, (str, bytes)):
+            total += len(v)
+        else:
+            total += 8
+    return total
+
+
+def _drain(cur: sqlite3.Cursor, stats: StatementStats, drain: str, preview: int, arraysize: int) -> None:
+    if drain == "none":
+        return
+    if drain == "preview":
+        t0 = time.perf_counter()
+        rows = cur.fetchmany(preview)
+        stats.sqlite_seconds += time.perf_counter() - t0
+        stats.rows = len(rows)
+        stats.preview_rows = rows
+        return
+
+    cur.arraysize = arraysize
+    stats.preview_rows = []
+    while True:
+        t0 = time.perf_counter()
+        batch = cur.fetchmany()
+        t1 = time.perf_counter()
+        stats.sqlite_seconds += t1 - t0
+        if not batch:
+            break
+        stats.rows += len(batch)
+        stats.approx_bytes += sum(_approx_row_bytes(r) for r in batch)
+        if len(stats.preview_rows) < preview:
+            stats.preview_rows.extend(batch[: preview - len(stats.preview_rows)])
+        stats.python_seconds += time.perf_counter() - t1
+
+
+def run_statements(
     conn: sqlite3.Connection,
-    sql_text: str,
+    statements: List[str],
     desc: str = "",
     params: Optional[dict] = None,
     preview: int = 5,
     timeout_s: Optional[int] = None,
-):
-    start = time.perf_counter()
-    if timeout_s and timeout_s > 0:
-        def _ph():
-            return 1 if time.perf_counter() - start > timeout_s else 0
-        conn.set_progress_handler(_ph, 1000)
+    drain: str = "preview",
+    arraysize: int = 1000,
+    tracer: Optional[StatementTracer] = None,
+    vm_step_granularity: int = 0,
+) -> List[StatementStats]:
+    """
+    Execute already split statements in order, binding params to every one of
+    them. Passing the same statement strings on every run lets the
+    connection's statement cache reuse the compiled statements.
+    Read statements are fetched according to `drain` (see DRAIN_POLICIES).
+    With a tracer attached to conn, elapsed_seconds of each statement comes
+    from the trace callback; otherwise it is sqlite_seconds + python_seconds.
+    vm_step_granularity > 0 counts VM steps per statement (see VmStepCounter).
+    timeout_s bounds the whole call with a Watchdog.
+    """
+    if drain not in DRAIN_POLICIES:
+        raise ValueError(f"Unknown drain policy {drain!r}, expected one of {DRAIN_POLICIES}")
+
+    counter = VmStepCounter(vm_step_granularity)
+    if vm_step_granularity > 0:
+        conn.set_progress_handler(counter, vm_step_granularity)
     else:
         conn.set_progress_handler(None, 0)
 
-    sql = sql_text.strip()
-    print("\n===", desc or "(unnamed)")
-    # print(debug_sql(sql, params))
-
-    # Single vs multi statement (allow one trailing semicolon)
-    sql_no_trailing = sql[:-1] if sql.endswith(";") else sql
-    is_single_stmt = ";" not in sql_no_trailing
+    emit("statement.start", f"\n=== {desc or '(unnamed)'}", desc=desc)
 
     t0 = time.perf_counter()
     cur = conn.cursor()
+    all_stats = []
+    watchdog = Watchdog(conn, timeout_s)
     try:
-        if is_single_stmt:
-            cur.execute(sql, params or {})
-            # preview only for read statements
-            first = sql.split(None, 1)[0].upper() if sql else ""
-            if first in ("SELECT", "WITH", "PRAGMA"):
-                rows = cur.fetchmany(preview)
-                elapsed = time.perf_counter() - t0
-                print(f"[OK] {desc} in {elapsed:.3f}s. Preview {len(rows)} row(s):")
-                for r in rows:
-                    print(r)
-                return rows
-            else:
-                elapsed = time.perf_counter() - t0
-                print(f"[OK] {desc} in {elapsed:.3f}s.")
-                return None
+        with watchdog:
+            for i, stmt in enumerate(statements, start=1):
+                stats = StatementStats(index=i, keyword=statement_keyword(stmt))
+                if tracer is not None:
+                    tracer.mark(i)
+                steps_before = counter.steps
+                ts = time.perf_counter()
+                cur.execute(stmt, params or {})
+                stats.sqlite_seconds = time.perf_counter() - ts
+                if stats.keyword in READ_KEYWORDS:
+                    _drain(cur, stats, drain, preview, arraysize)
+                elif cur.rowcount > 0:
+                    stats.rows = cur.rowcount
+                if vm_step_granularity > 0:
+                    stats.vm_steps = counter.steps - steps_before
+                all_stats.append(stats)
+        end = time.perf_counter()
+        elapsed = end - t0
+
+        traced = tracer.collect(end) if tracer is not None else {}
+        for stats in all_stats:
+            stats.elapsed_seconds = traced.get(stats.index, stats.sqlite_seconds + stats.python_seconds)
+
+        read_stats = [st for st in all_stats if st.preview_rows is not None]
+        if read_stats:
+            last = read_stats[-1]
+            drained = ""
+            if drain == "full":
+                drained = (
+                    f" Drained {last.rows:,} row(s) ~{last.approx_bytes:,} B"
+                    f" (sqlite {last.sqlite_seconds:.3f}s, python {last.python_seconds:.3f}s)."
+                )
+            emit(
+                "statement.ok",
+                "\n".join(
+                    [f"[OK] {desc} in {elapsed:.3f}s.{drained} Preview {len(last.preview_rows)} row(s):"]
+                    + [str(r) for r in last.preview_rows]
+                ),
+                desc=desc,
+                elapsed_seconds=elapsed,
+                rows=last.rows,
+                preview=last.preview_rows,
+            )
         else:
-            if params:
-                print("[WARN] Parameters ignored for multi-statement script. Split the SQL if you need params.")
-            cur.executescript(sql)
-            elapsed = time.perf_counter() - t0
-            print(f"[OK] {desc} in {elapsed:.3f}s.")
-            return None
+            emit("statement.ok", f"[OK] {desc} in {elapsed:.3f}s.", desc=desc, elapsed_seconds=elapsed)
+        return all_stats
     except sqlite3.Error as e:
         elapsed = time.perf_counter() - t0
-        print(f"[ERROR] {desc} after {elapsed:.3f}s -> {e}")
+        if tracer is not None:
+            tracer.collect(time.perf_counter())
+        reason = f"timed out after {timeout_s}s" if watchdog.fired else str(e)
+        emit(
+            "statement.error",
+            f"[ERROR] {desc} after {elapsed:.3f}s -> {reason}",
+            level="error",
+            desc=desc,
+            elapsed_seconds=elapsed,
+            timed_out=watchdog.fired,
+            reason=reason,
+        )
         raise
     finally:
         conn.set_progress_handler(None, 0)
 
 
+def run_sql(
+    conn: sqlite3.Connection,
+    sql_text: str,
+    desc: str = "",
+    params: Optional[dict] = None,
+    preview: int = 5,
+    timeout_s: Optional[int] = None,
+):
+    """
+    Split sql_text into statements and run them with run_statements.
+    Returns the preview rows of the last read statement, or None.
+    """
+    stats = run_statements(
+        conn,
+        split_sql_statements(sql_text),
+        desc=desc,
+        params=params,
+        preview=preview,
+        timeout_s=timeout_s,
+    )
+    read_stats = [st for st in stats if st.preview_rows is not None]
+    return read_stats[-1].preview_rows if read_stats else None
+
+
 # ---------- SQL loading ----------
 
+@dataclass(frozen=True)
+class SqlFile:
+    name: str
+    statements: Tuple[str, ...]
+
+
 def load_sql_sequence(folder: Path, file_list: List[str]) -> List[str]:
     sql_texts = []
     for fname in file_list:
@@ -86,34 +379,265 @@ def load_sql_sequence(folder: Path, file_list: List[str]) -> List[str]:
         sql_texts.append(p.read_text(encoding="utf-8"))
     return sql_texts
 
+
+_SPEC_STATEMENTS: Dict[Tuple[str, Tuple[str, ...]], List[SqlFile]] = {}
+
+
+def load_spec_statements(spec: "QuerySpec") -> List[SqlFile]:
+    """
+    Read and split every SQL file of a QuerySpec once per process. Later calls
+    return the cached statements, so no SQL is read or split inside timed runs.
+    Specs without a sql_folder (numpy engine) have none.
+    """
+    if spec.sql_folder is None:
+        return []
+    key = (Path(spec.sql_folder).as_posix(), tuple(spec.sql_file_sequence))
+    if key not in _SPEC_STATEMENTS:
+        texts = load_sql_sequence(spec.sql_folder, spec.sql_file_sequence)
+        _SPEC_STATEMENTS[key] = [
+            SqlFile(name=fname, statements=tuple(split_sql_statements(text)))
+            for fname, text in zip(spec.sql_file_sequence, texts)
+        ]
+    return _SPEC_STATEMENTS[key]
+
 from load.convert_to_sqlite import convert_datalink_to_sqlite, get_datalink_sqlite_path
+from load.derived_columns import add_derived_columns
 from ingest.downloader import fetch_accdb_from_datalink
+from app import AppConfig
 from app.queries import QuerySpec
+from app.datasets import DERIVED_SOURCES, DataLink, STAR_DATASET
+from transform.star_schema import STAR_SOURCES, build_star_schema
+from execute.pragmas import DEFAULT_PRAGMA_PROFILE, PragmaProfile, apply_connection_pragmas
+
+# warnings about PRAGMA profile settings SQLite did not take, reported once per process
+_PRAGMA_WARNINGS: set = set()
 
-def create_sqlite_conn_for_spec(spec: QuerySpec) -> sqlite3.Connection:
+
+def open_benchmark_connection(profile: PragmaProfile = DEFAULT_PRAGMA_PROFILE) -> sqlite3.Connection:
     """
-    Create an in-memory SQLite connection and attach all dependant_datasets
-    for the given QuerySpec. This is basically the setup part of run_queryspec,
-    but without timing / reporting.
+    Create the in-memory SQLite connection every benchmark runs on, with the
+    connection settings of a PRAGMA profile (see execute.pragmas).
+    Datasets are attached separately with attach_datasets.
     """
-    conn = sqlite3.connect(":memory:")
-    conn.execute("PRAGMA temp_store=MEMORY;")
-    conn.execute("PRAGMA cache_size=-64000;")
-    conn.execute("PRAGMA journal_mode=OFF;")
-    conn.execute("PRAGMA synchronous=OFF;")
+    # room for every split statement of every spec, so compiled statements are reused
+    # uri=True lets attach_datasets use file: URIs (immutable strategy)
+    conn = sqlite3.connect(":memory:", cached_statements=512, uri=True)
+    for warning in apply_connection_pragmas(conn, profile):
+        if warning not in _PRAGMA_WARNINGS:
+            _PRAGMA_WARNINGS.add(warning)
+            emit("warn", f"[WARN] {warning}", level="warn")
     conn.row_factory = None
+    return conn
+
 
-    for dataset in spec.dependant_datasets:
-        dataset_sqlite_path = get_datalink_sqlite_path(dataset)
+def materialize_dataset(dataset: DataLink) -> Path:
+    """
+    Return the SQLite path for a dataset, downloading and converting it first
+    if it is not on disk yet. The star schema is built from its baseline
+    sources (transform.star_schema) and the derived datasets are copied from
+    theirs (dataset_copy_with_derived_columns) instead.
+    """
+    if dataset == STAR_DATASET:
+        star_path = Path(AppConfig.star_schema_db)
+        if not star_path.exists():
+            emit(
+                "dataset.materialize",
+                f"Star schema not found at {star_path}, going to build it...",
+                dataset=dataset.folder_name,
+            )
+            build_star_schema(star_path, {dl: materialize_dataset(dl) for dl in STAR_SOURCES})
+        return star_path
+    if dataset in DERIVED_SOURCES:
+        return dataset_copy_with_derived_columns(DERIVED_SOURCES[dataset])
 
-        if not dataset_sqlite_path.exists():
-            print(f"Dataset SQLite not found for {dataset.folder_name}, going to download and convert...")
-            fetch_accdb_from_datalink(dataset)
-            dataset_sqlite_path = convert_datalink_to_sqlite(dataset, verbose=True)
+    dataset_sqlite_path = get_datalink_sqlite_path(dataset)
 
-        run_sql(
-            conn,
-            f"ATTACH DATABASE '{dataset_sqlite_path.as_posix()}' AS '{dataset.folder_name}';",
+    if not dataset_sqlite_path.exists():
+        emit(
+            "dataset.materialize",
+            f"Dataset SQLite not found for {dataset.folder_name}, going to download and convert...",
+            dataset=dataset.folder_name,
         )
+        flush_events()  # the downloader and converter print directly
+        fetch_accdb_from_datalink(dataset)
+        dataset_sqlite_path = convert_datalink_to_sqlite(dataset, verbose=True)
+
+    return dataset_sqlite_path
+
+
+# How datasets are attached to a benchmark connection:
+# file      -> plain ATTACH of the dataset file (pager + file locking on every read)
+# immutable -> read-only file:...?immutable=1 URI, no locking or change detection
+# mmap      -> plain ATTACH with PRAGMA mmap_size, pages are read through a memory map
+# memory    -> the whole dataset deserialized into memory from a per-process
+#              template, so runs measure the query engine without storage I/O
+ATTACH_STRATEGIES = ("file", "immutable", "mmap", "memory")
+
+# serialized in-memory copy of every (dataset, page size) loaded with the memory strategy, per process
+_MEMORY_TEMPLATES: Dict[Tuple[str, Optional[int]], bytes] = {}
+
+
+def _file_uri(path: Path, query: str) -> str:
+    return f"file:{urllib.parse.quote(path.as_posix())}?{query}"
+
+
+def dataset_copy_with_page_size(dataset: DataLink, page_size: int) -> Path:
+    """
+    Path of a copy of a dataset rebuilt with another page size (VACUUM INTO),
+    stored next to the original as <name>.page<page_size>.db. The copy is
+    rebuilt whenever the original is newer.
+    """
+    source_path = materialize_dataset(dataset)
+    copy_path = source_path.with_name(f"{source_path.stem}.page{page_size}{source_path.suffix}")
+    if copy_path.exists() and copy_path.stat().st_mtime_ns >= source_path.stat().st_mtime_ns:
+        return copy_path
+    emit(
+        "dataset.rebuild",
+        f"[REBUILD] {dataset.folder_name} with page_size={page_size} -> {copy_path}",
+        dataset=dataset.folder_name,
+        page_size=page_size,
+    )
+    partial = copy_path.with_name(copy_path.name + ".partial")
+    partial.unlink(missing_ok=True)
+    conn = sqlite3.connect(str(source_path))
+    try:
+        # the page_size of an existing database only takes effect when it is vacuumed
+        conn.execute(f"PRAGMA page_size={int(page_size)};")
+        conn.execute("VACUUM INTO ?;", (str(partial),))
+    finally:
+        conn.close()
+    partial.replace(copy_path)
+    return copy_path
 
-    return conn
\ No newline at end of file
+
+def dataset_copy_with_derived_columns(dataset: DataLink, force: bool = False) -> Path:
+    """
+    Path of a copy of a baseline dataset with the indexed columns of
+    load.derived_columns, stored next to the original as <name>.derived.db
+    (the *_DERIVED datasets of app.datasets). The original is never changed.
+    The copy is rebuilt whenever the original is newer, or with force.
+    """
+    source_path = materialize_dataset(dataset)
+    copy_path = source_path.with_name(f"{source_path.stem}.derived{source_path.suffix}")
+    if not force and copy_path.exists() and copy_path.stat().st_mtime_ns >= source_path.stat().st_mtime_ns:
+        return copy_path
+    emit(
+        "dataset.rebuild",
+        f"[REBUILD] {dataset.folder_name} with derived columns -> {copy_path}",
+        dataset=dataset.folder_name,
+        derived_columns=True,
+    )
+    partial = copy_path.with_name(copy_path.name + ".partial")
+    partial.unlink(missing_ok=True)
+    conn = sqlite3.connect(str(source_path))
+    try:
+        conn.execute("VACUUM INTO ?;", (str(partial),))
+    finally:
+        conn.close()
+    add_derived_columns(partial)
+    partial.replace(copy_path)
+    return copy_path
+
+
+def dataset_path(dataset: DataLink, page_size: Optional[int] = None) -> Path:
+    """The dataset file to attach: the original, or its copy with page_size."""
+    if page_size is None:
+        return materialize_dataset(dataset)
+    return dataset_copy_with_page_size(dataset, page_size)
+
+
+def dataset_memory_template(dataset: DataLink, page_size: Optional[int] = None) -> bytes:
+    """
+    Serialized in-memory copy of a dataset. Built once per process by backing
+    the file up into an in-memory connection; every attach clones it.
+    """
+    key = (dataset.folder_name, page_size)
+    if key not in _MEMORY_TEMPLATES:
+        if not hasattr(sqlite3.Connection, "deserialize"):
+            raise RuntimeError("The memory attach strategy needs Python 3.11+ (sqlite3 serialize/deserialize).")
+        source = sqlite3.connect(_file_uri(dataset_path(dataset, page_size), "mode=ro"), uri=True)
+        template = sqlite3.connect(":memory:")
+        try:
+            source.backup(template)
+            _MEMORY_TEMPLATES[key] = template.serialize()
+        finally:
+            source.close()
+            template.close()
+    return _MEMORY_TEMPLATES[key]
+
+
+def attach_datasets(
+    conn: sqlite3.Connection,
+    datasets: List[DataLink],
+    strategy: str = "file",
+    mmap_size: int = 1 << 30,
+    profile: PragmaProfile = DEFAULT_PRAGMA_PROFILE,
+) -> None:
+    """
+    Attach every dataset under its folder_name with one of ATTACH_STRATEGIES.
+    Datasets that are already attached on this connection are skipped, so a
+    connection can be reused across QuerySpecs. mmap_size (bytes) is only
+    used by the mmap strategy.
+
+    The schema settings of the PRAGMA profile (cache_size, mmap_size) are
+    applied to every attached dataset, and with a profile page_size the
+    dataset is attached from a copy rebuilt with that page size.
+    """
+    if strategy not in ATTACH_STRATEGIES:
+        raise ValueError(f"Unknown attach strategy {strategy!r}, expected one of {ATTACH_STRATEGIES}")
+    attached = {row[1] for row in conn.execute("PRAGMA database_list;")}
+    for dataset in datasets or []:
+        if dataset.folder_name in attached:
+            continue
+        schema = dataset.folder_name
+        if strategy == "memory":
+            conn.execute(f"ATTACH DATABASE ':memory:' AS '{schema}';")
+            conn.deserialize(dataset_memory_template(dataset, profile.page_size), name=schema)
+        else:
+            path = dataset_path(dataset, profile.page_size)
+            if strategy == "immutable":
+                # needs a connection opened with uri=True, see open_benchmark_connection
+                conn.execute(f"ATTACH DATABASE '{_file_uri(path, 'immutable=1')}' AS '{schema}';")
+            else:
+                conn.execute(f"ATTACH DATABASE '{path.as_posix()}' AS '{schema}';")
+            if strategy == "mmap":
+                conn.execute(f'PRAGMA "{schema}".mmap_size={int(mmap_size)};')
+        for pragma in profile.schema_pragmas(schema):
+            conn.execute(pragma)
+        emit(
+            "dataset.attach",
+            f"[ATTACH] {schema} ({strategy}, profile {profile.name})",
+            dataset=schema,
+            strategy=strategy,
+            pragma_profile=profile.name,
+        )
+        attached.add(schema)
+
+
+def evict_from_os_cache(path: Path) -> bool:
+    """
+    Ask the kernel to drop a file's pages from the OS page cache
+    (posix_fadvise DONTNEED). Returns False on platforms without posix_fadvise.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return False
+    fd = os.open(str(path), os.O_RDONLY)
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+    return True
+
+
+def create_sqlite_conn_for_spec(
+    spec: QuerySpec,
+    profile: PragmaProfile = DEFAULT_PRAGMA_PROFILE,
+) -> sqlite3.Connection:
+    """
+    Create an in-memory SQLite connection and attach all dependant_datasets
+    for the given QuerySpec. This is basically the setup part of run_queryspec,
+    but without timing / reporting.
+    """
+    conn = open_benchmark_connection(profile)
+    attach_datasets(conn, spec.dependant_datasets, profile=profile)
+    return conn
@@ -0,0 +1,127 @@
+"""
+Automatic dataset-size sweeps.
+
+With `auto` in dataset_partitions_per_query, the dataset limits of a query are
+not listed by hand. They grow geometrically from a start value and the sweep
+stops as soon as going further is pointless or too expensive:
+
+  - the per-query time budget is spent, or the next size would overrun it
+  - a run timed out or failed, or the next size would likely hit timeout_seconds
+  - the input stopped growing: the limit is past the largest attached table
+
+Exhausted input is only detected through the table sizes. The VM steps of a
+cell would show it more precisely, but counting them (vm_step_granularity)
+is off by default and slows down the runs it counts, which are the measured
+runs of the sweep.
+
+The next size is only decided after the previous cell ran, so the sizes adapt
+to how each query scales. The sizes that ran are stored on the launch.
+"""
+import sqlite3
+import statistics
+from dataclasses import dataclass
+from typing import Iterator, List, Optional
+
+from execute.sql import open_benchmark_connection, attach_datasets
+from app.queries import QuerySpec
+from reporting.models import ResultRecord
+
+# dataset_partitions_per_query value that selects an automatic sweep
+AUTO_PARTITIONS = "auto"
+
+
+@dataclass(frozen=True)
+class AutoSweepPolicy:
+    start: int = 1000
+    growth: float = 2.0
+    # wall-clock seconds one query's sweep may take, runs of every size together
+    time_budget_s: float = 300.0
+    max_size: int = 10_000_000
+
+
+def auto_sweep_policy_from_config(exec_config) -> AutoSweepPolicy:
+    """AutoSweepPolicy from the auto_partition_* settings of an ExecutionConfig."""
+    return AutoSweepPolicy(
+        start=exec_config.auto_partition_start,
+        growth=exec_config.auto_partition_growth,
+        time_budget_s=exec_config.auto_partition_budget_seconds,
+        max_size=exec_config.auto_partition_max,
+    )
+
+
+def largest_table_rows(spec: QuerySpec) -> Optional[int]:
+    """
+    Row count of the largest table in the datasets a spec attaches. No LIMIT
+    above it can change what the query reads. None without datasets.
+    """
+    conn = open_benchmark_connection()
+    try:
+        attach_datasets(conn, spec.dependant_datasets)
+        largest = None
+        for dataset in spec.dependant_datasets or []:
+            tables = conn.execute(
+                f"SELECT name FROM \"{dataset.folder_name}\".sqlite_master WHERE type = 'table';"
+            ).fetchall()
+            for (table,) in tables:
+                try:
+                    (rows,) = conn.execute(
+                        f'SELECT COUNT(*) FROM "{dataset.folder_name}"."{table}";'
+                    ).fetchone()
+                except sqlite3.Error:
+                    continue
+                largest = rows if largest is None else max(largest, rows)
+        return largest
+    finally:
+        conn.close()
+
+
+class AutoSweep:
+    """
+    Iterable of dataset limits for one query. Feed every cell that ran back
+    through observe() before asking for the next limit; stop_reason says why
+    the sweep ended.
+    """
+
+    def __init__(
+        self,
+        policy: AutoSweepPolicy,
+        timeout_s: Optional[int] = None,
+        table_rows: Optional[int] = None,
+    ) -> None:
+        self.policy = policy
+        self.timeout_s = timeout_s
+        self.table_rows = table_rows
+        self.spent_s = 0.0
+        self.stop_reason: Optional[str] = None
+
+    def __iter__(self) -> Iterator[int]:
+        size = self.policy.start
+        while self.stop_reason is None:
+            if size > self.policy.max_size:
+                self.stop_reason = f"reached auto_partition_max={self.policy.max_size:,}"
+                break
+            yield size
+            if self.stop_reason is None and self.table_rows is not None and size >= self.table_rows:
+                self.stop_reason = f"rows={size:,} covers the largest table ({self.table_rows:,} rows)"
+                break
+            size = max(size + 1, int(round(size * self.policy.growth)))
+
+    def observe(self, limit: int, records: List[ResultRecord], cell_seconds: float) -> None:
+        """Account for a finished cell and decide whether the sweep goes on."""
+        self.spent_s += cell_seconds
+        growth = self.policy.growth
+        ok = [r for r in records if r.status == "ok"]
+
+        if any(r.status in ("timeout", "error") for r in records):
+            self.stop_reason = f"rows={limit:,} timed out or failed"
+            return
+        if self.spent_s >= self.policy.time_budget_s:
+            self.stop_reason = f"time budget of {self.policy.time_budget_s:g}s spent"
+            return
+        if self.spent_s + cell_seconds * growth > self.policy.time_budget_s:
+            self.stop_reason = f"next size would overrun the {self.policy.time_budget_s:g}s time budget"
+            return
+        if ok and self.timeout_s:
+            median = statistics.median(r.elapsed_seconds for r in ok)
+            if median * growth > self.timeout_s:
+                self.stop_reason = f"next size would likely exceed timeout_seconds={self.timeout_s}"
@@ -0,0 +1,168 @@
+"""
+Derived columns for copies of the baseline SQLite files.
+
+The baseline SQL filters on expressions SQLite cannot answer from an index:
+TRIM(UPPER(SUBGROUP_NAME)) LIKE 'ALL STUDENTS%', UPPER(ASSESSMENT_NAME) LIKE
+'%MATH%', ENTITY_NAME NOT LIKE '% SD' and CAST(YEAR AS INTEGER) on join keys.
+add_derived_columns evaluates them once per row at load time into plain
+columns (DERIVED_COLUMNS) and indexes those (DERIVED_INDEXES), so the
+sargable_query* variants compare stored values instead.
+
+Every index is probed with equality on all of its columns (plus a rowid
+range), and rows with equal keys are ordered by rowid in an index. A
+`LIMIT n` over the index lookup therefore returns the same rows as the
+full scans of the baseline queries.
+
+The columns would change what SELECT * of the baseline queries returns, so
+they are only added to copies of the baseline files (the *_DERIVED datasets
+of app.datasets, built by execute.sql.dataset_copy_with_derived_columns);
+the baseline files themselves are never changed.
+"""
+import argparse
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Tuple
+
+
+@dataclass(frozen=True)
+class DerivedColumn:
+    name: str
+    sql_type: str
+    expression: str  # over the source columns of the same row
+    sources: Tuple[str, ...]  # added to every table that has all of these
+
+
+DERIVED_COLUMNS = (
+    DerivedColumn("YEAR_INT", "INTEGER", "CAST(YEAR AS INTEGER)", ("YEAR",)),
+    # 'ALL' is exactly the rows create_math_overall.sql keeps; other subgroups keep their normalized name
+    DerivedColumn(
+        "SUBGROUP_CODE",
+        "TEXT",
+        "CASE WHEN TRIM(UPPER(SUBGROUP_NAME)) LIKE 'ALL STUDENTS%' THEN 'ALL' ELSE TRIM(UPPER(SUBGROUP_NAME)) END",
+        ("SUBGROUP_NAME",),
+    ),
+    # MATH is tested first, so SUBJECT_CODE = 'MATH' matches UPPER(ASSESSMENT_NAME) LIKE '%MATH%' row for row
+    DerivedColumn(
+        "SUBJECT_CODE",
+        "TEXT",
+        "CASE WHEN UPPER(ASSESSMENT_NAME) LIKE '%MATH%' THEN 'MATH' "
+        "WHEN UPPER(ASSESSMENT_NAME) LIKE '%ELA%' THEN 'ELA' "
+        "ELSE TRIM(UPPER(ASSESSMENT_NAME)) END",
+        ("ASSESSMENT_NAME",),
+    ),
+    # NULL for a NULL name, like the NOT LIKE it replaces
+    DerivedColumn("IS_DISTRICT", "INTEGER", "ENTITY_NAME LIKE '% SD'", ("ENTITY_NAME",)),
+)
+
+# (index, table, columns); created in every file that has the table. Each
+# query can use only one of them, so the planner cannot pick an index that
+# returns the rows out of rowid order.
+DERIVED_INDEXES = (
+    ("ix_em_math_year_subgroup", "Annual EM MATH", ("YEAR_INT", "SUBGROUP_CODE")),
+    ("ix_em_math_subject_subgroup", "Annual EM MATH", ("SUBJECT_CODE", "SUBGROUP_CODE")),
+    ("ix_em_ela_year_subgroup", "Annual EM ELA", ("YEAR_INT", "SUBGROUP_CODE")),
+    ("ix_em_ela_subject_subgroup", "Annual EM ELA", ("SUBJECT_CODE", "SUBGROUP_CODE")),
+    ("ix_attendance_year", "Attendance", ("YEAR_INT",)),
+    ("ix_expenditures_year", "Expenditures per Pupil", ("YEAR_INT",)),
+    ("ix_demographics_entity_year", "Demographic Factors", ("ENTITY_CD", "YEAR_INT")),
+)
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _tables(conn: sqlite3.Connection) -> List[str]:
+    return [
+        name
+        for (name,) in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name;"
+        )
+    ]
+
+
+def _columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    return [row[1].upper() for row in conn.execute(f"PRAGMA table_info({_quote(table)});")]
+
+
+def _indexes(conn: sqlite3.Connection) -> set:
+    return {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index';")}
+
+
+def add_derived_columns(sqlite_path: Path, verbose: bool = False) -> List[str]:
+    """
+    Add the missing DERIVED_COLUMNS and DERIVED_INDEXES to a SQLite file and
+    ANALYZE the tables that changed. A no-op (read-only) when everything is
+    there already. Returns the changed tables.
+    """
+    conn = sqlite3.connect(str(sqlite_path), isolation_level=None)
+    changed: List[str] = []
+    try:
+        existing_indexes = _indexes(conn)
+        conn.execute("BEGIN;")
+        for table in _tables(conn):
+            columns = _columns(conn, table)
+            missing = [
+                dc for dc in DERIVED_COLUMNS
+                if dc.name not in columns and all(src in columns for src in dc.sources)
+            ]
+            for dc in missing:
+                conn.execute(f"ALTER TABLE {_quote(table)} ADD COLUMN {dc.name} {dc.sql_type};")
+            if missing:
+                assignments = ", ".join(f"{dc.name} = {dc.expression}" for dc in missing)
+                conn.execute(f"UPDATE {_quote(table)} SET {assignments};")
+                columns += [dc.name for dc in missing]
+
+            created = False
+            for name, index_table, index_columns in DERIVED_INDEXES:
+                if index_table != table or name in existing_indexes:
+                    continue
+                if all(col in columns for col in index_columns):
+                    conn.execute(f"CREATE INDEX {name} ON {_quote(table)}({', '.join(index_columns)});")
+                    created = True
+
+            if missing or created:
+                conn.execute(f"ANALYZE {_quote(table)};")
+                changed.append(table)
+                if verbose:
+                    added = ", ".join(dc.name for dc in missing) or "indexes only"
+                    print(f"✔ Derived columns: {table} ({added})")
+        conn.execute("COMMIT;")
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK;")
+        raise
+    finally:
+        conn.close()
+    return changed
+
+
+def derive_columns_cli() -> None:
+    """
+    CLI entry point: build the derived copies of the baseline datasets.
+
+    Example:
+        derive_columns
+        derive_columns --datasets reportcard_database_23_24 --force
+    """
+    from app.datasets import DERIVED_SOURCES
+    from execute.sql import dataset_copy_with_derived_columns
+
+    datasets = {dl.folder_name: dl for dl in DERIVED_SOURCES.values()}
+    parser = argparse.ArgumentParser(description="Build the copies with derived columns the sargable_query* variants run on.")
+    parser.add_argument(
+        "--datasets",
+        type=lambda s: [x.strip() for x in s.split(",") if x.strip()],
+        default=list(datasets),
+        help=f"Comma-separated baseline dataset folder names (default: {','.join(datasets)})",
+    )
+    parser.add_argument("--force", action="store_true", help="Rebuild copies that are up to date")
+    args = parser.parse_args()
+    unknown = [name for name in args.datasets if name not in datasets]
+    if unknown:
+        parser.error(f"Unknown datasets {unknown}, expected some of {list(datasets)}")
+
+    for name in args.datasets:
+        path = dataset_copy_with_derived_columns(datasets[name], force=args.force)
+        print(f"{name}: {path}")
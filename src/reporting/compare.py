@@ -0,0 +1,250 @@
+"""
+Statistical comparison of two query versions (or two launches).
+
+dual_plot shows two latency curves; compare gives a verdict per dataset size.
+The raw QueryResult runs of both sides are compared with a two-sided
+Mann-Whitney U test, and the ratio of their P50s (new / base) gets a
+percentile-bootstrap confidence interval. A size is a regression when the
+difference is significant (p < alpha) and the new P50 is more than
+`threshold` slower; compare_cli exits with status 1 when any size is.
+
+Bootstrap resamples are drawn as (samples, runs) index matrices and reduced
+with NumPy along an axis, so pooling every launch of a version stays fast.
+"""
+import argparse
+import sqlite3
+import sys
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy.stats import mannwhitneyu
+
+from app import AppConfig
+from reporting.plotter import METRICS, metric_by_size, select_launch_ids
+from reporting.setup import get_database_connection
+
+# verdict of one dataset size
+REGRESSION = "REGRESSION"
+SPEEDUP = "speedup"
+WITHIN_THRESHOLD = "within threshold"  # significant, but smaller than the threshold
+NO_CHANGE = "no change"
+TOO_FEW_RUNS = "too few runs"
+
+MIN_RUNS = 2  # per side; Mann-Whitney U says nothing useful below that
+# largest resample matrix built at once, in elements
+_BOOTSTRAP_CHUNK = 2_000_000
+
+
+@dataclass
+class SizeComparison:
+    dataset_size: int
+    base_runs: int
+    new_runs: int
+    base_p50: float
+    new_p50: float
+    ratio: float  # new P50 / base P50, > 1 means slower
+    ratio_ci: Tuple[float, float]
+    u_statistic: float
+    p_value: float
+    verdict: str
+
+
+def _bootstrap_medians(values: np.ndarray, samples: int, rng: np.random.Generator) -> np.ndarray:
+    """P50 of `samples` bootstrap resamples of values, built in bounded chunks."""
+    n = len(values)
+    chunk = max(1, _BOOTSTRAP_CHUNK // n)
+    medians = np.empty(samples)
+    for start in range(0, samples, chunk):
+        stop = min(samples, start + chunk)
+        medians[start:stop] = np.median(values[rng.integers(0, n, size=(stop - start, n))], axis=1)
+    return medians
+
+
+def p50_ratio_ci(
+    base: np.ndarray,
+    new: np.ndarray,
+    confidence: float = 0.95,
+    samples: int = 2000,
+    rng: Optional[np.random.Generator] = None,
+) -> Tuple[float, float]:
+    """Percentile-bootstrap confidence interval of median(new) / median(base)."""
+    rng = rng or np.random.default_rng(0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratios = _bootstrap_medians(new, samples, rng) / _bootstrap_medians(base, samples, rng)
+    ratios = ratios[np.isfinite(ratios)]
+    if len(ratios) == 0:
+        return float("nan"), float("nan")
+    alpha = (1.0 - confidence) / 2.0
+    low, high = np.quantile(ratios, [alpha, 1.0 - alpha])
+    return float(low), float(high)
+
+
+def compare_samples(
+    dataset_size: int,
+    base: Sequence[float],
+    new: Sequence[float],
+    threshold: float,
+    alpha: float,
+    bootstrap_samples: int = 2000,
+    rng: Optional[np.random.Generator] = None,
+) -> SizeComparison:
+    """Compare the runs of one dataset size, see the module docstring for the verdicts."""
+    base_arr = np.asarray(base, dtype=float)
+    new_arr = np.asarray(new, dtype=float)
+    base_p50 = float(np.median(base_arr))
+    new_p50 = float(np.median(new_arr))
+    ratio = new_p50 / base_p50 if base_p50 > 0 else float("inf")
+
+    if len(base_arr) < MIN_RUNS or len(new_arr) < MIN_RUNS:
+        return SizeComparison(
+            dataset_size, len(base_arr), len(new_arr), base_p50, new_p50, ratio,
+            (float("nan"), float("nan")), float("nan"), float("nan"), TOO_FEW_RUNS,
+        )
+
+    u_statistic, p_value = mannwhitneyu(new_arr, base_arr, alternative="two-sided")
+    ratio_ci = p50_ratio_ci(base_arr, new_arr, 1.0 - alpha, bootstrap_samples, rng)
+    if p_value >= alpha:
+        verdict = NO_CHANGE
+    elif ratio > 1.0 + threshold:
+        verdict = REGRESSION
+    elif ratio < 1.0 / (1.0 + threshold):
+        verdict = SPEEDUP
+    else:
+        verdict = WITHIN_THRESHOLD
+    return SizeComparison(
+        dataset_size, len(base_arr), len(new_arr), base_p50, new_p50, ratio,
+        ratio_ci, float(u_statistic), float(p_value), verdict,
+    )
+
+
+def compare_launches(
+    cur: sqlite3.Cursor,
+    base_launch_ids: List[int],
+    new_launch_ids: List[int],
+    *,
+    metric: str = "elapsed_seconds",
+    threshold: float = 0.05,
+    alpha: float = 0.05,
+) -> List[SizeComparison]:
+    """Compare the runs of two sets of launches at every dataset size both have runs at."""
+    base = metric_by_size(cur, base_launch_ids, metric)
+    new = metric_by_size(cur, new_launch_ids, metric)
+    sizes = sorted(set(base) & set(new))
+    if not sizes:
+        raise ValueError("The two selections have no dataset size in common.")
+    rng = np.random.default_rng(0)
+    return [compare_samples(size, base[size], new[size], threshold, alpha, rng=rng) for size in sizes]
+
+
+def format_comparison_table(rows: List[SizeComparison], metric: str, alpha: float) -> List[str]:
+    """The comparison as fixed-width table lines."""
+    unit = "s" if metric == "elapsed_seconds" else ""
+    ci_label = f"{1.0 - alpha:.0%} CI"
+    lines = [
+        f"{'rows':>12} {'base n':>7} {'new n':>6} {'base P50':>12} {'new P50':>12} "
+        f"{'new/base':>9} {ci_label:>17} {'p':>9}  verdict",
+    ]
+    for r in rows:
+        ci = f"[{r.ratio_ci[0]:.3f}, {r.ratio_ci[1]:.3f}]"
+        p_value = "-" if np.isnan(r.p_value) else f"{r.p_value:.2g}"
+        lines.append(
+            f"{r.dataset_size:>12,} {r.base_runs:>7} {r.new_runs:>6} "
+            f"{r.base_p50:>11.4g}{unit} {r.new_p50:>11.4g}{unit} "
+            f"{r.ratio:>9.3f} {ci:>17} {p_value:>9}  {r.verdict}"
+        )
+    return lines
+
+
+def compare_cli() -> None:
+    """
+    CLI entry point for compare. Exits with status 1 when any dataset size
+    is a significant regression of more than the threshold.
+
+    Example:
+        compare baseline_query2 1.2 baseline_query2 2.2
+        compare baseline_query2 1.2 baseline_query2 2.2 --all-launches --threshold 0.1
+        compare --launches 12 17 --metric vm_steps
+    """
+    exec_config = AppConfig.load_execution_config()
+    parser = argparse.ArgumentParser(
+        description="Test whether a query version (or launch) is significantly slower than another, per dataset size."
+    )
+    parser.add_argument("base_name", nargs="?", help="Name of the base query")
+    parser.add_argument("base_version", nargs="?", help="Version of the base query")
+    parser.add_argument("new_name", nargs="?", help="Name of the query to check")
+    parser.add_argument("new_version", nargs="?", help="Version of the query to check")
+    parser.add_argument(
+        "--launches",
+        nargs=2,
+        type=int,
+        metavar=("BASE_LAUNCH", "NEW_LAUNCH"),
+        help="Compare two launch IDs instead of two query versions",
+    )
+    parser.add_argument(
+        "--all-launches",
+        action="store_true",
+        help="Pool every launch of each version instead of only the latest",
+    )
+    parser.add_argument(
+        "--metric",
+        choices=tuple(METRICS),
+        default="elapsed_seconds",
+        help="Metric to compare (default: elapsed_seconds)",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=exec_config.regression_threshold,
+        help="Relative P50 slowdown that counts as a regression, e.g. 0.05 for 5%% "
+        "(defaults to regression_threshold from execution_config)",
+    )
+    parser.add_argument(
+        "--alpha",
+        type=float,
+        default=exec_config.regression_alpha,
+        help="Significance level of the test and 1 - confidence of the ratio CI "
+        "(defaults to regression_alpha from execution_config)",
+    )
+
+    args = parser.parse_args()
+    versions = (args.base_name, args.base_version, args.new_name, args.new_version)
+    if args.launches is None and not all(versions):
+        parser.error("give base_name base_version new_name new_version, or --launches BASE_LAUNCH NEW_LAUNCH")
+    if args.threshold < 0:
+        parser.error("--threshold must be >= 0")
+    if not 0 < args.alpha < 1:
+        parser.error("--alpha must be between 0 and 1")
+
+    con = get_database_connection()
+    try:
+        cur = con.cursor()
+        if args.launches:
+            base_ids, new_ids = [args.launches[0]], [args.launches[1]]
+            base_label, new_label = f"launch {base_ids[0]}", f"launch {new_ids[0]}"
+        else:
+            latest_only = not args.all_launches
+            base_ids = select_launch_ids(cur, args.base_name, args.base_version, latest_only=latest_only)
+            new_ids = select_launch_ids(cur, args.new_name, args.new_version, latest_only=latest_only)
+            base_label = f"{args.base_name} v{args.base_version} (launches {', '.join(map(str, base_ids))})"
+            new_label = f"{args.new_name} v{args.new_version} (launches {', '.join(map(str, new_ids))})"
+        rows = compare_launches(
+            cur, base_ids, new_ids, metric=args.metric, threshold=args.threshold, alpha=args.alpha
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    finally:
+        con.close()
+
+    print(f"[COMPARE] base: {base_label}")
+    print(f"[COMPARE] new:  {new_label}")
+    print(f"[COMPARE] {args.metric}, Mann-Whitney U two-sided, alpha={args.alpha:g}, threshold={args.threshold:.1%}\n")
+    print("\n".join(format_comparison_table(rows, args.metric, args.alpha)))
+
+    regressions = [r for r in rows if r.verdict == REGRESSION]
+    if regressions:
+        sizes = ", ".join(f"{r.dataset_size:,}" for r in regressions)
+        print(f"\n[REGRESSION] {len(regressions)} dataset size(s) slower by more than {args.threshold:.1%}: {sizes}")
+    else:
+        print(f"\nNo significant regression above {args.threshold:.1%}.")
+    sys.exit(1 if regressions else 0)
@@ -1,12 +1,66 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
 import time
 
+# ok      -> the run finished, elapsed_seconds is set
+# timeout -> the watchdog interrupted the run
+# error   -> SQLite raised an error
+# outlier -> finished, but discarded by the adaptive run count and run again
+# warmup  -> finished warmup run before the counted runs (run_index <= 0)
+RESULT_STATUSES = ("ok", "timeout", "error", "outlier", "warmup")
+
+# benchmark -> timed runs of one query at a time, stored in QueryResult
+# load      -> concurrent clients hammering one query, stored in LoadTestResult (see execute.loadtest)
+LAUNCH_TYPES = ("benchmark", "load")
+
 @dataclass
 class QueryLaunch:
     launch_ID: str
     timestamp: str
     query_name: str
     query_version: str
+    cache_mode: str = "warm"
+    dataset_sizes: Optional[List[int]] = None  # dataset limits the launch ran, in order
+    settings: Optional[Dict] = None  # measurement settings in effect (warmups, low noise, affinity, nice)
+    pragma_profile: Optional[str] = None  # name of the PRAGMA profile (execute.pragmas), None before profiles existed
+    launch_type: str = "benchmark"  # one of LAUNCH_TYPES
+    comparison_ID: Optional[str] = None  # set on the arms of an interleaved A/B comparison (see execute.ab)
+
+@dataclass
+class Comparison:
+    """Interleaved A/B run of several query versions; every arm is a QueryLaunch with this comparison_ID."""
+    comparison_ID: str
+    timestamp: str
+    label: str
+    seed: int  # seed of the randomized run order
+    settings: Optional[Dict] = None
+
+@dataclass
+class QueryStepResult:
+    step_ID: str
+    result_ID: str
+    sql_file: str
+    statement_index: int
+    elapsed_seconds: float
+    rows: Optional[int] = None
+    approx_bytes: Optional[int] = None
+    vm_steps: Optional[int] = None
+
+@dataclass
+class ResourceUsage:
+    """What one run used, from getrusage and /proc deltas (see execute.resources); None where unavailable."""
+    result_ID: str
+    user_cpu_seconds: Optional[float] = None
+    sys_cpu_seconds: Optional[float] = None
+    minor_faults: Optional[int] = None
+    major_faults: Optional[int] = None
+    voluntary_ctx_switches: Optional[int] = None
+    involuntary_ctx_switches: Optional[int] = None
+    read_bytes: Optional[int] = None  # from storage
+    write_bytes: Optional[int] = None  # to storage
+    read_chars: Optional[int] = None  # through read() calls, page cache hits included
+    write_chars: Optional[int] = None
+    peak_rss_bytes: Optional[int] = None
 
 @dataclass
 class ResultRecord:
@@ -14,7 +68,57 @@ class ResultRecord:
     launch_ID: str
     dataset_size: int
     run_index: int
-    elapsed_seconds: float
+    elapsed_seconds: Optional[float]  # None when the run did not finish
+    vm_steps: Optional[int] = None
+    status: str = "ok"  # one of RESULT_STATUSES
+    cell_hash: Optional[str] = None  # see execute.cellhash
+    steps: List[QueryStepResult] = field(default_factory=list)
+    resources: Optional[ResourceUsage] = None  # None when resource accounting was off
+
+@dataclass
+class QueryPlan:
+    plan_ID: str
+    launch_ID: str
+    query_name: str
+    query_version: str
+    sql_file: str
+    statement_index: int
+    # EXPLAIN QUERY PLAN rows as (id, parent, detail); parent 0 is the root
+    plan: List[Tuple[int, int, str]] = field(default_factory=list)
+
+@dataclass
+class CellStats:
+    """Achieved latency estimate of one (launch, dataset size) cell."""
+    cell_stats_ID: str
+    launch_ID: str
+    dataset_size: int
+    runs: int  # successful runs the estimate is based on
+    outliers: int
+    p50: Optional[float]
+    p50_ci_low: Optional[float]
+    p50_ci_high: Optional[float]
+    p95: Optional[float]
+    p95_ci_low: Optional[float]
+    p95_ci_high: Optional[float]
+    converged: Optional[bool] = None  # None when the run count was fixed
+
+@dataclass
+class LoadTestResult:
+    """Throughput and latency of one client count of a load-test launch."""
+    load_result_ID: str
+    launch_ID: str
+    dataset_size: int
+    clients: int
+    client_mode: str  # thread | process
+    duration_seconds: float  # wall time from the first request to the last one finishing
+    requests: int  # successful requests
+    errors: int
+    timeouts: int
+    qps: float
+    p50: Optional[float]
+    p95: Optional[float]
+    p99: Optional[float]
+    max_latency: Optional[float]
 
 @dataclass
 class DataReportingModel:
@@ -22,19 +126,47 @@ class DataReportingModel:
     result_records: list[ResultRecord]
 
 from app.queries import QuerySpec
-def create_launch_from_query(query: QuerySpec) -> QueryLaunch:
+def create_launch_from_query(
+    query: QuerySpec,
+    cache_mode: str = "warm",
+    dataset_sizes: Optional[List[int]] = None,
+    settings: Optional[Dict] = None,
+    pragma_profile: Optional[str] = None,
+    launch_type: str = "benchmark",
+    comparison_ID: Optional[str] = None,
+) -> QueryLaunch:
     return QueryLaunch(
         launch_ID="",
         timestamp=time.strftime("%Y-%m-%d %H:%M:%S"),
         query_name=query.name,
         query_version=query.version,
+        cache_mode=cache_mode,
+        dataset_sizes=dataset_sizes,
+        settings=settings,
+        pragma_profile=pragma_profile,
+        launch_type=launch_type,
+        comparison_ID=comparison_ID,
+    )
+
+def create_comparison(label: str, seed: int, settings: Optional[Dict] = None) -> Comparison:
+    return Comparison(
+        comparison_ID="",
+        timestamp=time.strftime("%Y-%m-%d %H:%M:%S"),
+        label=label,
+        seed=seed,
+        settings=settings,
     )
 
 def create_result_record(
     launch_ID: str,
     dataset_size: int,
     run_index: int,
-    elapsed_seconds: float,
+    elapsed_seconds: Optional[float],
+    steps: Optional[List[QueryStepResult]] = None,
+    vm_steps: Optional[int] = None,
+    status: str = "ok",
+    cell_hash: Optional[str] = None,
+    resources: Optional[ResourceUsage] = None,
 ) -> ResultRecord:
     return ResultRecord(
         result_ID="",
@@ -42,4 +174,128 @@ def create_result_record(
         dataset_size=dataset_size,
         run_index=run_index,
         elapsed_seconds=elapsed_seconds,
-    )
\ No newline at end of file
+        vm_steps=vm_steps,
+        status=status,
+        cell_hash=cell_hash,
+        steps=steps or [],
+        resources=resources,
+    )
+
+def create_step_result(
+    sql_file: str,
+    statement_index: int,
+    elapsed_seconds: float,
+    rows: Optional[int] = None,
+    approx_bytes: Optional[int] = None,
+    vm_steps: Optional[int] = None,
+) -> QueryStepResult:
+    return QueryStepResult(
+        step_ID="",
+        result_ID="",
+        sql_file=sql_file,
+        statement_index=statement_index,
+        elapsed_seconds=elapsed_seconds,
+        rows=rows,
+        approx_bytes=approx_bytes,
+        vm_steps=vm_steps,
+    )
+
+def create_resource_usage(
+    user_cpu_seconds: Optional[float] = None,
+    sys_cpu_seconds: Optional[float] = None,
+    minor_faults: Optional[int] = None,
+    major_faults: Optional[int] = None,
+    voluntary_ctx_switches: Optional[int] = None,
+    involuntary_ctx_switches: Optional[int] = None,
+    read_bytes: Optional[int] = None,
+    write_bytes: Optional[int] = None,
+    read_chars: Optional[int] = None,
+    write_chars: Optional[int] = None,
+    peak_rss_bytes: Optional[int] = None,
+) -> ResourceUsage:
+    return ResourceUsage(
+        result_ID="",
+        user_cpu_seconds=user_cpu_seconds,
+        sys_cpu_seconds=sys_cpu_seconds,
+        minor_faults=minor_faults,
+        major_faults=major_faults,
+        voluntary_ctx_switches=voluntary_ctx_switches,
+        involuntary_ctx_switches=involuntary_ctx_switches,
+        read_bytes=read_bytes,
+        write_bytes=write_bytes,
+        read_chars=read_chars,
+        write_chars=write_chars,
+        peak_rss_bytes=peak_rss_bytes,
+    )
+
+def create_query_plan(
+    launch_ID: str,
+    query: QuerySpec,
+    sql_file: str,
+    statement_index: int,
+    plan: List[Tuple[int, int, str]],
+) -> QueryPlan:
+    return QueryPlan(
+        plan_ID="",
+        launch_ID=launch_ID,
+        query_name=query.name,
+        query_version=query.version,
+        sql_file=sql_file,
+        statement_index=statement_index,
+        plan=plan,
+    )
+
+def create_cell_stats(
+    launch_ID: str,
+    dataset_size: int,
+    runs: int,
+    outliers: int,
+    p50: Optional[float],
+    p50_ci: Optional[Tuple[float, float]],
+    p95: Optional[float],
+    p95_ci: Optional[Tuple[float, float]],
+    converged: Optional[bool] = None,
+) -> CellStats:
+    return CellStats(
+        cell_stats_ID="",
+        launch_ID=launch_ID,
+        dataset_size=dataset_size,
+        runs=runs,
+        outliers=outliers,
+        p50=p50,
+        p50_ci_low=p50_ci[0] if p50_ci else None,
+        p50_ci_high=p50_ci[1] if p50_ci else None,
+        p95=p95,
+        p95_ci_low=p95_ci[0] if p95_ci else None,
+        p95_ci_high=p95_ci[1] if p95_ci else None,
+        converged=converged,
+    )
+def create_load_test_result(
+    launch_ID: str,
+    dataset_size: int,
+    clients: int,
+    client_mode: str,
+    duration_seconds: float,
+    requests: int,
+    errors: int,
+    timeouts: int,
+    latency_percentiles: Optional[Dict[str, float]] = None,
+) -> LoadTestResult:
+    """latency_percentiles holds p50, p95, p99 and max; None when no request succeeded."""
+    pct = latency_percentiles or {}
+    return LoadTestResult(
+        load_result_ID="",
+        launch_ID=launch_ID,
+        dataset_size=dataset_size,
+        clients=clients,
+        client_mode=client_mode,
+        duration_seconds=duration_seconds,
+        requests=requests,
+        errors=errors,
+        timeouts=timeouts,
+        qps=requests / duration_seconds if duration_seconds > 0 else 0.0,
+        p50=pct.get("p50"),
+        p95=pct.get("p95"),
+        p99=pct.get("p99"),
+        max_latency=pct.get("max"),
+    )
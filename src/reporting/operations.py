@@ -1,22 +1,26 @@
 
 # ---------- QueryLaunch CRUD ----------
 from typing import Optional
+import json
 import sqlite3
+import time
 
-from reporting.models import QueryLaunch, ResultRecord
+from reporting.models import QueryLaunch, ResultRecord, QueryStepResult, QueryPlan, CellStats, LoadTestResult, ResourceUsage, Comparison
 
 def create_query_launch(conn: sqlite3.Connection, launch: QueryLaunch) -> QueryLaunch:
     """
     Insert a QueryLaunch. If launch_ID is falsy, it will be auto-assigned.
     Returns the inserted object with launch_ID populated if auto-assigned.
     """
-    params = [launch.timestamp, launch.query_name, launch.query_version]
+    sizes_json = json.dumps(launch.dataset_sizes) if launch.dataset_sizes is not None else None
+    settings_json = json.dumps(launch.settings) if launch.settings is not None else None
+    params = [launch.timestamp, launch.query_name, launch.query_version, launch.cache_mode, sizes_json, settings_json, launch.pragma_profile, launch.launch_type, launch.comparison_ID]
 
     if launch.launch_ID:  # caller provided an explicit ID
-        sql = "INSERT INTO QueryLaunch (launch_ID, timestamp, query_name, query_version) VALUES (?, ?, ?, ?)"
+        sql = "INSERT INTO QueryLaunch (launch_ID, timestamp, query_name, query_version, cache_mode, dataset_sizes, settings, pragma_profile, launch_type, comparison_ID) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
         conn.execute(sql, [launch.launch_ID] + params)
     else:
-        sql = "INSERT INTO QueryLaunch (timestamp, query_name, query_version) VALUES (?, ?, ?)"
+        sql = "INSERT INTO QueryLaunch (timestamp, query_name, query_version, cache_mode, dataset_sizes, settings, pragma_profile, launch_type, comparison_ID) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
         cur = conn.execute(sql, params)
         launch.launch_ID = str(cur.lastrowid)
 
@@ -28,7 +32,7 @@ def read_query_launch(conn: sqlite3.Connection, launch_ID: str) -> Optional[Quer
     """Fetch a QueryLaunch by primary key, or None if not found."""
     conn.row_factory = sqlite3.Row
     cur = conn.execute(
-        "SELECT launch_ID, timestamp, query_name, query_version "
+        "SELECT launch_ID, timestamp, query_name, query_version, cache_mode, dataset_sizes, settings, pragma_profile, launch_type, comparison_ID "
         "FROM QueryLaunch WHERE launch_ID = ?", (launch_ID,)
     )
     row = cur.fetchone()
@@ -39,6 +43,12 @@ def read_query_launch(conn: sqlite3.Connection, launch_ID: str) -> Optional[Quer
         timestamp=row["timestamp"],
         query_name=row["query_name"],
         query_version=row["query_version"],
+        cache_mode=row["cache_mode"],
+        dataset_sizes=json.loads(row["dataset_sizes"]) if row["dataset_sizes"] else None,
+        settings=json.loads(row["settings"]) if row["settings"] else None,
+        pragma_profile=row["pragma_profile"],
+        launch_type=row["launch_type"],
+        comparison_ID=str(row["comparison_ID"]) if row["comparison_ID"] is not None else None,
     )
 
 
@@ -50,9 +60,20 @@ def update_query_launch(conn: sqlite3.Connection, launch: QueryLaunch) -> int:
     if not launch.launch_ID:
         raise ValueError("launch_ID is required for update")
     cur = conn.execute(
-        "UPDATE QueryLaunch SET timestamp = ?, query_name = ?, query_version = ? "
+        "UPDATE QueryLaunch SET timestamp = ?, query_name = ?, query_version = ?, cache_mode = ?, dataset_sizes = ?, settings = ?, pragma_profile = ?, launch_type = ?, comparison_ID = ? "
         "WHERE launch_ID = ?",
-        (launch.timestamp, launch.query_name, launch.query_version, launch.launch_ID),
+        (
+            launch.timestamp,
+            launch.query_name,
+            launch.query_version,
+            launch.cache_mode,
+            json.dumps(launch.dataset_sizes) if launch.dataset_sizes is not None else None,
+            json.dumps(launch.settings) if launch.settings is not None else None,
+            launch.pragma_profile,
+            launch.launch_type,
+            launch.comparison_ID,
+            launch.launch_ID,
+        ),
     )
     conn.commit()
     return cur.rowcount
@@ -65,6 +86,50 @@ def delete_query_launch(conn: sqlite3.Connection, launch_ID: str) -> int:
     return cur.rowcount
 
 
+# ---------- Comparison CRUD ----------
+
+def insert_comparison(conn: sqlite3.Connection, comparison: Comparison) -> Comparison:
+    """Insert a Comparison; comparison_ID is auto-assigned when falsy."""
+    settings_json = json.dumps(comparison.settings) if comparison.settings is not None else None
+    params = [comparison.timestamp, comparison.label, comparison.seed, settings_json]
+    if comparison.comparison_ID:
+        conn.execute(
+            "INSERT INTO Comparison (comparison_ID, timestamp, label, seed, settings) VALUES (?, ?, ?, ?, ?)",
+            [comparison.comparison_ID] + params,
+        )
+    else:
+        cur = conn.execute("INSERT INTO Comparison (timestamp, label, seed, settings) VALUES (?, ?, ?, ?)", params)
+        comparison.comparison_ID = str(cur.lastrowid)
+    conn.commit()
+    return comparison
+
+
+def read_comparison(conn: sqlite3.Connection, comparison_ID: str) -> Optional[Comparison]:
+    """Fetch a Comparison by primary key, or None if not found."""
+    conn.row_factory = sqlite3.Row
+    row = conn.execute(
+        "SELECT comparison_ID, timestamp, label, seed, settings FROM Comparison WHERE comparison_ID = ?",
+        (comparison_ID,),
+    ).fetchone()
+    if not row:
+        return None
+    return Comparison(
+        comparison_ID=str(row["comparison_ID"]),
+        timestamp=row["timestamp"],
+        label=row["label"],
+        seed=row["seed"],
+        settings=json.loads(row["settings"]) if row["settings"] else None,
+    )
+
+
+def read_comparison_launch_ids(conn: sqlite3.Connection, comparison_ID: str) -> list[str]:
+    """Launch IDs of the arms of a comparison, in arm order (the first arm is the baseline)."""
+    rows = conn.execute(
+        "SELECT launch_ID FROM QueryLaunch WHERE comparison_ID = ? ORDER BY launch_ID", (comparison_ID,)
+    ).fetchall()
+    return [str(r[0]) for r in rows]
+
+
 # ---------- ResultRecord CRUD ----------
 
 def insert_new_result_record(conn: sqlite3.Connection, rec: ResultRecord) -> ResultRecord:
@@ -72,17 +137,24 @@ def insert_new_result_record(conn: sqlite3.Connection, rec: ResultRecord) -> Res
     Insert a ResultRecord. If result_ID is falsy, it will be auto-assigned.
     Returns the inserted object with result_ID populated if auto-assigned.
     """
-    cols = ["launch_ID", "dataset_size", "run_index", "elapsed_seconds"]
-    params = [rec.launch_ID, rec.dataset_size, rec.run_index, rec.elapsed_seconds]
+    cols = ["launch_ID", "dataset_size", "run_index", "elapsed_seconds", "vm_steps", "status", "cell_hash"]
+    params = [rec.launch_ID, rec.dataset_size, rec.run_index, rec.elapsed_seconds, rec.vm_steps, rec.status, rec.cell_hash]
 
     if rec.result_ID:  # explicit result id provided
-        sql = "INSERT INTO QueryResult (result_ID, launch_ID, dataset_size, run_index, elapsed_seconds) VALUES (?, ?, ?, ?, ?)"
+        sql = "INSERT INTO QueryResult (result_ID, launch_ID, dataset_size, run_index, elapsed_seconds, vm_steps, status, cell_hash) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
         conn.execute(sql, [rec.result_ID] + params)
     else:
-        sql = "INSERT INTO QueryResult (launch_ID, dataset_size, run_index, elapsed_seconds) VALUES (?, ?, ?, ?)"
+        sql = "INSERT INTO QueryResult (launch_ID, dataset_size, run_index, elapsed_seconds, vm_steps, status, cell_hash) VALUES (?, ?, ?, ?, ?, ?, ?)"
         cur = conn.execute(sql, params)
         rec.result_ID = str(cur.lastrowid)
 
+    for step in rec.steps:
+        step.result_ID = rec.result_ID
+        insert_step_result(conn, step, commit=False)
+    if rec.resources is not None:
+        rec.resources.result_ID = rec.result_ID
+        insert_resource_usage(conn, rec.resources, commit=False)
+
     conn.commit()
     return rec
 
@@ -91,7 +163,7 @@ def read_result_record(conn: sqlite3.Connection, result_ID: str) -> Optional[Res
     """Fetch a ResultRecord by primary key, or None if not found."""
     conn.row_factory = sqlite3.Row
     cur = conn.execute(
-        "SELECT result_ID, launch_ID, dataset_size, run_index, elapsed_seconds "
+        "SELECT result_ID, launch_ID, dataset_size, run_index, elapsed_seconds, vm_steps, status, cell_hash "
         "FROM QueryResult WHERE result_ID = ?", (result_ID,)
     )
     row = cur.fetchone()
@@ -102,7 +174,10 @@ def read_result_record(conn: sqlite3.Connection, result_ID: str) -> Optional[Res
         launch_ID=str(row["launch_ID"]),
         dataset_size=int(row["dataset_size"]),
         run_index=int(row["run_index"]),
-        elapsed_seconds=float(row["elapsed_seconds"]),
+        elapsed_seconds=None if row["elapsed_seconds"] is None else float(row["elapsed_seconds"]),
+        vm_steps=row["vm_steps"],
+        status=row["status"],
+        cell_hash=row["cell_hash"],
     )
 
 
@@ -114,9 +189,9 @@ def update_result_record(conn: sqlite3.Connection, rec: ResultRecord) -> int:
     if not rec.result_ID:
         raise ValueError("result_ID is required for update")
     cur = conn.execute(
-        "UPDATE QueryResult SET launch_ID = ?, dataset_size = ?, run_index = ?, elapsed_seconds = ? "
+        "UPDATE QueryResult SET launch_ID = ?, dataset_size = ?, run_index = ?, elapsed_seconds = ?, vm_steps = ?, status = ?, cell_hash = ? "
         "WHERE result_ID = ?",
-        (rec.launch_ID, rec.dataset_size, rec.run_index, rec.elapsed_seconds, rec.result_ID),
+        (rec.launch_ID, rec.dataset_size, rec.run_index, rec.elapsed_seconds, rec.vm_steps, rec.status, rec.cell_hash, rec.result_ID),
     )
     conn.commit()
     return cur.rowcount
@@ -126,4 +201,345 @@ def delete_result_record(conn: sqlite3.Connection, result_ID: str) -> int:
     """Delete a ResultRecord by primary key. Returns number of rows affected."""
     cur = conn.execute("DELETE FROM QueryResult WHERE result_ID = ?", (result_ID,))
     conn.commit()
-    return cur.rowcount
\ No newline at end of file
+    return cur.rowcount
+
+
+def count_ok_runs_by_cell_hash(conn: sqlite3.Connection, cell_hashes: list[str]) -> dict[str, int]:
+    """Number of successful runs stored for each cell hash (0 when there are none)."""
+    counts = {h: 0 for h in cell_hashes}
+    if not cell_hashes:
+        return counts
+    placeholders = ",".join("?" * len(cell_hashes))
+    cur = conn.execute(
+        f"SELECT cell_hash, COUNT(*) FROM QueryResult "
+        f"WHERE status = 'ok' AND cell_hash IN ({placeholders}) GROUP BY cell_hash",
+        cell_hashes,
+    )
+    counts.update({h: int(n) for h, n in cur.fetchall()})
+    return counts
+
+
+def insert_resource_usage(conn: sqlite3.Connection, usage: ResourceUsage, commit: bool = True) -> ResourceUsage:
+    """Insert the ResourceUsage of one result. result_ID must already be set."""
+    conn.execute(
+        "INSERT INTO QueryResultResource (result_ID, user_cpu_seconds, sys_cpu_seconds, minor_faults, major_faults, "
+        "voluntary_ctx_switches, involuntary_ctx_switches, read_bytes, write_bytes, read_chars, write_chars, peak_rss_bytes) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            usage.result_ID, usage.user_cpu_seconds, usage.sys_cpu_seconds, usage.minor_faults, usage.major_faults,
+            usage.voluntary_ctx_switches, usage.involuntary_ctx_switches, usage.read_bytes, usage.write_bytes,
+            usage.read_chars, usage.write_chars, usage.peak_rss_bytes,
+        ),
+    )
+    if commit:
+        conn.commit()
+    return usage
+
+
+def read_resource_usage(conn: sqlite3.Connection, result_ID: str) -> Optional[ResourceUsage]:
+    """Fetch the resource usage of one result, or None if it was not recorded."""
+    conn.row_factory = sqlite3.Row
+    row = conn.execute("SELECT * FROM QueryResultResource WHERE result_ID = ?", (result_ID,)).fetchone()
+    if not row:
+        return None
+    values = dict(row)
+    values["result_ID"] = str(values["result_ID"])
+    return ResourceUsage(**values)
+
+
+# ---------- QueryStepResult CRUD ----------
+
+def insert_step_result(conn: sqlite3.Connection, step: QueryStepResult, commit: bool = True) -> QueryStepResult:
+    """
+    Insert a QueryStepResult. result_ID must already be set.
+    Returns the inserted object with step_ID populated.
+    """
+    if not step.result_ID:
+        raise ValueError("result_ID is required to insert a step result")
+    cur = conn.execute(
+        "INSERT INTO QueryStepResult (result_ID, sql_file, statement_index, elapsed_seconds, rows, approx_bytes, vm_steps) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (step.result_ID, step.sql_file, step.statement_index, step.elapsed_seconds, step.rows, step.approx_bytes, step.vm_steps),
+    )
+    step.step_ID = str(cur.lastrowid)
+    if commit:
+        conn.commit()
+    return step
+
+
+def read_step_results(conn: sqlite3.Connection, result_ID: str) -> list[QueryStepResult]:
+    """Fetch every QueryStepResult of one result, in execution order."""
+    conn.row_factory = sqlite3.Row
+    cur = conn.execute(
+        "SELECT step_ID, result_ID, sql_file, statement_index, elapsed_seconds, rows, approx_bytes, vm_steps "
+        "FROM QueryStepResult WHERE result_ID = ? ORDER BY step_ID", (result_ID,)
+    )
+    return [
+        QueryStepResult(
+            step_ID=str(row["step_ID"]),
+            result_ID=str(row["result_ID"]),
+            sql_file=row["sql_file"],
+            statement_index=int(row["statement_index"]),
+            elapsed_seconds=row["elapsed_seconds"],
+            rows=row["rows"],
+            approx_bytes=row["approx_bytes"],
+            vm_steps=row["vm_steps"],
+        )
+        for row in cur.fetchall()
+    ]
+
+
+# ---------- QueryPlan CRUD ----------
+
+def insert_query_plans(conn: sqlite3.Connection, plans: list[QueryPlan]) -> list[QueryPlan]:
+    """
+    Insert the EXPLAIN QUERY PLAN trees captured for one launch in a single
+    transaction. Returns the plans with plan_ID populated.
+    """
+    for plan in plans:
+        cur = conn.execute(
+            "INSERT INTO QueryPlan (launch_ID, query_name, query_version, sql_file, statement_index, plan_json) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                plan.launch_ID,
+                plan.query_name,
+                plan.query_version,
+                plan.sql_file,
+                plan.statement_index,
+                json.dumps([list(row) for row in plan.plan]),
+            ),
+        )
+        plan.plan_ID = str(cur.lastrowid)
+    conn.commit()
+    return plans
+
+
+def read_query_plans(conn: sqlite3.Connection, launch_ID: str) -> list[QueryPlan]:
+    """Fetch every QueryPlan of one launch, in execution order."""
+    conn.row_factory = sqlite3.Row
+    cur = conn.execute(
+        "SELECT plan_ID, launch_ID, query_name, query_version, sql_file, statement_index, plan_json "
+        "FROM QueryPlan WHERE launch_ID = ? ORDER BY plan_ID", (launch_ID,)
+    )
+    return [
+        QueryPlan(
+            plan_ID=str(row["plan_ID"]),
+            launch_ID=str(row["launch_ID"]),
+            query_name=row["query_name"],
+            query_version=row["query_version"],
+            sql_file=row["sql_file"],
+            statement_index=int(row["statement_index"]),
+            plan=[(int(i), int(parent), detail) for i, parent, detail in json.loads(row["plan_json"])],
+        )
+        for row in cur.fetchall()
+    ]
+
+
+# ---------- Batched result writer ----------
+
+class ResultWriter:
+    """
+    Streams ResultRecords (with their steps and resource usage) into the results database while a
+    launch is running. Records are buffered and written with executemany in
+    one transaction once `batch_size` records are waiting or `flush_seconds`
+    have passed since the last write, so a crash only loses the last batch and
+    plots can be drawn from a launch that is still running.
+
+    result_IDs and step_IDs are allocated inside the write transaction
+    (BEGIN IMMEDIATE), which keeps them unique with other writers on the same
+    database.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, batch_size: int = 50, flush_seconds: float = 5.0) -> None:
+        self.conn = conn
+        self.batch_size = max(1, batch_size)
+        self.flush_seconds = flush_seconds
+        self._pending: list[ResultRecord] = []
+        self._last_flush = time.monotonic()
+
+    def add(self, rec: ResultRecord) -> None:
+        """Queue a record; writes the batch when it is full or due."""
+        self._pending.append(rec)
+        if (
+            len(self._pending) >= self.batch_size
+            or time.monotonic() - self._last_flush >= self.flush_seconds
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        """Write every queued record and its steps in a single transaction."""
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        records, self._pending = self._pending, []
+
+        if self.conn.in_transaction:
+            self.conn.commit()
+        self.conn.execute("BEGIN IMMEDIATE;")
+        try:
+            next_result_ID = self.conn.execute("SELECT COALESCE(MAX(result_ID), 0) + 1 FROM QueryResult;").fetchone()[0]
+            next_step_ID = self.conn.execute("SELECT COALESCE(MAX(step_ID), 0) + 1 FROM QueryStepResult;").fetchone()[0]
+            steps = []
+            resources = []
+            for rec in records:
+                rec.result_ID = str(next_result_ID)
+                next_result_ID += 1
+                if rec.resources is not None:
+                    rec.resources.result_ID = rec.result_ID
+                    resources.append(rec.resources)
+                for step in rec.steps:
+                    step.result_ID = rec.result_ID
+                    step.step_ID = str(next_step_ID)
+                    next_step_ID += 1
+                    steps.append(step)
+
+            self.conn.executemany(
+                "INSERT INTO QueryResult (result_ID, launch_ID, dataset_size, run_index, elapsed_seconds, vm_steps, status, cell_hash) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (r.result_ID, r.launch_ID, r.dataset_size, r.run_index, r.elapsed_seconds, r.vm_steps, r.status, r.cell_hash)
+                    for r in records
+                ],
+            )
+            self.conn.executemany(
+                "INSERT INTO QueryStepResult (step_ID, result_ID, sql_file, statement_index, elapsed_seconds, rows, approx_bytes, vm_steps) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (st.step_ID, st.result_ID, st.sql_file, st.statement_index, st.elapsed_seconds, st.rows, st.approx_bytes, st.vm_steps)
+                    for st in steps
+                ],
+            )
+            self.conn.executemany(
+                "INSERT INTO QueryResultResource (result_ID, user_cpu_seconds, sys_cpu_seconds, minor_faults, major_faults, "
+                "voluntary_ctx_switches, involuntary_ctx_switches, read_bytes, write_bytes, read_chars, write_chars, peak_rss_bytes) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        u.result_ID, u.user_cpu_seconds, u.sys_cpu_seconds, u.minor_faults, u.major_faults,
+                        u.voluntary_ctx_switches, u.involuntary_ctx_switches, u.read_bytes, u.write_bytes,
+                        u.read_chars, u.write_chars, u.peak_rss_bytes,
+                    )
+                    for u in resources
+                ],
+            )
+            self.conn.commit()
+        except BaseException:
+            self.conn.rollback()
+            # keep the records so a later flush can retry them
+            self._pending = records + self._pending
+            raise
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> "ResultWriter":
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        self.close()
+        return False
+
+
+# ---------- CellStats CRUD ----------
+
+def insert_cell_stats(conn: sqlite3.Connection, stats: CellStats) -> CellStats:
+    """Insert (or replace) the stats of one launch / dataset size cell."""
+    cur = conn.execute(
+        "INSERT OR REPLACE INTO QueryCellStats (launch_ID, dataset_size, runs, outliers, p50, p50_ci_low, p50_ci_high, "
+        "p95, p95_ci_low, p95_ci_high, converged) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            stats.launch_ID,
+            stats.dataset_size,
+            stats.runs,
+            stats.outliers,
+            stats.p50,
+            stats.p50_ci_low,
+            stats.p50_ci_high,
+            stats.p95,
+            stats.p95_ci_low,
+            stats.p95_ci_high,
+            None if stats.converged is None else int(stats.converged),
+        ),
+    )
+    stats.cell_stats_ID = str(cur.lastrowid)
+    conn.commit()
+    return stats
+
+
+def read_cell_stats(conn: sqlite3.Connection, launch_ID: str) -> list[CellStats]:
+    """Fetch the CellStats of every dataset size of one launch, smallest size first."""
+    conn.row_factory = sqlite3.Row
+    cur = conn.execute(
+        "SELECT * FROM QueryCellStats WHERE launch_ID = ? ORDER BY dataset_size", (launch_ID,)
+    )
+    return [
+        CellStats(
+            cell_stats_ID=str(row["cell_stats_ID"]),
+            launch_ID=str(row["launch_ID"]),
+            dataset_size=int(row["dataset_size"]),
+            runs=int(row["runs"]),
+            outliers=int(row["outliers"]),
+            p50=row["p50"],
+            p50_ci_low=row["p50_ci_low"],
+            p50_ci_high=row["p50_ci_high"],
+            p95=row["p95"],
+            p95_ci_low=row["p95_ci_low"],
+            p95_ci_high=row["p95_ci_high"],
+            converged=None if row["converged"] is None else bool(row["converged"]),
+        )
+        for row in cur.fetchall()
+    ]
+
+# ---------- LoadTestResult CRUD ----------
+
+def insert_load_test_result(conn: sqlite3.Connection, result: LoadTestResult) -> LoadTestResult:
+    """Insert (or replace) the result of one client count of a load-test launch."""
+    cur = conn.execute(
+        "INSERT OR REPLACE INTO LoadTestResult (launch_ID, dataset_size, clients, client_mode, duration_seconds, "
+        "requests, errors, timeouts, qps, p50, p95, p99, max_latency) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            result.launch_ID,
+            result.dataset_size,
+            result.clients,
+            result.client_mode,
+            result.duration_seconds,
+            result.requests,
+            result.errors,
+            result.timeouts,
+            result.qps,
+            result.p50,
+            result.p95,
+            result.p99,
+            result.max_latency,
+        ),
+    )
+    result.load_result_ID = str(cur.lastrowid)
+    conn.commit()
+    return result
+
+
+def read_load_test_results(conn: sqlite3.Connection, launch_ID: str) -> list[LoadTestResult]:
+    """Fetch the LoadTestResults of one launch, smallest dataset size and client count first."""
+    conn.row_factory = sqlite3.Row
+    cur = conn.execute(
+        "SELECT * FROM LoadTestResult WHERE launch_ID = ? ORDER BY dataset_size, clients", (launch_ID,)
+    )
+    return [
+        LoadTestResult(
+            load_result_ID=str(row["load_result_ID"]),
+            launch_ID=str(row["launch_ID"]),
+            dataset_size=int(row["dataset_size"]),
+            clients=int(row["clients"]),
+            client_mode=row["client_mode"],
+            duration_seconds=float(row["duration_seconds"]),
+            requests=int(row["requests"]),
+            errors=int(row["errors"]),
+            timeouts=int(row["timeouts"]),
+            qps=row["qps"],
+            p50=row["p50"],
+            p95=row["p95"],
+            p99=row["p99"],
+            max_latency=row["max_latency"],
+        )
+        for row in cur.fetchall()
+    ]
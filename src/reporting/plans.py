@@ -0,0 +1,194 @@
+"""
+Compare the EXPLAIN QUERY PLAN trees stored for two launches.
+
+The plans are captured by execute.plans at the start of every launch. A diff
+prints the statements whose plan changed and flags plan steps that usually
+mean a regression: new full SCANs, automatic indexes, temp B-trees for
+ORDER BY / GROUP BY / DISTINCT and correlated subqueries.
+"""
+import argparse
+import re
+import sqlite3
+import sys
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from reporting.models import QueryPlan
+from reporting.operations import read_query_plans
+from reporting.setup import get_database_connection
+
+PlanRows = List[Tuple[int, int, str]]
+
+
+# flag label -> test on a single EXPLAIN QUERY PLAN detail line
+PLAN_FLAGS = {
+    "SCAN": lambda d: d.startswith("SCAN ") and not d.startswith("SCAN CONSTANT ROW"),
+    "AUTOMATIC INDEX": lambda d: "AUTOMATIC" in d and "INDEX" in d,
+    "TEMP B-TREE": lambda d: "USE TEMP B-TREE" in d,
+    "CORRELATED SUBQUERY": lambda d: d.startswith("CORRELATED "),
+}
+
+# subquery / co-routine numbers change whenever a statement is edited
+_SUBQUERY_NUMBER = re.compile(r"(SUBQUERY |CO-ROUTINE |MATERIALIZE |subquery-)\d+")
+
+
+def _normalize_detail(detail: str) -> str:
+    return _SUBQUERY_NUMBER.sub(r"\1#", detail)
+
+
+def plan_flags(plan: PlanRows) -> List[Tuple[str, str]]:
+    """(flag, normalized detail) for every flagged step of one plan."""
+    flags = []
+    for _, _, detail in plan:
+        for label, test in PLAN_FLAGS.items():
+            if test(detail):
+                flags.append((label, _normalize_detail(detail)))
+    return flags
+
+
+def render_plan(plan: PlanRows, indent: str = "  ") -> List[str]:
+    """Plan rows as indented tree lines, the way the sqlite3 shell prints them."""
+    depth: Dict[int, int] = {0: -1}
+    lines = []
+    for node_id, parent, detail in plan:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append(f"{indent * (depth[node_id] + 1)}{detail}")
+    return lines
+
+
+def latest_plan_launch(cur: sqlite3.Cursor, query_name: str, query_version: str) -> str:
+    """Most recent launch of a query name and version that has stored plans."""
+    row = cur.execute(
+        """
+        SELECT launch_ID
+        FROM QueryPlan
+        WHERE query_name = ? AND query_version = ?
+        ORDER BY launch_ID DESC
+        LIMIT 1;
+        """,
+        (query_name, query_version),
+    ).fetchone()
+    if not row:
+        raise ValueError(f"No stored query plans for {query_name} v{query_version}")
+    return str(row[0])
+
+
+def diff_plans(
+    base: List[QueryPlan],
+    new: List[QueryPlan],
+) -> Tuple[List[Tuple[str, QueryPlan]], List[Tuple[Optional[QueryPlan], Optional[QueryPlan]]]]:
+    """
+    Compare the plans of two launches.
+
+    Returns (new_flags, changed):
+      new_flags -> (flag description, plan it appears in) for flagged steps the
+                   new launch has more of than the base launch
+      changed   -> (base plan, new plan) pairs of statements whose plan
+                   differs. Either side is None when the statement only
+                   exists in one launch.
+    """
+    base_counts = Counter(f for p in base for f in plan_flags(p.plan))
+    new_flags = []
+    for p in new:
+        for flag in plan_flags(p.plan):
+            if base_counts[flag] > 0:
+                base_counts[flag] -= 1
+            else:
+                new_flags.append((f"{flag[0]}: {flag[1]}", p))
+
+    # pair statements by (sql_file, statement_index); the leftovers (renamed
+    # or split files) are paired in execution order
+    new_by_key = {(p.sql_file, p.statement_index): p for p in new}
+    pairs = [(b, new_by_key.pop((b.sql_file, b.statement_index), None)) for b in base]
+    unmatched_new = list(new_by_key.values())
+    paired = []
+    for b, n in pairs:
+        if n is None and unmatched_new:
+            n = unmatched_new.pop(0)
+        paired.append((b, n))
+    paired.extend((None, n) for n in unmatched_new)
+
+    changed = []
+    for b, n in paired:
+        if b is None or n is None:
+            changed.append((b, n))
+        elif [_normalize_detail(d) for _, _, d in b.plan] != [_normalize_detail(d) for _, _, d in n.plan]:
+            changed.append((b, n))
+    return new_flags, changed
+
+
+def print_plan_diff(base: List[QueryPlan], new: List[QueryPlan]) -> int:
+    """Print a plan diff of two launches. Returns the number of new flagged steps."""
+    new_flags, changed = diff_plans(base, new)
+
+    def _label(plans: List[QueryPlan]) -> str:
+        p = plans[0]
+        return f"{p.query_name} v{p.query_version} (launch {p.launch_ID})"
+
+    print(f"[PLAN DIFF] base: {_label(base)}")
+    print(f"[PLAN DIFF] new:  {_label(new)}")
+
+    for b, n in changed:
+        where = " -> ".join(f"{p.sql_file} statement {p.statement_index}" for p in (b, n) if p)
+        print(f"\n--- {where}")
+        print("  base:")
+        print("\n".join(render_plan(b.plan, "    ")) if b else "    (no plan)")
+        print("  new:")
+        print("\n".join(render_plan(n.plan, "    ")) if n else "    (no plan)")
+    if not changed:
+        print("\nNo plan changes.")
+
+    if new_flags:
+        print(f"\n[REGRESSION] {len(new_flags)} new flagged plan step(s):")
+        for desc, p in new_flags:
+            print(f"  {p.sql_file} statement {p.statement_index}: {desc}")
+    else:
+        print("\nNo new SCAN / automatic index / temp B-tree / correlated subquery steps.")
+    return len(new_flags)
+
+
+def plan_diff_cli() -> None:
+    """
+    CLI entry point for plan_diff. Exits with status 1 when the new plans
+    have flagged steps the base plans do not.
+
+    Example:
+        plan_diff baseline_query2 1.2 2.2
+        plan_diff --launches 12 17
+    """
+    parser = argparse.ArgumentParser(
+        description="Diff the stored query plans of two versions of a query or of two launches."
+    )
+    parser.add_argument("query_name", nargs="?", help="Name of the query")
+    parser.add_argument("base_version", nargs="?", help="Version to compare against")
+    parser.add_argument("new_version", nargs="?", help="Version to check")
+    parser.add_argument(
+        "--launches",
+        nargs=2,
+        metavar=("BASE_LAUNCH", "NEW_LAUNCH"),
+        help="Compare two launch IDs instead of the latest launches of two versions",
+    )
+
+    args = parser.parse_args()
+    if args.launches is None and not (args.query_name and args.base_version and args.new_version):
+        parser.error("give query_name base_version new_version, or --launches BASE_LAUNCH NEW_LAUNCH")
+
+    con = get_database_connection()
+    try:
+        if args.launches:
+            base_launch, new_launch = args.launches
+        else:
+            cur = con.cursor()
+            base_launch = latest_plan_launch(cur, args.query_name, args.base_version)
+            new_launch = latest_plan_launch(cur, args.query_name, args.new_version)
+
+        base = read_query_plans(con, base_launch)
+        new = read_query_plans(con, new_launch)
+    finally:
+        con.close()
+
+    for launch_ID, plans in ((base_launch, base), (new_launch, new)):
+        if not plans:
+            parser.error(f"launch {launch_ID} has no stored query plans")
+
+    sys.exit(1 if print_plan_diff(base, new) else 0)
@@ -1,14 +1,77 @@
 import sqlite3
-from typing import List, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 from collections import defaultdict
 import statistics
 import math
 import matplotlib.pyplot as plt
 import os
+import csv
 import argparse
+import json
+
+import numpy as np
 
 from app import AppConfig
+from app.events import emit, flush_events
 from reporting.setup import get_database_connection  # uses AppConfig.result_db_path
+from reporting.scaling import SCALING_MODELS, ScalingRow, scaling_row, format_scaling_table
+
+
+# QueryResult columns that can be plotted -> y axis label.
+# vm_steps is the SQLite VM instruction count, which does not move with machine load.
+METRICS: Dict[str, str] = {
+    "elapsed_seconds": "Elapsed time (s)",
+    "vm_steps": "SQLite VM steps",
+    # per-run resource usage from QueryResultResource (see execute.resources)
+    "cpu_seconds": "CPU time, user + sys (s)",
+    "cpu_share": "CPU time / elapsed time",
+    "user_cpu_seconds": "User CPU time (s)",
+    "sys_cpu_seconds": "System CPU time (s)",
+    "minor_faults": "Minor page faults",
+    "major_faults": "Major page faults",
+    "voluntary_ctx_switches": "Voluntary context switches",
+    "involuntary_ctx_switches": "Involuntary context switches",
+    "read_bytes": "Bytes read from storage",
+    "write_bytes": "Bytes written to storage",
+    "read_chars": "Bytes read (page cache included)",
+    "write_chars": "Bytes written (page cache included)",
+    "peak_rss_bytes": "Peak RSS (bytes)",
+}
+
+# SQL expression of every metric over QueryResult r LEFT JOIN QueryResultResource u
+_METRIC_SQL: Dict[str, str] = {
+    "elapsed_seconds": "r.elapsed_seconds",
+    "vm_steps": "r.vm_steps",
+    "cpu_seconds": "u.user_cpu_seconds + u.sys_cpu_seconds",
+    "cpu_share": "(u.user_cpu_seconds + u.sys_cpu_seconds) / NULLIF(r.elapsed_seconds, 0)",
+    **{
+        name: f"u.{name}"
+        for name in METRICS
+        if name not in ("elapsed_seconds", "vm_steps", "cpu_seconds", "cpu_share")
+    },
+}
+
+
+def _cache_mib(pragmas: Dict) -> float:
+    """cache_size of a profile in MiB (KiB when negative, pages of page_size when positive)."""
+    cache_size = pragmas.get("cache_size", -2000)
+    if cache_size < 0:
+        return -cache_size / 1024.0
+    return cache_size * (pragmas.get("page_size") or 4096) / (1024.0 * 1024.0)
+
+
+# PRAGMA profile settings latency can be plotted against -> (x axis label, value from the stored pragmas)
+PRAGMA_KNOBS: Dict[str, Tuple[str, Callable[[Dict], float]]] = {
+    "cache_size": ("Page cache per database (MiB)", _cache_mib),
+    "threads": ("Auxiliary threads", lambda p: float(p.get("threads") or 0)),
+    "mmap_size": ("mmap_size per dataset (MiB)", lambda p: (p.get("mmap_size") or 0) / (1024.0 * 1024.0)),
+    "page_size": ("Page size (bytes)", lambda p: float(p.get("page_size") or 4096)),
+}
+
+
+def _metric_suffix(metric: str) -> str:
+    """Graph filename suffix so vm_steps plots do not overwrite elapsed time plots."""
+    return "" if metric == "elapsed_seconds" else f"-{metric}"
 
 
 def _nearest_rank_percentile(sorted_values: List[float], p: int) -> float:
@@ -24,67 +87,116 @@ def _nearest_rank_percentile(sorted_values: List[float], p: int) -> float:
     return sorted_values[k]
 
 
-def _compute_query_percentiles(
+def select_launch_ids(
     cur: sqlite3.Cursor,
     query_name: str,
     query_version: str,
     *,
     latest_only: bool,
-) -> Tuple[List[int], List[float], List[float], int]:
+    cache_mode: Optional[str] = None,
+    pragma_profile: Optional[str] = None,
+) -> List[int]:
     """
-    Return (sizes, p50s, p95s, num_runs) for a given query name and version.
+    Launch IDs of a query name and version: only the most recent one when
+    latest_only, otherwise all of them oldest first.
+    cache_mode / pragma_profile restrict the selection to launches run in
+    that cache mode / with that PRAGMA profile.
     """
+    mode_filter = "" if cache_mode is None else "AND cache_mode = ?"
+    mode_params = () if cache_mode is None else (cache_mode,)
+    if pragma_profile is not None:
+        mode_filter += " AND pragma_profile = ?"
+        mode_params += (pragma_profile,)
     if latest_only:
         row = cur.execute(
-            """
+            f"""
             SELECT launch_ID
             FROM QueryLaunch
-            WHERE query_name = ? AND query_version = ?
-            ORDER BY datetime(timestamp) DESC
+            WHERE query_name = ? AND query_version = ? AND launch_type = 'benchmark' {mode_filter}
+            ORDER BY datetime(timestamp) DESC, launch_ID DESC
             LIMIT 1;
             """,
-            (query_name, query_version),
+            (query_name, query_version) + mode_params,
         ).fetchone()
         if not row:
             raise ValueError(f"No launches found for {query_name} v{query_version}")
-        launch_ids = [row[0]]
-    else:
-        launch_ids = [
-            r[0]
-            for r in cur.execute(
-                """
-                SELECT launch_ID
-                FROM QueryLaunch
-                WHERE query_name = ? AND query_version = ?
-                ORDER BY datetime(timestamp) ASC;
-                """,
-                (query_name, query_version),
-            ).fetchall()
-        ]
-        if not launch_ids:
-            raise ValueError(f"No launches found for {query_name} v{query_version}")
+        return [row[0]]
+
+    launch_ids = [
+        r[0]
+        for r in cur.execute(
+            f"""
+            SELECT launch_ID
+            FROM QueryLaunch
+            WHERE query_name = ? AND query_version = ? AND launch_type = 'benchmark' {mode_filter}
+            ORDER BY datetime(timestamp) ASC, launch_ID ASC;
+            """,
+            (query_name, query_version) + mode_params,
+        ).fetchall()
+    ]
+    if not launch_ids:
+        raise ValueError(f"No launches found for {query_name} v{query_version}")
+    return launch_ids
+
 
-    # Fetch all results for those launches
+def metric_by_size(cur: sqlite3.Cursor, launch_ids: List[int], metric: str) -> Dict[int, List[float]]:
+    """
+    {dataset_size: values} of `metric` (a key of METRICS) over the successful
+    runs of the given launches. Raises ValueError when there are none.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric {metric!r}, expected one of {tuple(METRICS)}")
     placeholders = ",".join("?" * len(launch_ids))
+    expr = _METRIC_SQL[metric]
     rows = cur.execute(
         f"""
-        SELECT dataset_size, elapsed_seconds
-        FROM QueryResult
-        WHERE launch_ID IN ({placeholders})
-          AND elapsed_seconds IS NOT NULL;
+        SELECT r.dataset_size, {expr}
+        FROM QueryResult r
+        LEFT JOIN QueryResultResource u ON u.result_ID = r.result_ID
+        WHERE r.launch_ID IN ({placeholders})
+          AND r.status = 'ok'
+          AND {expr} IS NOT NULL;
         """,
-        launch_ids,
+        list(launch_ids),
     ).fetchall()
 
-    num_runs = len(rows)
-    by_size = defaultdict(list)
-    for ds, sec in rows:
-        by_size[int(ds)].append(float(sec))
+    by_size: Dict[int, List[float]] = defaultdict(list)
+    for ds, value in rows:
+        by_size[int(ds)].append(float(value))
 
     if not by_size:
         raise ValueError(
-            "No QueryResult rows with elapsed_seconds found for the selection."
+            f"No QueryResult rows with {metric} found for the selection"
+            + ("." if metric in ("elapsed_seconds", "vm_steps") else " (was resource_accounting on?).")
         )
+    return by_size
+
+
+def _compute_query_percentiles(
+    cur: sqlite3.Cursor,
+    query_name: str,
+    query_version: str,
+    *,
+    latest_only: bool,
+    cache_mode: Optional[str] = None,
+    metric: str = "elapsed_seconds",
+    pragma_profile: Optional[str] = None,
+) -> Tuple[List[int], List[float], List[float], int]:
+    """
+    Return (sizes, p50s, p95s, num_runs) of `metric` (a key of METRICS) for a
+    given query name and version.
+    cache_mode / pragma_profile restrict the selection to launches run in that
+    cache mode / with that PRAGMA profile.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric {metric!r}, expected one of {tuple(METRICS)}")
+    launch_ids = select_launch_ids(
+        cur, query_name, query_version, latest_only=latest_only, cache_mode=cache_mode,
+        pragma_profile=pragma_profile,
+    )
+
+    by_size = metric_by_size(cur, launch_ids, metric)
+    num_runs = sum(len(v) for v in by_size.values())
 
     sizes = sorted(by_size.keys())
     p50s, p95s = [], []
@@ -101,39 +213,41 @@ def plot_query_percentiles(
     query_version: str,
     *,
     latest_only: bool = True,
+    metric: str = "elapsed_seconds",
 ) -> Tuple[plt.Figure, plt.Axes]:
     """
-    Plot P50 and P95 elapsed_seconds vs dataset_size for a given query name and version.
+    Plot P50 and P95 of `metric` vs dataset_size for a given query name and version.
 
     latest_only=True -> uses the most recent launch for that query/version.
     latest_only=False -> aggregates all launches for that query/version together.
+    metric is a key of METRICS, elapsed_seconds by default.
     """
     try:
         os.mkdir(AppConfig.graphs)
     except FileExistsError:
         pass
     except FileNotFoundError:
-        print("Error: Data directory does not exist.")
+        emit("warn", "Error: Data directory does not exist.", level="error")
 
     con: sqlite3.Connection = get_database_connection()
     try:
         cur = con.cursor()
 
         sizes, p50s, p95s, num_runs = _compute_query_percentiles(
-            cur, query_name, query_version, latest_only=latest_only
+            cur, query_name, query_version, latest_only=latest_only, metric=metric
         )
 
         fig, ax = plt.subplots()
         ax.plot(sizes, p50s, marker="o", label="P50")
         ax.plot(sizes, p95s, marker="o", label="P95")
         ax.set_xlabel("Dataset size (rows)")
-        ax.set_ylabel("Elapsed time (s)")
+        ax.set_ylabel(METRICS[metric])
         ax.set_title(f"{query_name} v{query_version} - Runs:{num_runs}")
         ax.grid(True, which="both", alpha=0.3)
         ax.legend()
 
         fig.savefig(
-            f"{AppConfig.graphs}/{query_name}-v{query_version}.png",
+            f"{AppConfig.graphs}/{query_name}-v{query_version}{_metric_suffix(metric)}.png",
             dpi=144,
             bbox_inches="tight",
         )
@@ -150,29 +264,31 @@ def plot_two_query_percentiles(
     query2_version: str,
     *,
     latest_only: bool = True,
+    metric: str = "elapsed_seconds",
 ) -> Tuple[plt.Figure, plt.Axes]:
     """
-    Plot P50 and P95 elapsed_seconds vs dataset_size for two queries on the same figure.
+    Plot P50 and P95 of `metric` vs dataset_size for two queries on the same figure.
 
     latest_only=True  -> use the most recent launch for each query/version.
     latest_only=False -> aggregate all launches for each query/version together.
+    metric is a key of METRICS; vm_steps keeps version comparisons stable on a busy machine.
     """
     try:
         os.mkdir(AppConfig.graphs)
     except FileExistsError:
         pass
     except FileNotFoundError:
-        print("Error: Data directory does not exist.")
+        emit("warn", "Error: Data directory does not exist.", level="error")
 
     con: sqlite3.Connection = get_database_connection()
     try:
         cur = con.cursor()
 
         s1, p50_1, p95_1, n1 = _compute_query_percentiles(
-            cur, query1_name, query1_version, latest_only=latest_only
+            cur, query1_name, query1_version, latest_only=latest_only, metric=metric
         )
         s2, p50_2, p95_2, n2 = _compute_query_percentiles(
-            cur, query2_name, query2_version, latest_only=latest_only
+            cur, query2_name, query2_version, latest_only=latest_only, metric=metric
         )
 
         fig, ax = plt.subplots()
@@ -210,10 +326,14 @@ def plot_two_query_percentiles(
         )
 
         ax.set_xlabel("Dataset size (rows)")
-        ax.set_ylabel("Elapsed time (s)")
+        ax.set_ylabel(METRICS[metric])
 
         mode = "latest launch" if latest_only else "all launches"
-        print(f"Number of runs: {n1} for {query1_name}, {n2} for {query2_name}")
+        emit(
+            "plot.runs",
+            f"Number of runs: {n1} for {query1_name}, {n2} for {query2_name}",
+            runs={query1_name: n1, query2_name: n2},
+        )
         ax.set_title(
             f"{query1_name} v{query1_version} vs "
             f"{query2_name} v{query2_version}\n{mode}"
@@ -224,7 +344,165 @@ def plot_two_query_percentiles(
 
         fig.savefig(
             f"{AppConfig.graphs}/{query1_name}-v{query1_version}__vs__"
-            f"{query2_name}-v{query2_version}.png",
+            f"{query2_name}-v{query2_version}{_metric_suffix(metric)}.png",
+            dpi=144,
+            bbox_inches="tight",
+        )
+
+        return fig, ax
+    finally:
+        con.close()
+
+
+def plot_cache_mode_percentiles(
+    query_name: str,
+    query_version: str,
+    *,
+    latest_only: bool = True,
+) -> Tuple[plt.Figure, List[plt.Axes]]:
+    """
+    Plot P50 and P95 elapsed_seconds vs dataset_size side by side, one panel
+    per cache mode (warm, cold-connection, cold-os) the query/version was run in.
+
+    latest_only=True  -> the most recent launch of each cache mode.
+    latest_only=False -> all launches of each cache mode aggregated together.
+    """
+    try:
+        os.mkdir(AppConfig.graphs)
+    except FileExistsError:
+        pass
+    except FileNotFoundError:
+        emit("warn", "Error: Data directory does not exist.", level="error")
+
+    con: sqlite3.Connection = get_database_connection()
+    try:
+        cur = con.cursor()
+
+        modes = [
+            r[0]
+            for r in cur.execute(
+                """
+                SELECT DISTINCT cache_mode
+                FROM QueryLaunch
+                WHERE query_name = ? AND query_version = ? AND launch_type = 'benchmark'
+                ORDER BY cache_mode;
+                """,
+                (query_name, query_version),
+            ).fetchall()
+        ]
+        if not modes:
+            raise ValueError(f"No launches found for {query_name} v{query_version}")
+
+        fig, axes = plt.subplots(1, len(modes), sharey=True, squeeze=False, figsize=(6 * len(modes), 4.5))
+        axes = list(axes[0])
+        for ax, mode in zip(axes, modes):
+            sizes, p50s, p95s, num_runs = _compute_query_percentiles(
+                cur, query_name, query_version, latest_only=latest_only, cache_mode=mode
+            )
+            ax.plot(sizes, p50s, marker="o", label="P50")
+            ax.plot(sizes, p95s, marker="o", label="P95")
+            ax.set_xlabel("Dataset size (rows)")
+            ax.set_title(f"{mode} - Runs:{num_runs}")
+            ax.grid(True, which="both", alpha=0.3)
+            ax.legend()
+        axes[0].set_ylabel("Elapsed time (s)")
+        fig.suptitle(f"{query_name} v{query_version} by cache mode")
+
+        fig.savefig(
+            f"{AppConfig.graphs}/{query_name}-v{query_version}__cache_modes.png",
+            dpi=144,
+            bbox_inches="tight",
+        )
+
+        return fig, axes
+    finally:
+        con.close()
+
+
+def _compute_step_medians(
+    cur: sqlite3.Cursor,
+    launch_ids: List[int],
+) -> Tuple[List[int], List[str], Dict[str, List[float]]]:
+    """
+    Return (sizes, sql_files, medians) where medians[sql_file][i] is the median
+    over runs of the time spent in that file at sizes[i]. Files keep the order
+    they were executed in.
+    """
+    placeholders = ",".join("?" * len(launch_ids))
+    rows = cur.execute(
+        f"""
+        SELECT r.dataset_size, r.result_ID, s.sql_file, SUM(s.elapsed_seconds), MIN(s.step_ID)
+        FROM QueryStepResult s
+        JOIN QueryResult r ON r.result_ID = s.result_ID
+        WHERE r.launch_ID IN ({placeholders})
+          AND r.status = 'ok'
+          AND s.elapsed_seconds IS NOT NULL
+        GROUP BY r.result_ID, s.sql_file
+        ORDER BY MIN(s.step_ID);
+        """,
+        launch_ids,
+    ).fetchall()
+    if not rows:
+        raise ValueError("No QueryStepResult rows found for the selection.")
+
+    sql_files: List[str] = []
+    by_size_file = defaultdict(list)
+    for ds, _, sql_file, sec, _ in rows:
+        if sql_file not in sql_files:
+            sql_files.append(sql_file)
+        by_size_file[(int(ds), sql_file)].append(float(sec))
+
+    sizes = sorted({ds for ds, _ in by_size_file})
+    medians = {
+        f: [statistics.median(by_size_file[(ds, f)]) if by_size_file[(ds, f)] else 0.0 for ds in sizes]
+        for f in sql_files
+    }
+    return sizes, sql_files, medians
+
+
+def plot_query_steps(
+    query_name: str,
+    query_version: str,
+    *,
+    latest_only: bool = True,
+) -> Tuple[plt.Figure, plt.Axes]:
+    """
+    Stacked bars of the median time per SQL file at every dataset size, showing
+    which step dominates a query as the data grows.
+
+    latest_only=True  -> uses the most recent launch for that query/version.
+    latest_only=False -> aggregates all launches for that query/version together.
+    """
+    try:
+        os.mkdir(AppConfig.graphs)
+    except FileExistsError:
+        pass
+    except FileNotFoundError:
+        emit("warn", "Error: Data directory does not exist.", level="error")
+
+    con: sqlite3.Connection = get_database_connection()
+    try:
+        cur = con.cursor()
+        launch_ids = select_launch_ids(cur, query_name, query_version, latest_only=latest_only)
+        sizes, sql_files, medians = _compute_step_medians(cur, launch_ids)
+
+        fig, ax = plt.subplots(figsize=(max(6, 0.8 * len(sizes) + 3), 4.5))
+        x = list(range(len(sizes)))
+        bottom = [0.0] * len(sizes)
+        for sql_file in sql_files:
+            ax.bar(x, medians[sql_file], bottom=bottom, label=sql_file)
+            bottom = [b + v for b, v in zip(bottom, medians[sql_file])]
+
+        ax.set_xticks(x)
+        ax.set_xticklabels([f"{ds:,}" for ds in sizes], rotation=45, ha="right")
+        ax.set_xlabel("Dataset size (rows)")
+        ax.set_ylabel("Median elapsed time (s)")
+        ax.set_title(f"{query_name} v{query_version} - time per SQL file")
+        ax.grid(True, axis="y", alpha=0.3)
+        ax.legend(fontsize="small")
+
+        fig.savefig(
+            f"{AppConfig.graphs}/{query_name}-v{query_version}__steps.png",
             dpi=144,
             bbox_inches="tight",
         )
@@ -234,6 +512,330 @@ def plot_two_query_percentiles(
         con.close()
 
 
+def plot_scaling_fits(
+    queries: List[Tuple[str, str]],
+    *,
+    latest_only: bool = True,
+    metric: str = "elapsed_seconds",
+    predict_at: Tuple[int, ...] = (1_000_000, 10_000_000),
+) -> Tuple[plt.Figure, plt.Axes, List[ScalingRow]]:
+    """
+    Fit the P50 and P95 curves of every (query name, version) to the models of
+    reporting.scaling.SCALING_MODELS and plot the data with the best fit and its
+    95% band on log-log axes, extended to the largest size of predict_at.
+
+    Prints a table of the best models, fitted power-law exponents and the
+    predicted values at predict_at, and saves it as CSV next to the graph.
+    """
+    try:
+        os.mkdir(AppConfig.graphs)
+    except FileExistsError:
+        pass
+    except FileNotFoundError:
+        emit("warn", "Error: Data directory does not exist.", level="error")
+
+    con: sqlite3.Connection = get_database_connection()
+    try:
+        cur = con.cursor()
+        fig, ax = plt.subplots(figsize=(8, 5.5))
+        rows: List[ScalingRow] = []
+        colors = plt.rcParams["axes.prop_cycle"].by_key()["color"]
+
+        for i, (query_name, query_version) in enumerate(queries):
+            sizes, p50s, p95s, _ = _compute_query_percentiles(
+                cur, query_name, query_version, latest_only=latest_only, metric=metric
+            )
+            color = colors[i % len(colors)]
+            for percentile, values, marker, linestyle in (("P50", p50s, "o", "-"), ("P95", p95s, "^", "--")):
+                row = scaling_row(query_name, query_version, percentile, sizes, values, predict_at)
+                rows.append(row)
+                label = f"{query_name} v{query_version} {percentile}"
+                ax.scatter(
+                    sizes, values, color=color, marker=marker, s=18,
+                    label=f"{label} (no fit)" if row.best is None else None,
+                )
+                if row.best is None:
+                    continue
+                grid = np.geomspace(min(sizes), max(max(sizes), *predict_at), 200)
+                y, low, high = row.best.predict(grid)
+                ax.plot(
+                    grid,
+                    y,
+                    color=color,
+                    linestyle=linestyle,
+                    label=f"{label}: {SCALING_MODELS[row.best.model][1]}",
+                )
+                ax.fill_between(grid, low, high, color=color, alpha=0.12)
+
+        for n in predict_at:
+            ax.axvline(n, color="gray", linestyle=":", linewidth=0.8)
+        ax.set_xscale("log")
+        ax.set_yscale("log")
+        ax.set_xlabel("Dataset size (rows)")
+        ax.set_ylabel(METRICS[metric])
+        mode = "latest launch" if latest_only else "all launches"
+        ax.set_title(f"Scaling fits ({mode}), 95% bands")
+        ax.grid(True, which="both", alpha=0.3)
+        ax.legend(fontsize="small")
+
+        unit = "s" if metric == "elapsed_seconds" else ""
+        flush_events()  # the table is the output of the report, it goes straight to stdout
+        print("\n".join(format_scaling_table(rows, unit)))
+
+        stem = "__vs__".join(f"{name}-v{version}" for name, version in queries)
+        path = f"{AppConfig.graphs}/{stem}__scaling{_metric_suffix(metric)}"
+        fig.savefig(f"{path}.png", dpi=144, bbox_inches="tight")
+        with open(f"{path}.csv", "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(
+                ["query_name", "query_version", "percentile", "best_model", "exponent", "exponent_ci_low", "exponent_ci_high"]
+                + [f"{col}_{n}" for n in predict_at for col in ("predicted", "predicted_low", "predicted_high")]
+                + [f"aicc_{model.replace(' ', '_')}" for model in SCALING_MODELS]
+            )
+            for r in rows:
+                writer.writerow(
+                    [r.query_name, r.query_version, r.percentile, r.best.model if r.best else ""]
+                    + list(r.exponent or ("", "", ""))
+                    + [v for n in predict_at for v in r.predictions.get(n, ("", "", ""))]
+                    + [r.aicc.get(model, "") for model in SCALING_MODELS]
+                )
+
+        return fig, ax, rows
+    finally:
+        con.close()
+
+
+def _latest_profile_pragmas(cur: sqlite3.Cursor, query_name: str, query_version: str) -> Dict[str, Dict]:
+    """{PRAGMA profile: its stored settings} from the latest launch of every profile a query version ran with."""
+    rows = cur.execute(
+        """
+        SELECT pragma_profile, settings
+        FROM QueryLaunch
+        WHERE query_name = ? AND query_version = ? AND launch_type = 'benchmark' AND pragma_profile IS NOT NULL
+        ORDER BY datetime(timestamp) ASC, launch_ID ASC;
+        """,
+        (query_name, query_version),
+    ).fetchall()
+    # later launches overwrite earlier ones
+    return {name: (json.loads(settings) if settings else {}).get("pragmas", {}) for name, settings in rows}
+
+
+def plot_pragma_profiles(
+    query_name: str,
+    query_version: str,
+    *,
+    knob: str = "cache_size",
+    dataset_size: Optional[int] = None,
+    slo: Optional[float] = None,
+    percentile: str = "P95",
+    latest_only: bool = True,
+    metric: str = "elapsed_seconds",
+) -> Tuple[plt.Figure, plt.Axes, Optional[str]]:
+    """
+    Plot P50 and P95 of `metric` at one dataset size against a PRAGMA setting
+    (a key of PRAGMA_KNOBS), one point per PRAGMA profile the query version
+    ran with (see execute.pragmas). Only profiles that differ from the
+    "default" profile in that setting alone are compared, so every other
+    setting is the same along the curve.
+
+    dataset_size defaults to the largest size every profile has results for.
+    With an slo (in the unit of metric), the cheapest profile - the smallest
+    knob value - whose `percentile` (P50 or P95) meets it is highlighted and
+    returned as the third value; None when no profile meets it.
+    """
+    if knob not in PRAGMA_KNOBS:
+        raise ValueError(f"Unknown knob {knob!r}, expected one of {tuple(PRAGMA_KNOBS)}")
+    if percentile not in ("P50", "P95"):
+        raise ValueError("percentile must be P50 or P95")
+    try:
+        os.mkdir(AppConfig.graphs)
+    except FileExistsError:
+        pass
+    except FileNotFoundError:
+        emit("warn", "Error: Data directory does not exist.", level="error")
+
+    con: sqlite3.Connection = get_database_connection()
+    try:
+        cur = con.cursor()
+        pragmas = _latest_profile_pragmas(cur, query_name, query_version)
+        if not pragmas:
+            raise ValueError(f"No launches with a PRAGMA profile found for {query_name} v{query_version}")
+
+        # only profiles that differ from the reference profile in `knob` alone lie on one curve
+        reference = pragmas.get("default") or next(iter(pragmas.values()))
+        on_curve = {
+            name: values for name, values in pragmas.items()
+            if all(values.get(k) == reference.get(k) for k in set(values) | set(reference) if k != knob)
+        }
+        for name in pragmas.keys() - on_curve.keys():
+            emit("plot.skip", f"[SKIP] profile {name} changes more than {knob}, left out", pragma_profile=name)
+        pragmas = on_curve
+
+        curves = {
+            profile: _compute_query_percentiles(
+                cur, query_name, query_version, latest_only=latest_only, metric=metric,
+                pragma_profile=profile,
+            )
+            for profile in pragmas
+        }
+        if dataset_size is None:
+            common = set.intersection(*(set(sizes) for sizes, _, _, _ in curves.values()))
+            if not common:
+                raise ValueError("The PRAGMA profiles have no dataset size in common, pass dataset_size.")
+            dataset_size = max(common)
+
+        # (knob value, profile, p50, p95), cheapest first
+        points = []
+        for profile, (sizes, p50s, p95s, _) in curves.items():
+            if dataset_size not in sizes:
+                emit("warn", f"[WARN] profile {profile} has no results at rows={dataset_size:,}, left out", level="warn")
+                continue
+            i = sizes.index(dataset_size)
+            points.append((PRAGMA_KNOBS[knob][1](pragmas[profile]), profile, p50s[i], p95s[i]))
+        points.sort()
+        if not points:
+            raise ValueError(f"No PRAGMA profile has results at rows={dataset_size:,}")
+
+        cheapest = None
+        if slo is not None:
+            meets = [p for p in points if (p[2] if percentile == "P50" else p[3]) <= slo]
+            if meets:
+                cheapest = meets[0][1]
+
+        xs = [p[0] for p in points]
+        fig, ax = plt.subplots(figsize=(8, 5))
+        ax.plot(xs, [p[2] for p in points], marker="o", label="P50")
+        ax.plot(xs, [p[3] for p in points], marker="^", linestyle="--", label="P95")
+        for x, profile, p50, p95 in points:
+            ax.annotate(profile, (x, p95), textcoords="offset points", xytext=(4, 6), fontsize="small")
+        if slo is not None:
+            ax.axhline(slo, color="red", linestyle=":", label=f"SLO ({percentile} <= {slo:g})")
+        if cheapest is not None:
+            x, _, p50, p95 = next(p for p in points if p[1] == cheapest)
+            ax.scatter([x], [p50 if percentile == "P50" else p95], s=160, facecolors="none", edgecolors="red",
+                       label=f"cheapest meeting SLO: {cheapest}")
+        if knob in ("cache_size", "mmap_size") and min(xs) > 0:
+            ax.set_xscale("log")
+        ax.set_xlabel(PRAGMA_KNOBS[knob][0])
+        ax.set_ylabel(METRICS[metric])
+        ax.set_title(f"{query_name} v{query_version} by PRAGMA profile - rows={dataset_size:,}")
+        ax.grid(True, which="both", alpha=0.3)
+        ax.legend(fontsize="small")
+
+        for x, profile, p50, p95 in points:
+            emit(
+                "plot.profile",
+                f"{profile:<20} {knob}={x:g}  P50={p50:.4g}  P95={p95:.4g}",
+                pragma_profile=profile,
+                knob=knob,
+                value=x,
+                p50=p50,
+                p95=p95,
+            )
+        if slo is not None:
+            verdict = (
+                f"cheapest profile meeting {percentile} <= {slo:g}: {cheapest}" if cheapest
+                else f"no profile meets {percentile} <= {slo:g}"
+            )
+            emit("plot.slo", verdict, slo=slo, percentile=percentile, pragma_profile=cheapest)
+
+        fig.savefig(
+            f"{AppConfig.graphs}/{query_name}-v{query_version}__pragma_{knob}{_metric_suffix(metric)}.png",
+            dpi=144,
+            bbox_inches="tight",
+        )
+
+        return fig, ax, cheapest
+    finally:
+        con.close()
+
+
+def plot_load_test(
+    query_name: str,
+    query_version: str,
+    *,
+    launch_ID: Optional[str] = None,
+) -> Tuple[plt.Figure, List[plt.Axes]]:
+    """
+    Plot a load-test launch (see execute.loadtest): QPS against the number of
+    concurrent clients next to P50/P95/P99 latency against it, with the ideal
+    linear QPS scaling from the one-client level as a reference. Throughput
+    falling below that line while tail latency climbs is where clients start
+    contending. Uses the latest load launch of the query version unless
+    launch_ID is given.
+    """
+    try:
+        os.mkdir(AppConfig.graphs)
+    except FileExistsError:
+        pass
+    except FileNotFoundError:
+        emit("warn", "Error: Data directory does not exist.", level="error")
+
+    con: sqlite3.Connection = get_database_connection()
+    try:
+        cur = con.cursor()
+        if launch_ID is None:
+            row = cur.execute(
+                """
+                SELECT launch_ID
+                FROM QueryLaunch
+                WHERE query_name = ? AND query_version = ? AND launch_type = 'load'
+                ORDER BY datetime(timestamp) DESC, launch_ID DESC
+                LIMIT 1;
+                """,
+                (query_name, query_version),
+            ).fetchone()
+            if not row:
+                raise ValueError(f"No load-test launches found for {query_name} v{query_version}")
+            launch_ID = str(row[0])
+
+        rows = cur.execute(
+            """
+            SELECT clients, qps, p50, p95, p99, errors + timeouts, dataset_size, client_mode
+            FROM LoadTestResult
+            WHERE launch_ID = ?
+            ORDER BY dataset_size, clients;
+            """,
+            (launch_ID,),
+        ).fetchall()
+        if not rows:
+            raise ValueError(f"No LoadTestResult rows for launch {launch_ID}")
+
+        clients = [r[0] for r in rows]
+        qps = [r[1] for r in rows]
+        fig, (ax_qps, ax_lat) = plt.subplots(1, 2, figsize=(12, 4.5))
+        ax_qps.plot(clients, qps, marker="o", label="QPS")
+        if clients[0] == 1:
+            ax_qps.plot(clients, [qps[0] * c for c in clients], color="gray", linestyle=":", label="linear scaling")
+        for c, q, failed in zip(clients, qps, [r[5] for r in rows]):
+            if failed:
+                ax_qps.annotate(f"{failed} failed", (c, q), textcoords="offset points", xytext=(4, -12), fontsize="small", color="red")
+        ax_qps.set_xlabel("Concurrent clients")
+        ax_qps.set_ylabel("Queries per second")
+        ax_qps.grid(True, which="both", alpha=0.3)
+        ax_qps.legend()
+
+        for i, name in ((2, "P50"), (3, "P95"), (4, "P99")):
+            ax_lat.plot(clients, [r[i] for r in rows], marker="o", label=name)
+        ax_lat.set_xlabel("Concurrent clients")
+        ax_lat.set_ylabel("Latency (s)")
+        ax_lat.grid(True, which="both", alpha=0.3)
+        ax_lat.legend()
+
+        fig.suptitle(
+            f"{query_name} v{query_version} load test - rows={rows[0][6]:,}, {rows[0][7]} clients (launch {launch_ID})"
+        )
+        fig.savefig(
+            f"{AppConfig.graphs}/{query_name}-v{query_version}__load.png",
+            dpi=144,
+            bbox_inches="tight",
+        )
+
+        return fig, [ax_qps, ax_lat]
+    finally:
+        con.close()
+
+
 def plot_query_percentiles_cli() -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument("query_name", help="Name of the query")
@@ -243,23 +845,31 @@ def plot_query_percentiles_cli() -> None:
         action="store_false",
         help="Use all data instead of only the latest",
     )
+    parser.add_argument(
+        "--metric",
+        choices=tuple(METRICS),
+        default="elapsed_seconds",
+        help="Metric to plot, a QueryResult or QueryResultResource value (default: elapsed_seconds)",
+    )
 
     args = parser.parse_args()
 
     fig = None
     if args.latest_only:
-        print("Plotting all launches...")
+        emit("plot.start", "Plotting all launches...")
         fig, ax = plot_query_percentiles(
             query_name=args.query_name,
             query_version=args.query_version,
             latest_only=False,
+            metric=args.metric,
         )
     else:
-        print("Plotting latest launch only...")
+        emit("plot.start", "Plotting latest launch only...")
         fig, ax = plot_query_percentiles(
             query_name=args.query_name,
             query_version=args.query_version,
             latest_only=True,
+            metric=args.metric,
         )
 
     fig.show()
@@ -277,12 +887,18 @@ def plot_two_query_percentiles_cli() -> None:
         action="store_true",
         help="Use all launches instead of only the latest for each query",
     )
+    parser.add_argument(
+        "--metric",
+        choices=tuple(METRICS),
+        default="elapsed_seconds",
+        help="Metric to plot, a QueryResult or QueryResultResource value (default: elapsed_seconds)",
+    )
 
     args = parser.parse_args()
 
     latest_only = not args.all_launches
     mode = "latest launch only" if latest_only else "all launches"
-    print(f"Plotting two queries using {mode}...")
+    emit("plot.start", f"Plotting two queries using {mode}...")
 
     fig, ax = plot_two_query_percentiles(
         query1_name=args.query1_name,
@@ -290,6 +906,53 @@ def plot_two_query_percentiles_cli() -> None:
         query2_name=args.query2_name,
         query2_version=args.query2_version,
         latest_only=latest_only,
+        metric=args.metric,
+    )
+
+    fig.show()
+
+
+def plot_cache_mode_percentiles_cli() -> None:
+    parser = argparse.ArgumentParser(
+        description="Plot warm and cold cache percentiles of one query side by side."
+    )
+    parser.add_argument("query_name", help="Name of the query")
+    parser.add_argument("query_version", help="Version of the query")
+    parser.add_argument(
+        "--all-launches",
+        action="store_true",
+        help="Use all launches instead of only the latest per cache mode",
+    )
+
+    args = parser.parse_args()
+
+    fig, axes = plot_cache_mode_percentiles(
+        query_name=args.query_name,
+        query_version=args.query_version,
+        latest_only=not args.all_launches,
+    )
+
+    fig.show()
+
+
+def plot_query_steps_cli() -> None:
+    parser = argparse.ArgumentParser(
+        description="Stacked bar chart of time per SQL file for one query."
+    )
+    parser.add_argument("query_name", help="Name of the query")
+    parser.add_argument("query_version", help="Version of the query")
+    parser.add_argument(
+        "--all-launches",
+        action="store_true",
+        help="Use all launches instead of only the latest",
+    )
+
+    args = parser.parse_args()
+
+    fig, ax = plot_query_steps(
+        query_name=args.query_name,
+        query_version=args.query_version,
+        latest_only=not args.all_launches,
     )
 
     fig.show()
@@ -302,3 +965,124 @@ if __name__ == "__main__":
     # Example for comparing two queries:
     # fig, ax = plot_two_query_percentiles("baseline_query1", "1.0", "optimized_query1", "1.0", latest_only=True)
     # plt.show()
+
+
+def plot_scaling_fits_cli() -> None:
+    parser = argparse.ArgumentParser(
+        description="Fit scaling models to query versions and predict larger dataset sizes."
+    )
+    parser.add_argument(
+        "queries",
+        nargs="+",
+        help="Pairs of query name and version, e.g. baseline_query2 2.2 star_query2 1.0",
+    )
+    parser.add_argument(
+        "--all-launches",
+        action="store_true",
+        help="Use all launches instead of only the latest for each query",
+    )
+    parser.add_argument(
+        "--metric",
+        choices=tuple(METRICS),
+        default="elapsed_seconds",
+        help="QueryResult column to fit (default: elapsed_seconds)",
+    )
+    parser.add_argument(
+        "--predict",
+        type=str,
+        default="1000000,10000000",
+        help="Comma-separated dataset sizes to predict (default: 1000000,10000000)",
+    )
+
+    args = parser.parse_args()
+    if len(args.queries) % 2:
+        parser.error("queries must be given as name/version pairs")
+    queries = list(zip(args.queries[::2], args.queries[1::2]))
+    predict_at = tuple(int(x) for x in args.predict.split(",") if x.strip())
+
+    fig, ax, _ = plot_scaling_fits(
+        queries,
+        latest_only=not args.all_launches,
+        metric=args.metric,
+        predict_at=predict_at,
+    )
+
+    fig.show()
+
+
+def plot_pragma_profiles_cli() -> None:
+    parser = argparse.ArgumentParser(
+        description="Plot a query's latency against a PRAGMA setting, one point per PRAGMA profile."
+    )
+    parser.add_argument("query_name", help="Name of the query")
+    parser.add_argument("query_version", help="Version of the query")
+    parser.add_argument(
+        "--knob",
+        choices=tuple(PRAGMA_KNOBS),
+        default="cache_size",
+        help="PRAGMA setting on the x axis (default: cache_size)",
+    )
+    parser.add_argument(
+        "--size",
+        type=int,
+        default=None,
+        help="Dataset size to compare at (default: the largest size every profile ran)",
+    )
+    parser.add_argument(
+        "--slo",
+        type=float,
+        default=None,
+        help="Latency objective in the unit of --metric; the cheapest profile meeting it is highlighted",
+    )
+    parser.add_argument(
+        "--percentile",
+        choices=("P50", "P95"),
+        default="P95",
+        help="Percentile the SLO applies to (default: P95)",
+    )
+    parser.add_argument(
+        "--all-launches",
+        action="store_true",
+        help="Use all launches of every profile instead of only the latest",
+    )
+    parser.add_argument(
+        "--metric",
+        choices=tuple(METRICS),
+        default="elapsed_seconds",
+        help="Metric to plot, a QueryResult or QueryResultResource value (default: elapsed_seconds)",
+    )
+
+    args = parser.parse_args()
+
+    fig, ax, _ = plot_pragma_profiles(
+        args.query_name,
+        args.query_version,
+        knob=args.knob,
+        dataset_size=args.size,
+        slo=args.slo,
+        percentile=args.percentile,
+        latest_only=not args.all_launches,
+        metric=args.metric,
+    )
+    flush_events()
+
+    fig.show()
+
+
+def plot_load_test_cli() -> None:
+    parser = argparse.ArgumentParser(
+        description="Plot QPS and tail latency against concurrent clients for a load-test launch."
+    )
+    parser.add_argument("query_name", help="Name of the query")
+    parser.add_argument("query_version", help="Version of the query")
+    parser.add_argument(
+        "--launch",
+        default=None,
+        help="Load-test launch ID (default: the latest load launch of the query version)",
+    )
+
+    args = parser.parse_args()
+
+    fig, axes = plot_load_test(args.query_name, args.query_version, launch_ID=args.launch)
+
+    fig.show()
@@ -5,47 +5,11 @@ import math
 import sqlite3
 import statistics
 from collections import defaultdict
-from dataclasses import dataclass
 from typing import Dict, List, Optional, Tuple
 
 from reporting.setup import get_database_connection  # uses AppConfig.result_db_path
 
 
-DEFAULT_DATASET_SIZES = [10000, 50000, 100000, 200000, 300000, 400000, 500000]
-
-
-@dataclass(frozen=True)
-class QuerySpec:
-    name: str
-    version: str
-
-
-@dataclass(frozen=True)
-class ComparisonSpec:
-    label: str
-    baseline: QuerySpec
-    star: QuerySpec
-
-
-COMPARISONS: List[ComparisonSpec] = [
-    ComparisonSpec(
-        label="query1",
-        baseline=QuerySpec("baseline_query1", "1.1"),
-        star=QuerySpec("star_query1", "2.0"),
-    ),
-    ComparisonSpec(
-        label="query2",
-        baseline=QuerySpec("baseline_query2", "2.2"),
-        star=QuerySpec("star_query2", "1.0"),
-    ),
-    ComparisonSpec(
-        label="query3",
-        baseline=QuerySpec("baseline_query3", "1.0"),
-        star=QuerySpec("star_query3", "0.0"),
-    ),
-]
-
-
 def nearest_rank_percentile(sorted_values: List[float], p: int) -> float:
     """Excel-style nearest-rank percentile on a sorted list."""
     if not sorted_values:
@@ -59,78 +23,68 @@ def nearest_rank_percentile(sorted_values: List[float], p: int) -> float:
     return sorted_values[k]
 
 
-def get_launch_ids(
-    cur: sqlite3.Cursor, query_name: str, query_version: str, latest_only: bool
-) -> List[int]:
-    if latest_only:
-        row = cur.execute(
+def select_comparisons(cur: sqlite3.Cursor, comparison_ids: Optional[List[int]], latest_only: bool) -> List[Tuple[int, str]]:
+    """
+    (comparison_ID, label) of the comparisons to export: the given IDs, or
+    the latest comparison of every label (all of them without latest_only).
+    """
+    if comparison_ids:
+        placeholders = ",".join("?" * len(comparison_ids))
+        rows = cur.execute(
+            f"SELECT comparison_ID, label FROM Comparison WHERE comparison_ID IN ({placeholders}) ORDER BY comparison_ID;",
+            comparison_ids,
+        ).fetchall()
+        missing = set(comparison_ids) - {int(r[0]) for r in rows}
+        if missing:
+            raise ValueError(f"No comparison(s) with ID {sorted(missing)}")
+    elif latest_only:
+        rows = cur.execute(
+            """
+            SELECT MAX(comparison_ID), label
+            FROM Comparison
+            GROUP BY label
+            ORDER BY MAX(comparison_ID);
+            """
+        ).fetchall()
+    else:
+        rows = cur.execute("SELECT comparison_ID, label FROM Comparison ORDER BY comparison_ID;").fetchall()
+    if not rows:
+        raise ValueError("No comparisons found, run `ab` first.")
+    return [(int(r[0]), r[1]) for r in rows]
+
+
+def comparison_arms(cur: sqlite3.Cursor, comparison_id: int) -> List[Tuple[int, str, str]]:
+    """(launch_ID, query_name, query_version) of every arm, the baseline first."""
+    return [
+        (int(r[0]), r[1], r[2])
+        for r in cur.execute(
             """
-            SELECT launch_ID
+            SELECT launch_ID, query_name, query_version
             FROM QueryLaunch
-            WHERE query_name = ? AND query_version = ?
-            ORDER BY datetime(timestamp) DESC
-            LIMIT 1;
+            WHERE comparison_ID = ?
+            ORDER BY launch_ID;
             """,
-            (query_name, query_version),
-        ).fetchone()
-        if not row:
-            raise ValueError(f"No launches found for {query_name} v{query_version}")
-        return [int(row[0])]
+            (comparison_id,),
+        ).fetchall()
+    ]
 
-    rows = cur.execute(
-        """
-        SELECT launch_ID
-        FROM QueryLaunch
-        WHERE query_name = ? AND query_version = ?
-        ORDER BY datetime(timestamp) ASC;
-        """,
-        (query_name, query_version),
-    ).fetchall()
 
-    launch_ids = [int(r[0]) for r in rows]
-    if not launch_ids:
-        raise ValueError(f"No launches found for {query_name} v{query_version}")
-    return launch_ids
-
-
-def compute_percentiles_for_query(
-    cur: sqlite3.Cursor,
-    query_name: str,
-    query_version: str,
-    *,
-    latest_only: bool,
-) -> Tuple[Dict[int, Tuple[float, float]], int]:
-    """
-    Returns:
-      - per_size: {dataset_size: (p50, p95)}
-      - num_runs: total number of QueryResult rows included
-    """
-    launch_ids = get_launch_ids(cur, query_name, query_version, latest_only=latest_only)
-
-    placeholders = ",".join("?" * len(launch_ids))
+def runs_by_size_and_round(cur: sqlite3.Cursor, launch_id: int) -> Dict[int, Dict[int, float]]:
+    """{dataset_size: {round (run_index): elapsed_seconds}} of the successful runs of one arm."""
     rows = cur.execute(
-        f"""
-        SELECT dataset_size, elapsed_seconds
+        """
+        SELECT dataset_size, run_index, elapsed_seconds
         FROM QueryResult
-        WHERE launch_ID IN ({placeholders})
+        WHERE launch_ID = ?
+          AND status = 'ok'
           AND elapsed_seconds IS NOT NULL;
         """,
-        launch_ids,
+        (launch_id,),
     ).fetchall()
-
-    num_runs = len(rows)
-    by_size: Dict[int, List[float]] = defaultdict(list)
-    for ds, sec in rows:
-        by_size[int(ds)].append(float(sec))
-
-    per_size: Dict[int, Tuple[float, float]] = {}
-    for ds, vals in by_size.items():
-        vals_sorted = sorted(vals)
-        p50 = statistics.median(vals_sorted)
-        p95 = nearest_rank_percentile(vals_sorted, 95)
-        per_size[ds] = (p50, p95)
-
-    return per_size, num_runs
+    by_size: Dict[int, Dict[int, float]] = defaultdict(dict)
+    for ds, run_index, sec in rows:
+        by_size[int(ds)][int(run_index)] = float(sec)
+    return by_size
 
 
 def fmt_float(x: Optional[float]) -> str:
@@ -139,70 +93,81 @@ def fmt_float(x: Optional[float]) -> str:
     return f"{x:.6f}"
 
 
-def export_csv(out_path: str, dataset_sizes: List[int], latest_only: bool) -> None:
+def export_csv(
+    out_path: str,
+    comparison_ids: Optional[List[int]],
+    dataset_sizes: Optional[List[int]],
+    latest_only: bool,
+) -> None:
+    """
+    One row per (comparison, dataset size, arm): P50/P95 of the arm and, for
+    every arm but the baseline, the median of its paired per-round ratios
+    against the baseline (run i of both arms ran in the same round).
+    """
     con = get_database_connection()
     try:
         cur = con.cursor()
+        comparisons = select_comparisons(cur, comparison_ids, latest_only)
 
         with open(out_path, "w", newline="") as f:
             w = csv.writer(f)
 
             w.writerow(
                 [
+                    "comparison_ID",
                     "comparison",
                     "dataset_size",
-                    "baseline_name",
-                    "baseline_version",
-                    "baseline_p50_s",
-                    "baseline_p95_s",
-                    "baseline_num_runs",
-                    "star_name",
-                    "star_version",
-                    "star_p50_s",
-                    "star_p95_s",
-                    "star_num_runs",
+                    "arm",
+                    "query_name",
+                    "query_version",
+                    "p50_s",
+                    "p95_s",
+                    "num_runs",
+                    "paired_rounds",
+                    "paired_p50_ratio",
                 ]
             )
 
-            for comp in COMPARISONS:
-                base_map, base_runs = compute_percentiles_for_query(
-                    cur,
-                    comp.baseline.name,
-                    comp.baseline.version,
-                    latest_only=latest_only,
-                )
-                star_map, star_runs = compute_percentiles_for_query(
-                    cur,
-                    comp.star.name,
-                    comp.star.version,
-                    latest_only=latest_only,
-                )
-
-                for ds in dataset_sizes:
-                    base_p50, base_p95 = base_map.get(ds, (float("nan"), float("nan")))
-                    star_p50, star_p95 = star_map.get(ds, (float("nan"), float("nan")))
-
-                    w.writerow(
-                        [
-                            comp.label,
-                            ds,
-                            comp.baseline.name,
-                            comp.baseline.version,
-                            fmt_float(base_p50),
-                            fmt_float(base_p95),
-                            base_runs,
-                            comp.star.name,
-                            comp.star.version,
-                            fmt_float(star_p50),
-                            fmt_float(star_p95),
-                            star_runs,
+            for comparison_id, label in comparisons:
+                arms = comparison_arms(cur, comparison_id)
+                arm_runs = [runs_by_size_and_round(cur, launch_id) for launch_id, _, _ in arms]
+                sizes = sorted({ds for runs in arm_runs for ds in runs})
+                if dataset_sizes:
+                    sizes = [ds for ds in sizes if ds in dataset_sizes]
+
+                for ds in sizes:
+                    base = arm_runs[0].get(ds, {})
+                    for arm, ((_, name, version), runs) in enumerate(zip(arms, arm_runs)):
+                        by_round = runs.get(ds, {})
+                        vals_sorted = sorted(by_round.values())
+                        p50 = statistics.median(vals_sorted) if vals_sorted else float("nan")
+                        p95 = nearest_rank_percentile(vals_sorted, 95)
+
+                        ratios = [] if arm == 0 else [
+                            sec / base[r] for r, sec in by_round.items() if base.get(r)
                         ]
-                    )
+                        paired_ratio = statistics.median(ratios) if ratios else float("nan")
+
+                        w.writerow(
+                            [
+                                comparison_id,
+                                label,
+                                ds,
+                                arm,
+                                name,
+                                version,
+                                fmt_float(p50),
+                                fmt_float(p95),
+                                len(vals_sorted),
+                                len(ratios) if arm else "",
+                                fmt_float(paired_ratio),
+                            ]
+                        )
 
         print(f"Wrote {out_path}")
-        mode = "latest launch only" if latest_only else "all launches"
-        print(f"Mode: {mode}")
-        print(f"Dataset sizes: {dataset_sizes}")
+        print(f"Comparisons: {', '.join(f'{cid} ({label})' for cid, label in comparisons)}")
+        if dataset_sizes:
+            print(f"Dataset sizes: {dataset_sizes}")
 
     finally:
         con.close()
@@ -210,7 +175,7 @@ def export_csv(out_path: str, dataset_sizes: List[int], latest_only: bool) -> No
 
 def parse_args() -> argparse.Namespace:
     p = argparse.ArgumentParser(
-        description="Export P50/P95 results for baseline vs star query comparisons to CSV."
+        description="Export P50/P95 and paired ratios of interleaved A/B comparisons (see execute.ab) to CSV."
     )
     p.add_argument(
         "--out",
@@ -218,23 +183,28 @@ def parse_args() -> argparse.Namespace:
         help="Output CSV path (default: results_table_data.csv)",
     )
     p.add_argument(
-        "--all-launches",
-        action="store_false",
-        help="Aggregate over all launches instead of only the latest launch per query/version",
+        "--comparisons",
+        default=None,
+        help="Comma-separated comparison IDs to export (default: the latest comparison of every label)",
+    )
+    p.add_argument(
+        "--all-comparisons",
+        action="store_true",
+        help="Export every stored comparison instead of only the latest per label",
     )
     p.add_argument(
         "--sizes",
-        default=",".join(str(x) for x in DEFAULT_DATASET_SIZES),
-        help="Comma-separated dataset sizes to include",
+        default=None,
+        help="Comma-separated dataset sizes to include (default: every size the comparison ran)",
     )
     return p.parse_args()
 
 
 def main() -> None:
     args = parse_args()
-    sizes = [int(s.strip()) for s in args.sizes.split(",") if s.strip()]
-    latest_only = not args.all_launches
-    export_csv(args.out, sizes, latest_only=latest_only)
+    comparison_ids = [int(c.strip()) for c in args.comparisons.split(",") if c.strip()] if args.comparisons else None
+    sizes = [int(s.strip()) for s in args.sizes.split(",") if s.strip()] if args.sizes else None
+    export_csv(args.out, comparison_ids, sizes, latest_only=not args.all_comparisons)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,176 @@
+"""
+Scaling models of latency (or VM steps) vs dataset size.
+
+Each P50 / P95 curve of a query version is fitted to a few growth models with
+scipy.optimize.curve_fit, and the model with the lowest AICc is taken as the
+best fit. Fits minimize relative rather than absolute residuals, so the small
+dataset sizes count as much as the large ones. Confidence bands of a fit come
+from its parameter covariance (delta method), which is what makes the
+predictions at sizes that were never run honest about their uncertainty.
+"""
+import math
+import warnings
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy.optimize import OptimizeWarning, curve_fit
+
+
+def _linear(n, a, b):
+    return a + b * n
+
+
+def _n_log_n(n, a, b):
+    return a + b * n * np.log(n)
+
+
+def _power(n, a, k):
+    return a * np.power(n, k)
+
+
+# model name -> (function of (n, *params), formula shown in reports)
+SCALING_MODELS: Dict[str, Tuple[Callable, str]] = {
+    "linear": (_linear, "a + b*n"),
+    "n log n": (_n_log_n, "a + b*n*log(n)"),
+    "power": (_power, "a*n^k"),
+}
+
+# two-sided normal quantile of the confidence bands
+Z_95 = 1.959964
+
+
+@dataclass
+class ScalingFit:
+    model: str
+    params: np.ndarray
+    cov: np.ndarray
+    aicc: float
+    num_points: int
+
+    def predict(self, sizes: Sequence[float]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(estimate, band low, band high) of the fitted curve at `sizes`, 95% band."""
+        func, _ = SCALING_MODELS[self.model]
+        n = np.asarray(sizes, dtype=float)
+        y = func(n, *self.params)
+        # numerical gradient of the curve w.r.t. every parameter
+        grads = []
+        for i, p in enumerate(self.params):
+            step = 1e-6 * max(abs(p), 1e-12)
+            shifted = self.params.copy()
+            shifted[i] = p + step
+            grads.append((func(n, *shifted) - y) / step)
+        J = np.stack(grads, axis=-1)
+        var = np.einsum("...i,ij,...j->...", J, self.cov, J)
+        # band on log(y), so it stays positive and symmetric on log-log axes
+        rel = Z_95 * np.sqrt(np.clip(var, 0.0, None)) / np.abs(y)
+        return y, y * np.exp(-rel), y * np.exp(rel)
+
+
+def _initial_guess(model: str, n: np.ndarray, y: np.ndarray) -> List[float]:
+    if model == "power":
+        k, log_a = np.polyfit(np.log(n), np.log(y), 1)
+        return [float(math.exp(log_a)), float(k)]
+    x = n if model == "linear" else n * np.log(n)
+    b, a = np.polyfit(x, y, 1)
+    return [float(a), float(b)]
+
+
+def fit_model(model: str, sizes: Sequence[int], values: Sequence[float]) -> Optional[ScalingFit]:
+    """Fit one model of SCALING_MODELS, or None when it does not converge."""
+    func, _ = SCALING_MODELS[model]
+    n = np.asarray(sizes, dtype=float)
+    y = np.asarray(values, dtype=float)
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", OptimizeWarning)
+            params, cov = curve_fit(
+                func, n, y, p0=_initial_guess(model, n, y), sigma=y, maxfev=10000
+            )
+    except (RuntimeError, ValueError, np.linalg.LinAlgError):
+        return None
+    if not np.all(np.isfinite(cov)):
+        return None
+
+    # AIC of a least-squares fit on the relative residuals, small-sample corrected
+    k = len(params)
+    rss = float(np.sum(((y - func(n, *params)) / y) ** 2))
+    aic = len(n) * math.log(max(rss, 1e-300) / len(n)) + 2 * k
+    if len(n) - k - 1 > 0:
+        aic += 2 * k * (k + 1) / (len(n) - k - 1)
+    return ScalingFit(model=model, params=params, cov=cov, aicc=aic, num_points=len(n))
+
+
+def fit_scaling_models(sizes: Sequence[int], values: Sequence[float]) -> Dict[str, ScalingFit]:
+    """
+    Every model of SCALING_MODELS that could be fitted, by name. Needs at least
+    three dataset sizes with positive values.
+    """
+    points = [(s, v) for s, v in zip(sizes, values) if s > 0 and v > 0]
+    if len(points) < 3:
+        return {}
+    n, y = zip(*points)
+    fits = {}
+    for model in SCALING_MODELS:
+        fit = fit_model(model, n, y)
+        if fit is not None:
+            fits[model] = fit
+    return fits
+
+
+@dataclass
+class ScalingRow:
+    """One line of the scaling report: a percentile curve of a query version."""
+    query_name: str
+    query_version: str
+    percentile: str
+    best: Optional[ScalingFit]
+    # power-law exponent k with its 95% interval, whatever the best model is
+    exponent: Optional[Tuple[float, float, float]] = None
+    # dataset size -> (estimate, band low, band high) from the best fit
+    predictions: Dict[int, Tuple[float, float, float]] = field(default_factory=dict)
+    aicc: Dict[str, float] = field(default_factory=dict)
+
+
+def scaling_row(
+    query_name: str,
+    query_version: str,
+    percentile: str,
+    sizes: Sequence[int],
+    values: Sequence[float],
+    predict_at: Sequence[int],
+) -> ScalingRow:
+    """Fit one percentile curve and predict it at predict_at with its best model."""
+    fits = fit_scaling_models(sizes, values)
+    row = ScalingRow(query_name, query_version, percentile, best=None)
+    if not fits:
+        return row
+    row.aicc = {name: fit.aicc for name, fit in fits.items()}
+    row.best = min(fits.values(), key=lambda f: f.aicc)
+    if "power" in fits:
+        k = float(fits["power"].params[1])
+        half = Z_95 * math.sqrt(max(float(fits["power"].cov[1, 1]), 0.0))
+        row.exponent = (k, k - half, k + half)
+    y, low, high = row.best.predict(predict_at)
+    row.predictions = {int(s): (float(e), float(l), float(h)) for s, e, l, h in zip(predict_at, y, low, high)}
+    return row
+
+
+def format_scaling_table(rows: List[ScalingRow], unit: str = "s") -> List[str]:
+    """Plain-text table of the best model, exponent and predictions of every row."""
+    sizes = sorted({s for r in rows for s in r.predictions})
+    header = f"{'query':<28} {'pct':<4} {'best model':<16} {'exponent k (95% CI)':<24}"
+    header += "".join(f" {'@' + f'{s:,}':<30}" for s in sizes)
+    lines = [header, "-" * len(header)]
+    for r in rows:
+        label = f"{r.query_name} v{r.query_version}"
+        if r.best is None:
+            lines.append(f"{label:<28} {r.percentile:<4} no fit (fewer than 3 sizes, or no model converged)")
+            continue
+        exponent = f"{r.exponent[0]:.3f} [{r.exponent[1]:.3f}, {r.exponent[2]:.3f}]" if r.exponent else "-"
+        line = f"{label:<28} {r.percentile:<4} {SCALING_MODELS[r.best.model][1]:<16} {exponent:<24}"
+        for s in sizes:
+            est, low, high = r.predictions[s]
+            line += f" {f'{est:.4g}{unit} [{low:.3g}, {high:.3g}]':<30}"
+        lines.append(line)
+    return lines
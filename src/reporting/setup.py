@@ -11,11 +11,25 @@ from app import AppConfig
 SCHEMA_SQL = """
 PRAGMA foreign_keys = ON;
 
+CREATE TABLE IF NOT EXISTS Comparison (
+    comparison_ID  INTEGER PRIMARY KEY,
+    timestamp      TEXT NOT NULL,
+    label          TEXT NOT NULL,
+    seed           INTEGER NOT NULL,
+    settings       TEXT
+);
+
 CREATE TABLE IF NOT EXISTS QueryLaunch (
     launch_ID      INTEGER PRIMARY KEY,
     timestamp      TEXT NOT NULL,
     query_name     TEXT NOT NULL,
-    query_version  TEXT NOT NULL
+    query_version  TEXT NOT NULL,
+    cache_mode     TEXT NOT NULL DEFAULT 'warm',
+    dataset_sizes  TEXT,
+    settings       TEXT,
+    pragma_profile TEXT,
+    launch_type    TEXT NOT NULL DEFAULT 'benchmark',
+    comparison_ID  INTEGER REFERENCES Comparison(comparison_ID) ON DELETE SET NULL
 );
 
 CREATE TABLE IF NOT EXISTS QueryResult (
@@ -24,6 +38,9 @@ CREATE TABLE IF NOT EXISTS QueryResult (
     dataset_size     INTEGER NOT NULL,
     run_index        INTEGER NOT NULL,
     elapsed_seconds  REAL,
+    vm_steps         INTEGER,
+    status           TEXT NOT NULL DEFAULT 'ok',
+    cell_hash        TEXT,
     FOREIGN KEY (launch_ID) REFERENCES QueryLaunch(launch_ID)
         ON UPDATE CASCADE
         ON DELETE CASCADE
@@ -31,8 +48,137 @@ CREATE TABLE IF NOT EXISTS QueryResult (
 
 CREATE INDEX IF NOT EXISTS idx_QueryResult_launch_ID
 ON QueryResult(launch_ID);
+
+CREATE TABLE IF NOT EXISTS QueryStepResult (
+    step_ID          INTEGER PRIMARY KEY,
+    result_ID        INTEGER NOT NULL,
+    sql_file         TEXT NOT NULL,
+    statement_index  INTEGER NOT NULL,
+    elapsed_seconds  REAL,
+    rows             INTEGER,
+    approx_bytes     INTEGER,
+    vm_steps         INTEGER,
+    UNIQUE (result_ID, sql_file, statement_index),
+    FOREIGN KEY (result_ID) REFERENCES QueryResult(result_ID)
+        ON UPDATE CASCADE
+        ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS QueryResultResource (
+    result_ID                 INTEGER PRIMARY KEY,
+    user_cpu_seconds          REAL,
+    sys_cpu_seconds           REAL,
+    minor_faults              INTEGER,
+    major_faults              INTEGER,
+    voluntary_ctx_switches    INTEGER,
+    involuntary_ctx_switches  INTEGER,
+    read_bytes                INTEGER,
+    write_bytes               INTEGER,
+    read_chars                INTEGER,
+    write_chars               INTEGER,
+    peak_rss_bytes            INTEGER,
+    FOREIGN KEY (result_ID) REFERENCES QueryResult(result_ID)
+        ON UPDATE CASCADE
+        ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS QueryCellStats (
+    cell_stats_ID    INTEGER PRIMARY KEY,
+    launch_ID        INTEGER NOT NULL,
+    dataset_size     INTEGER NOT NULL,
+    runs             INTEGER NOT NULL,
+    outliers         INTEGER NOT NULL DEFAULT 0,
+    p50              REAL,
+    p50_ci_low       REAL,
+    p50_ci_high      REAL,
+    p95              REAL,
+    p95_ci_low       REAL,
+    p95_ci_high      REAL,
+    converged        INTEGER,
+    UNIQUE (launch_ID, dataset_size),
+    FOREIGN KEY (launch_ID) REFERENCES QueryLaunch(launch_ID)
+        ON UPDATE CASCADE
+        ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS QueryPlan (
+    plan_ID          INTEGER PRIMARY KEY,
+    launch_ID        INTEGER NOT NULL,
+    query_name       TEXT NOT NULL,
+    query_version    TEXT NOT NULL,
+    sql_file         TEXT NOT NULL,
+    statement_index  INTEGER NOT NULL,
+    plan_json        TEXT NOT NULL,
+    UNIQUE (launch_ID, sql_file, statement_index),
+    FOREIGN KEY (launch_ID) REFERENCES QueryLaunch(launch_ID)
+        ON UPDATE CASCADE
+        ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS LoadTestResult (
+    load_result_ID   INTEGER PRIMARY KEY,
+    launch_ID        INTEGER NOT NULL,
+    dataset_size     INTEGER NOT NULL,
+    clients          INTEGER NOT NULL,
+    client_mode      TEXT NOT NULL,
+    duration_seconds REAL NOT NULL,
+    requests         INTEGER NOT NULL,
+    errors           INTEGER NOT NULL DEFAULT 0,
+    timeouts         INTEGER NOT NULL DEFAULT 0,
+    qps              REAL,
+    p50              REAL,
+    p95              REAL,
+    p99              REAL,
+    max_latency      REAL,
+    UNIQUE (launch_ID, dataset_size, clients),
+    FOREIGN KEY (launch_ID) REFERENCES QueryLaunch(launch_ID)
+        ON UPDATE CASCADE
+        ON DELETE CASCADE
+);
 """.strip()
 
+# Columns added after a table was first released. CREATE TABLE IF NOT EXISTS
+# leaves existing databases alone, so these are ALTERed in when missing.
+COLUMN_MIGRATIONS = {
+    "QueryLaunch": [
+        ("cache_mode", "TEXT NOT NULL DEFAULT 'warm'"),
+        ("dataset_sizes", "TEXT"),  # JSON list
+        ("settings", "TEXT"),  # JSON object
+        ("pragma_profile", "TEXT"),
+        ("launch_type", "TEXT NOT NULL DEFAULT 'benchmark'"),
+        ("comparison_ID", "INTEGER REFERENCES Comparison(comparison_ID) ON DELETE SET NULL"),
+    ],
+    "QueryResult": [
+        ("vm_steps", "INTEGER"),
+        ("status", "TEXT NOT NULL DEFAULT 'ok'"),
+        ("cell_hash", "TEXT"),
+    ],
+    "QueryStepResult": [
+        ("vm_steps", "INTEGER"),
+    ],
+}
+
+# Indexes on migrated columns; created after COLUMN_MIGRATIONS has run.
+INDEX_MIGRATIONS = [
+    "CREATE INDEX IF NOT EXISTS idx_QueryLaunch_comparison_ID ON QueryLaunch(comparison_ID);",
+    "CREATE INDEX IF NOT EXISTS idx_QueryResult_cell_hash ON QueryResult(cell_hash);",
+]
+
+
+def _apply_schema(con: sqlite3.Connection) -> None:
+    """Create missing tables and add missing columns (idempotent)."""
+    cur = con.cursor()
+    for stmt in [s.strip() for s in SCHEMA_SQL.split(";") if s.strip()]:
+        cur.execute(stmt + ";")
+    for table, columns in COLUMN_MIGRATIONS.items():
+        existing = {row[1] for row in cur.execute(f'PRAGMA table_info("{table}");')}
+        for name, decl in columns:
+            if name not in existing:
+                cur.execute(f'ALTER TABLE "{table}" ADD COLUMN {name} {decl};')
+    for stmt in INDEX_MIGRATIONS:
+        cur.execute(stmt)
+    con.commit()
+
 
 def setup_database() -> Tuple[str, bool]:
     """
@@ -55,11 +201,7 @@ def setup_database() -> Tuple[str, bool]:
     # Connect (this will create the file if it doesn't exist)
     con = sqlite3.connect(str(path))
     try:
-        cur = con.cursor()
-        # Apply schema (idempotent)
-        for stmt in [s.strip() for s in SCHEMA_SQL.split(";") if s.strip()]:
-            cur.execute(stmt + ";")
-        con.commit()
+        _apply_schema(con)
     finally:
         con.close()
 
@@ -72,6 +214,12 @@ def get_database_connection() -> sqlite3.Connection:
         setup_database()
 
     con = sqlite3.connect(str(path))
+    # WAL lets plots read the database while a launch is still writing to it,
+    # and NORMAL only syncs at checkpoints instead of on every commit
+    con.execute("PRAGMA journal_mode=WAL;")
+    con.execute("PRAGMA synchronous=NORMAL;")
+    # older result databases may miss columns added since they were created
+    _apply_schema(con)
     return con
 
 if __name__ == "__main__":
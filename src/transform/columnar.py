@@ -0,0 +1,338 @@
+"""
+Columnar store of the baseline tables the NumPy engine reads (execute.columnar).
+
+Every exported table is a folder of per-column .npy files under
+AppConfig.columnar_dir, opened memory-mapped, so a run only pages in the
+columns and ranges it touches. Columns are SQL expressions over the source
+table, evaluated by SQLite at export time; with the CASTs of the benchmark SQL
+in them, the engine sees exactly the values the SQL versions compute with.
+Rows keep the source rowid order, so "the first n rows that match" means the
+same as a LIMIT in the SQL versions.
+
+Column kinds:
+  number -> float64 (CAST(... AS REAL) of the expression), NULL as NaN
+  text   -> int32 codes into a per-column dictionary (<column>.dict.npy),
+            NULL as -1. Everything the pipelines read as text is
+            low-cardinality (subgroup / assessment names, Y/N flags, entity
+            names), so predicates run once per distinct value.
+  key    -> int32 codes into the store-wide ENTITY_CD dictionary
+            (entity_cd.dict.npy), NULL as -1. Codes mean the same entity in
+            every table, so group-bys and joins work on integers. The
+            dictionary only ever grows, so re-exporting one table keeps the
+            codes of the others valid.
+
+manifest.json records the source file (size, mtime) and column list every
+table was exported from; ensure_columnar_tables re-exports a table whenever
+either differs.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app import AppConfig
+from app.datasets import DataLink, ENROLLMENT_23_24, REPORT_CARD_23_24, STUDENT_EDUCATOR_DATABASE_23_24
+from app.events import configure_events, emit, flush_events
+from load.convert_to_sqlite import get_datalink_sqlite_path
+
+NUMBER = "number"
+TEXT = "text"
+KEY = "key"
+COLUMN_KINDS = (NUMBER, TEXT, KEY)
+
+# bumped whenever the file layout changes, so old exports are redone
+COLUMNAR_FORMAT = 1
+KEY_DICTIONARY = "entity_cd"
+MANIFEST = "manifest.json"
+
+
+@dataclass(frozen=True)
+class ColumnarTable:
+    name: str
+    dataset: DataLink
+    source: str  # table in the dataset
+    columns: Tuple[Tuple[str, str, str], ...]  # (column, SQL expression, kind)
+
+
+COLUMNAR_TABLES: Dict[str, ColumnarTable] = {
+    table.name: table
+    for table in (
+        ColumnarTable(
+            "math",
+            REPORT_CARD_23_24,
+            "Annual EM MATH",
+            (
+                ("entity_cd", "ENTITY_CD", KEY),
+                ("year", "YEAR", NUMBER),
+                ("subgroup_name", "SUBGROUP_NAME", TEXT),
+                ("assessment_name", "ASSESSMENT_NAME", TEXT),
+                # baseline_query2 / 3: SUM(CAST(x AS REAL))
+                ("num_prof", "CAST(NUM_PROF AS REAL)", NUMBER),
+                ("total_count", "CAST(TOTAL_COUNT AS REAL)", NUMBER),
+                # baseline_query1: SUM(CAST(NULLIF(REPLACE(x, ',', ''), '') AS INTEGER))
+                ("num_prof_int", "CAST(NULLIF(REPLACE(NUM_PROF, ',', ''), '') AS INTEGER)", NUMBER),
+                ("num_tested_int", "CAST(NULLIF(REPLACE(NUM_TESTED, ',', ''), '') AS INTEGER)", NUMBER),
+            ),
+        ),
+        ColumnarTable(
+            "attendance",
+            STUDENT_EDUCATOR_DATABASE_23_24,
+            "Attendance",
+            (
+                ("entity_cd", "ENTITY_CD", KEY),
+                ("entity_name", "ENTITY_NAME", TEXT),
+                ("year", "YEAR", NUMBER),
+                ("attendance_rate", "ATTENDANCE_RATE", NUMBER),
+            ),
+        ),
+        ColumnarTable(
+            "expenditure",
+            REPORT_CARD_23_24,
+            "Expenditures per Pupil",
+            (
+                ("entity_cd", "ENTITY_CD", KEY),
+                ("entity_name", "ENTITY_NAME", TEXT),
+                ("year", "YEAR", NUMBER),
+                ("data_reported_exp", "DATA_REPORTED_EXP", TEXT),
+                ("data_reported_enr", "DATA_REPORTED_ENR", TEXT),
+                ("per_pupil", "PER_FED_STATE_LOCAL_EXP", NUMBER),
+            ),
+        ),
+        ColumnarTable(
+            "demographics",
+            ENROLLMENT_23_24,
+            "Demographic Factors",
+            (("entity_cd", "ENTITY_CD", KEY), ("year", "YEAR", NUMBER))
+            + tuple(
+                (column.lower(), column, NUMBER)
+                for column in ("PER_ELL", "PER_SWD", "PER_ECDIS", "PER_BLACK", "PER_HISP", "PER_ASIAN", "PER_WHITE")
+            ),
+        ),
+    )
+}
+
+
+def _load(path: Path) -> np.ndarray:
+    try:
+        return np.load(path, mmap_mode="r")
+    except ValueError:  # an empty array cannot be memory-mapped
+        return np.load(path)
+
+
+class ColumnStore:
+    """
+    Read side of the store. Arrays are memory-mapped on first use and kept
+    for the life of the object; a new ColumnStore starts cold (re-opened
+    mappings, the OS page cache is not touched).
+    """
+
+    def __init__(self, root: Optional[Path] = None) -> None:
+        self.root = Path(root or AppConfig.columnar_dir)
+        self._arrays: Dict[Path, np.ndarray] = {}
+
+    def _array(self, path: Path) -> np.ndarray:
+        array = self._arrays.get(path)
+        if array is None:
+            array = self._arrays[path] = _load(path)
+        return array
+
+    def number(self, table: str, column: str) -> np.ndarray:
+        return self._array(self.root / table / f"{column}.npy")
+
+    def codes(self, table: str, column: str) -> np.ndarray:
+        """int32 codes of a text or key column, -1 for NULL."""
+        return self._array(self.root / table / f"{column}.npy")
+
+    def dictionary(self, table: str, column: str) -> np.ndarray:
+        """The values behind the codes of a text column."""
+        return self._array(self.root / table / f"{column}.dict.npy")
+
+    def key_dictionary(self) -> np.ndarray:
+        return self._array(self.root / f"{KEY_DICTIONARY}.dict.npy")
+
+    def rows(self, table: str) -> int:
+        return len(self.number(table, COLUMNAR_TABLES[table].columns[0][0]))
+
+    def files(self, tables: Iterable[str]) -> List[Path]:
+        """Every file of these tables, for evicting them from the OS page cache."""
+        paths = [self.root / f"{KEY_DICTIONARY}.dict.npy"]
+        for table in tables:
+            paths.extend(sorted((self.root / table).glob("*.npy")))
+        return paths
+
+
+def _read_manifest(root: Path) -> Dict:
+    path = root / MANIFEST
+    if not path.exists():
+        return {"format": COLUMNAR_FORMAT, "tables": {}}
+    manifest = json.loads(path.read_text(encoding="utf-8"))
+    if manifest.get("format") != COLUMNAR_FORMAT:
+        return {"format": COLUMNAR_FORMAT, "tables": {}}
+    return manifest
+
+
+def _write_manifest(root: Path, manifest: Dict) -> None:
+    tmp = root / (MANIFEST + ".partial")
+    tmp.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    os.replace(tmp, root / MANIFEST)
+
+
+def _source_entry(table: ColumnarTable, source_path: Path) -> Dict:
+    st = source_path.stat()
+    return {
+        "source": str(source_path),
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "columns": [list(c) for c in table.columns],
+    }
+
+
+def _save(path: Path, array: np.ndarray) -> None:
+    tmp = path.with_name(path.name + ".partial")
+    with open(tmp, "wb") as f:
+        np.save(f, array, allow_pickle=False)
+    os.replace(tmp, path)
+
+
+def _encode(values: List, mapping: Dict[str, int]) -> np.ndarray:
+    """Codes of values in mapping, adding unseen values at the end; None -> -1."""
+    codes = np.empty(len(values), dtype=np.int32)
+    for i, value in enumerate(values):
+        if value is None:
+            codes[i] = -1
+        else:
+            value = str(value)
+            code = mapping.get(value)
+            if code is None:
+                code = mapping[value] = len(mapping)
+            codes[i] = code
+    return codes
+
+
+def _dictionary_array(mapping: Dict[str, int]) -> np.ndarray:
+    return np.array(list(mapping), dtype=str) if mapping else np.array([], dtype="<U1")
+
+
+def export_table(
+    table: ColumnarTable,
+    source_path: Path,
+    root: Optional[Path] = None,
+    batch_size: int = 100_000,
+) -> int:
+    """Export one table into the store, returns its rows. The manifest is left to the caller."""
+    root = Path(root or AppConfig.columnar_dir)
+    out_dir = root / table.name
+    out_dir.mkdir(parents=True, exist_ok=True)
+    key_path = root / f"{KEY_DICTIONARY}.dict.npy"
+    key_mapping = {str(v): i for i, v in enumerate(np.load(key_path))} if key_path.exists() else {}
+    text_mappings: Dict[str, Dict[str, int]] = {name: {} for name, _, kind in table.columns if kind == TEXT}
+
+    chunks: Dict[str, List[np.ndarray]] = {name: [] for name, _, _ in table.columns}
+    select = ", ".join(f"CAST({expr} AS REAL)" if kind == NUMBER else expr for _, expr, kind in table.columns)
+    conn = sqlite3.connect(f"file:{source_path.as_posix()}?mode=ro", uri=True)
+    try:
+        cur = conn.execute(f'SELECT {select} FROM "{table.source}" ORDER BY rowid;')
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            for (name, _, kind), values in zip(table.columns, zip(*rows)):
+                if kind == NUMBER:
+                    chunks[name].append(np.array(values, dtype=np.float64))
+                elif kind == KEY:
+                    chunks[name].append(_encode(values, key_mapping))
+                else:
+                    chunks[name].append(_encode(values, text_mappings[name]))
+    finally:
+        conn.close()
+
+    rows = 0
+    for name, _, kind in table.columns:
+        dtype = np.float64 if kind == NUMBER else np.int32
+        column = np.concatenate(chunks[name]) if chunks[name] else np.empty(0, dtype=dtype)
+        rows = len(column)
+        _save(out_dir / f"{name}.npy", column)
+        if kind == TEXT:
+            _save(out_dir / f"{name}.dict.npy", _dictionary_array(text_mappings[name]))
+    _save(key_path, _dictionary_array(key_mapping))
+    return rows
+
+
+def ensure_columnar_tables(
+    names: Iterable[str],
+    root: Optional[Path] = None,
+    source_paths: Optional[Dict[DataLink, Path]] = None,
+    force: bool = False,
+) -> List[str]:
+    """
+    Export the named tables whose source changed since their last export (or
+    all of them with force). source_paths maps datasets to their SQLite files,
+    get_datalink_sqlite_path by default; they must exist. Returns the names
+    of the exported tables.
+    """
+    root = Path(root or AppConfig.columnar_dir)
+    root.mkdir(parents=True, exist_ok=True)
+    manifest = _read_manifest(root)
+    exported = []
+    for name in names:
+        if name not in COLUMNAR_TABLES:
+            raise ValueError(f"Unknown columnar table {name!r}, expected one of {sorted(COLUMNAR_TABLES)}")
+        table = COLUMNAR_TABLES[name]
+        source_path = Path((source_paths or {}).get(table.dataset) or get_datalink_sqlite_path(table.dataset))
+        if not source_path.exists():
+            raise FileNotFoundError(f"Baseline SQLite for {table.dataset.folder_name} not found at {source_path}.")
+        entry = _source_entry(table, source_path)
+        current = manifest["tables"].get(name)
+        if not force and current is not None and {k: current.get(k) for k in entry} == entry:
+            continue
+        started = time.perf_counter()
+        rows = export_table(table, source_path, root)
+        seconds = time.perf_counter() - started
+        manifest["tables"][name] = dict(entry, rows=rows, exported_at=time.strftime("%Y-%m-%d %H:%M:%S"))
+        _write_manifest(root, manifest)
+        exported.append(name)
+        emit(
+            "columnar.export",
+            f"[COLUMNAR] {name} <- {table.dataset.folder_name}.{table.source}: {rows:,} rows, "
+            f"{len(table.columns)} columns in {seconds:.2f}s",
+            table=name,
+            rows=rows,
+            seconds=seconds,
+        )
+    return exported
+
+
+def export_columnar_cli() -> None:
+    """
+    CLI entry point for export_columnar.
+
+    Example:
+        export_columnar
+        export_columnar --tables math,attendance --force
+    """
+    parser = argparse.ArgumentParser(description="Export the baseline columns the NumPy engine reads into .npy files.")
+    parser.add_argument(
+        "--tables",
+        type=lambda s: [x.strip() for x in s.split(",") if x.strip()],
+        default=list(COLUMNAR_TABLES),
+        help=f"Comma-separated tables to export (default: all of {', '.join(COLUMNAR_TABLES)})",
+    )
+    parser.add_argument("--force", action="store_true", help="Export even when the source did not change")
+    args = parser.parse_args()
+
+    exec_config = AppConfig.load_execution_config()
+    configure_events(exec_config.event_sinks, exec_config.event_log_path)
+    try:
+        exported = ensure_columnar_tables(args.tables, force=args.force)
+        if not exported:
+            emit("columnar.export", f"[COLUMNAR] {AppConfig.columnar_dir} is up to date")
+    except (FileNotFoundError, ValueError) as e:
+        parser.error(str(e))
+    finally:
+        flush_events()
@@ -0,0 +1,764 @@
+"""
+Star schema ETL.
+
+Builds data/star/star_schema.db (STAR_DATASET, used by the star_query* specs)
+from the baseline SQLite files in AppConfig.baseline_dir:
+
+  fact_assessment  <- report card "Annual EM MATH" / "Annual EM ELA"
+                      (one partition per subject)
+  fact_attendance  <- student / educator "Attendance" (all students)
+  dim_school, dim_year, dim_subject, dim_subgroup
+                   <- every key value the fact rows use
+
+Source rows are streamed with fetchmany and get their surrogate keys from
+in-memory dicts, so every source table is read once and no lookup touches
+the database. Fact rows are written with executemany in large batches inside
+one transaction, and the dimension tables after the facts.
+
+build_star_schema builds from scratch: indexes are only created once
+everything is loaded and ANALYZE runs last. The database is built under a
+.partial name and renamed at the end, so a failed build never leaves a
+half-built schema that looks finished.
+
+refresh_star_schema updates an existing build. Every source table (a
+StarPartition) has a row count and a sha256 of the rows it contributes in
+etl_manifest; only partitions whose count or checksum changed are reloaded.
+Their rows are staged in a temp table and upserted into the fact table by
+natural key (school, year, subject, subgroup, assessment), rows that left the
+source are deleted. The dimensions are rebuilt from every partition's rows
+in full-build order (they are read for the checksums anyway), upserted by
+key and pruned of keys no fact uses any more, so a refresh ends with the
+same dimension rows as a full build. Indexes are kept and maintained by the upserts unless a
+partition replaces most of its table, and only the touched tables are
+re-ANALYZEd. The whole refresh is one transaction.
+"""
+import argparse
+import hashlib
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app import AppConfig
+from app.datasets import DataLink, REPORT_CARD_23_24, STUDENT_EDUCATOR_DATABASE_23_24
+from app.events import configure_events, emit, flush_events
+from load.convert_to_sqlite import get_datalink_sqlite_path
+
+# baseline datasets the star schema is built from
+STAR_SOURCES = (REPORT_CARD_23_24, STUDENT_EDUCATOR_DATABASE_23_24)
+
+
+@dataclass(frozen=True)
+class StarPartition:
+    """One source table and the slice of a fact table loaded from it."""
+
+    dataset: DataLink
+    table: str
+    fact: str
+    subject: Optional[Tuple[str, str]] = None  # (subject_id, subject_name) of an assessment table
+
+    @property
+    def name(self) -> str:
+        return f"{self.dataset.folder_name}.{self.table}"
+
+
+STAR_PARTITIONS = (
+    StarPartition(REPORT_CARD_23_24, "Annual EM MATH", "fact_assessment", ("Math", "Mathematics")),
+    StarPartition(REPORT_CARD_23_24, "Annual EM ELA", "fact_assessment", ("ELA", "English Language Arts")),
+    StarPartition(STUDENT_EDUCATOR_DATABASE_23_24, "Attendance", "fact_attendance"),
+)
+
+# SUBGROUP_NAME of the sources -> short subgroup_id the star queries filter on;
+# names not listed keep their name as id
+SUBGROUP_IDS = {
+    "All Students": "All",
+    "English Language Learner": "ELL",
+    "Students with Disabilities": "SWD",
+    "Economically Disadvantaged": "ED",
+    "Black or African American": "Black",
+    "Hispanic or Latino": "Hispanic",
+    "Asian or Native Hawaiian/Other Pacific Islander": "Asian_NHPI",
+    "White": "White",
+}
+ALL_STUDENTS = "All Students"
+
+STAR_SCHEMA_SQL = """
+CREATE TABLE dim_school (
+    school_key      INTEGER PRIMARY KEY,
+    school_id       TEXT NOT NULL,  -- ENTITY_CD of the sources
+    school_name     TEXT,
+    institution_id  TEXT
+);
+
+CREATE TABLE dim_year (
+    year_key           INTEGER PRIMARY KEY,  -- the YEAR of the sources, e.g. 2024 for 2023-24
+    school_year_label  TEXT NOT NULL
+);
+
+CREATE TABLE dim_subject (
+    subject_key   INTEGER PRIMARY KEY,
+    subject_id    TEXT NOT NULL,
+    subject_name  TEXT NOT NULL
+);
+
+CREATE TABLE dim_subgroup (
+    subgroup_key   INTEGER PRIMARY KEY,
+    subgroup_id    TEXT NOT NULL,
+    subgroup_name  TEXT NOT NULL
+);
+
+CREATE TABLE fact_assessment (
+    year_key         INTEGER NOT NULL,
+    school_key       INTEGER NOT NULL,
+    subject_key      INTEGER NOT NULL,
+    subgroup_key     INTEGER NOT NULL,
+    assessment_name  TEXT NOT NULL,
+    total_count      INTEGER,
+    tested           INTEGER,
+    n_qual           INTEGER  -- students scoring proficient (NUM_PROF)
+);
+
+CREATE TABLE fact_attendance (
+    year_key         INTEGER NOT NULL,
+    school_key       INTEGER NOT NULL,
+    subgroup_key     INTEGER NOT NULL,
+    attendance_rate  REAL,
+    absence_rate     REAL,
+    enrollment       INTEGER  -- weight of the rate; 1 when the source has no count
+);
+
+-- one row per StarPartition, see refresh_star_schema
+CREATE TABLE etl_manifest (
+    partition_name  TEXT PRIMARY KEY,  -- <dataset folder>.<source table>
+    fact_table      TEXT NOT NULL,
+    row_count       INTEGER NOT NULL,
+    checksum        TEXT NOT NULL,     -- sha256 of the source rows read
+    loaded_at       TEXT NOT NULL
+);
+"""
+
+STAR_COLUMNS = {
+    "fact_assessment": (
+        "year_key", "school_key", "subject_key", "subgroup_key", "assessment_name", "total_count", "tested", "n_qual",
+    ),
+    "fact_attendance": ("year_key", "school_key", "subgroup_key", "attendance_rate", "absence_rate", "enrollment"),
+    "dim_school": ("school_key", "school_id", "school_name", "institution_id"),
+    "dim_year": ("year_key", "school_year_label"),
+    "dim_subject": ("subject_key", "subject_id", "subject_name"),
+    "dim_subgroup": ("subgroup_key", "subgroup_id", "subgroup_name"),
+    "etl_manifest": ("partition_name", "fact_table", "row_count", "checksum", "loaded_at"),
+}
+
+# natural key of every table, the conflict target of the refresh upserts
+NATURAL_KEYS = {
+    "fact_assessment": ("school_key", "year_key", "subject_key", "subgroup_key", "assessment_name"),
+    "fact_attendance": ("school_key", "year_key", "subgroup_key"),
+    "dim_school": ("school_key",),
+    "dim_year": ("year_key",),
+    "dim_subject": ("subject_key",),
+    "dim_subgroup": ("subgroup_key",),
+    "etl_manifest": ("partition_name",),
+}
+
+# (name, table, columns, unique); a full build creates them after the load
+STAR_INDEXES = (
+    ("ux_dim_school_school_id", "dim_school", "school_id", True),
+    ("ux_dim_subject_subject_id", "dim_subject", "subject_id", True),
+    ("ix_dim_subject_subject_name", "dim_subject", "subject_name", False),
+    ("ux_dim_subgroup_subgroup_name", "dim_subgroup", "subgroup_name", True),
+    ("ix_dim_subgroup_subgroup_id", "dim_subgroup", "subgroup_id", False),
+    # natural keys; they lead with school_key, so they also serve joins from dim_school
+    ("ux_fact_assessment_natural", "fact_assessment", ", ".join(NATURAL_KEYS["fact_assessment"]), True),
+    ("ux_fact_attendance_natural", "fact_attendance", ", ".join(NATURAL_KEYS["fact_attendance"]), True),
+    ("ix_fact_assessment_filter", "fact_assessment", "year_key, subject_key, subgroup_key, school_key", False),
+    ("ix_fact_attendance_filter", "fact_attendance", "year_key, subgroup_key, school_key", False),
+)
+
+FACT_TABLES = ("fact_assessment", "fact_attendance")
+STAR_TABLES = FACT_TABLES + ("dim_school", "dim_year", "dim_subject", "dim_subgroup")
+
+# a refreshed partition staging more rows than this share of its fact table
+# drops the table's secondary indexes and recreates them after the upsert
+REBUILD_INDEX_SHARE = 0.5
+
+
+@dataclass
+class TableLoad:
+    table: str
+    rows: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else float("inf")
+
+
+@dataclass
+class PartitionRefresh:
+    partition: str
+    rows: int      # rows staged from the source
+    written: int   # rows inserted or updated in the fact table
+    deleted: int   # rows no longer in the source
+    seconds: float
+
+
+class KeyMap:
+    """
+    Surrogate keys of one dimension. Keys already in the star schema are
+    passed in as existing; new natural keys get the next free key. rows holds
+    the dimension row of every key used by this load, in order of first use.
+    """
+
+    def __init__(self, existing: Optional[Dict[object, int]] = None) -> None:
+        self.existing: Dict[object, int] = existing or {}
+        self.used: Dict[object, int] = {}
+        self.rows: List[tuple] = []
+        self.next_key = max(self.existing.values(), default=0) + 1
+
+    def key(self, natural_key: object, *attributes) -> int:
+        key = self.used.get(natural_key)
+        if key is not None:
+            return key
+        key = self.existing.get(natural_key)
+        if key is None:
+            key = self.next_key
+            self.next_key += 1
+        self.used[natural_key] = key
+        self.rows.append((key,) + attributes)
+        return key
+
+
+class SourceDigest:
+    """Row count and sha256 of the rows a partition reads from its source."""
+
+    def __init__(self, sql: str) -> None:
+        self.rows = 0
+        self._hash = hashlib.sha256(sql.encode("utf-8"))
+
+    def update(self, row: tuple) -> None:
+        self.rows += 1
+        self._hash.update(repr(row).encode("utf-8"))
+        self._hash.update(b"\n")
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+
+def _int_or_none(value) -> Optional[int]:
+    """Counts are TEXT in the converted Access tables, with thousands separators and 's' for suppressed."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    text = str(value).replace(",", "").strip()
+    try:
+        return int(float(text))
+    except ValueError:
+        return None
+
+
+def _float_or_none(value) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return float(str(value).replace(",", "").replace("%", "").strip())
+    except ValueError:
+        return None
+
+
+def _columns(conn: sqlite3.Connection, schema: str, table: str) -> List[str]:
+    return [row[1] for row in conn.execute(f'PRAGMA "{schema}".table_info("{table}");')]
+
+
+def _stream(conn: sqlite3.Connection, sql: str, batch_size: int) -> Iterator[tuple]:
+    cur = conn.execute(sql)
+    while True:
+        rows = cur.fetchmany(batch_size)
+        if not rows:
+            return
+        yield from rows
+
+
+def _insert_batches(conn: sqlite3.Connection, sql: str, rows: Iterable[tuple], batch_size: int) -> int:
+    """executemany in batches of batch_size; returns the rows inserted."""
+    total = 0
+    batch: List[tuple] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            conn.executemany(sql, batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        conn.executemany(sql, batch)
+        total += len(batch)
+    return total
+
+
+def _insert_sql(table: str, into: Optional[str] = None) -> str:
+    columns = STAR_COLUMNS[table]
+    return f"INSERT INTO {into or table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+
+
+def _upsert_sql(table: str, source: Optional[str] = None) -> str:
+    """
+    INSERT of a table's rows that updates the row with the same natural key
+    instead, and only when a value differs. source is a SELECT over the table
+    columns; without it the rows are bound as parameters.
+    """
+    columns = STAR_COLUMNS[table]
+    conflict = NATURAL_KEYS[table]
+    updates = [c for c in columns if c not in conflict]
+    # "WHERE true" keeps SQLite from parsing ON CONFLICT as a join constraint of the SELECT
+    values = f"{source} WHERE true" if source else f"VALUES ({', '.join('?' * len(columns))})"
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) {values} ON CONFLICT({', '.join(conflict)}) DO "
+    if not updates:
+        return sql + "NOTHING"
+    return (
+        sql
+        + "UPDATE SET "
+        + ", ".join(f"{c} = excluded.{c}" for c in updates)
+        + " WHERE "
+        + " OR ".join(f"{c} IS NOT excluded.{c}" for c in updates)
+    )
+
+
+def _create_indexes(conn: sqlite3.Connection, tables: Iterable[str], secondary_only: bool = False) -> None:
+    tables = set(tables)
+    for name, table, columns, unique in STAR_INDEXES:
+        if table in tables and not (secondary_only and unique):
+            conn.execute(f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {name} ON {table}({columns});")
+
+
+def _drop_secondary_indexes(conn: sqlite3.Connection, table: str) -> None:
+    """Drop the non-unique indexes of a table; the unique ones are the upsert conflict targets."""
+    for name, index_table, _, unique in STAR_INDEXES:
+        if index_table == table and not unique:
+            conn.execute(f"DROP INDEX IF EXISTS {name};")
+
+
+def _drop_duplicates(conn: sqlite3.Connection, table: str) -> int:
+    """Keep the last loaded row of every natural key, so the unique indexes can be built."""
+    natural_key = ", ".join(NATURAL_KEYS[table])
+    cur = conn.execute(
+        f"DELETE FROM {table} WHERE rowid NOT IN (SELECT max(rowid) FROM {table} GROUP BY {natural_key});"
+    )
+    return cur.rowcount
+
+
+class StarSchemaBuilder:
+    """One load of the star schema into an open connection with the sources attached under their folder names."""
+
+    def __init__(self, conn: sqlite3.Connection, batch_size: int) -> None:
+        self.conn = conn
+        self.batch_size = batch_size
+        self.schools = KeyMap()
+        self.subjects = KeyMap()
+        self.subgroups = KeyMap()
+        self.years: Dict[int, tuple] = {}
+        self.digests: Dict[str, SourceDigest] = {}
+
+    def use_existing_keys(self) -> None:
+        """Continue the surrogate keys of the star schema the connection is on (refresh)."""
+        self.schools = KeyMap(dict(self.conn.execute("SELECT school_id, school_key FROM dim_school;")))
+        self.subjects = KeyMap(dict(self.conn.execute("SELECT subject_id, subject_key FROM dim_subject;")))
+        self.subgroups = KeyMap(dict(self.conn.execute("SELECT subgroup_name, subgroup_key FROM dim_subgroup;")))
+
+    def school_key(self, entity_cd, entity_name, institution_id=None) -> int:
+        school_id = str(entity_cd).strip()
+        return self.schools.key(school_id, school_id, entity_name, institution_id)
+
+    def year_key(self, year) -> int:
+        year = int(float(year))
+        if year not in self.years:
+            self.years[year] = (year, str(year))
+        return year
+
+    def subject_key(self, partition: StarPartition) -> int:
+        subject_id, subject_name = partition.subject
+        return self.subjects.key(subject_id, subject_id, subject_name)
+
+    def subgroup_key(self, subgroup_name) -> int:
+        name = str(subgroup_name).strip()
+        return self.subgroups.key(name, SUBGROUP_IDS.get(name, name), name)
+
+    def source_sql(self, partition: StarPartition) -> Optional[str]:
+        """The SELECT a partition reads from its source, None when the source table is missing."""
+        schema = partition.dataset.folder_name
+        columns = _columns(self.conn, schema, partition.table)
+        if not columns:
+            return None
+        source = f'"{schema}"."{partition.table}"'
+        if partition.fact == "fact_assessment":
+            institution = "INSTITUTION_ID" if "INSTITUTION_ID" in columns else "NULL"
+            return (
+                f"SELECT ENTITY_CD, ENTITY_NAME, {institution}, YEAR, SUBGROUP_NAME, COALESCE(ASSESSMENT_NAME, ''), "
+                f"TOTAL_COUNT, NUM_TESTED, NUM_PROF FROM {source} "
+                "WHERE ENTITY_CD IS NOT NULL AND YEAR IS NOT NULL AND SUBGROUP_NAME IS NOT NULL"
+            )
+        enrollment = next((c for c in ("ENROLLMENT", "TOTAL_ENROLLMENT", "NUM_STUDENTS") if c in columns), "NULL")
+        return (
+            f"SELECT ENTITY_CD, ENTITY_NAME, YEAR, ATTENDANCE_RATE, {enrollment} FROM {source} "
+            "WHERE ENTITY_CD IS NOT NULL AND YEAR IS NOT NULL"
+        )
+
+    def digest(self, partition: StarPartition) -> Optional[SourceDigest]:
+        """
+        Row count and checksum of a partition's source without loading it,
+        None when the source is missing. The dimension keys of its rows are
+        registered like in a load, so digesting every partition in
+        STAR_PARTITIONS order gives the dimension rows of a full build.
+        """
+        if self.source_sql(partition) is None:
+            return None
+        for _ in self.partition_rows(partition):
+            pass
+        return self.digests[partition.name]
+
+    def partition_rows(self, partition: StarPartition) -> Iterator[tuple]:
+        """Fact rows of a partition; the digest of what was read ends up in self.digests."""
+        sql = self.source_sql(partition)
+        if sql is None:
+            emit("transform.skip", f"[STAR] {partition.name} not found, skipping it", level="warn")
+            return
+        digest = self.digests[partition.name] = SourceDigest(sql)
+        if partition.subject is not None:
+            subject_key = self.subject_key(partition)
+            for row in _stream(self.conn, sql, self.batch_size):
+                digest.update(row)
+                entity_cd, name, institution_id, year, subgroup, assessment, total, tested, prof = row
+                yield (
+                    self.year_key(year),
+                    self.school_key(entity_cd, name, institution_id),
+                    subject_key,
+                    self.subgroup_key(subgroup),
+                    assessment,
+                    _int_or_none(total),
+                    _int_or_none(tested),
+                    _int_or_none(prof),
+                )
+            return
+        all_students = self.subgroup_key(ALL_STUDENTS)
+        for row in _stream(self.conn, sql, self.batch_size):
+            digest.update(row)
+            entity_cd, name, year, attendance_rate, count = row
+            rate = _float_or_none(attendance_rate)
+            weight = _int_or_none(count)
+            yield (
+                self.year_key(year),
+                self.school_key(entity_cd, name),
+                all_students,
+                rate,
+                100.0 - rate if rate is not None else None,
+                weight if weight is not None else 1,
+            )
+
+    def dimension_rows(self) -> Dict[str, List[tuple]]:
+        """Rows of every dimension key this load used."""
+        return {
+            "dim_school": self.schools.rows,
+            "dim_year": list(self.years.values()),
+            "dim_subject": self.subjects.rows,
+            "dim_subgroup": self.subgroups.rows,
+        }
+
+    def write_manifest(self) -> None:
+        loaded_at = time.strftime("%Y-%m-%d %H:%M:%S")
+        rows = [
+            (p.name, p.fact, self.digests[p.name].rows, self.digests[p.name].hexdigest(), loaded_at)
+            for p in STAR_PARTITIONS
+            if p.name in self.digests
+        ]
+        self.conn.executemany(_upsert_sql("etl_manifest"), rows)
+
+    def load(self) -> List[TableLoad]:
+        """Full load into the empty tables, facts first."""
+        loads = []
+        for fact in FACT_TABLES:
+            rows = (row for p in STAR_PARTITIONS if p.fact == fact for row in self.partition_rows(p))
+            loads.append(self._timed_insert(fact, rows))
+        for table, rows in self.dimension_rows().items():
+            loads.append(self._timed_insert(table, rows))
+        self.write_manifest()
+        return loads
+
+    def _timed_insert(self, table: str, rows: Iterable[tuple]) -> TableLoad:
+        started = time.perf_counter()
+        count = _insert_batches(self.conn, _insert_sql(table), rows, self.batch_size)
+        load = TableLoad(table, count, time.perf_counter() - started)
+        emit(
+            "transform.table",
+            f"[STAR] {table}: {load.rows:,} rows in {load.seconds:.2f}s ({load.rows_per_second:,.0f} rows/s)",
+            table=table,
+            rows=load.rows,
+            seconds=load.seconds,
+        )
+        return load
+
+    def refresh_partition(self, partition: StarPartition) -> PartitionRefresh:
+        """Stage a partition's rows, upsert them into its fact table and delete the rows that left the source."""
+        started = time.perf_counter()
+        fact = partition.fact
+        natural_key = ", ".join(NATURAL_KEYS[fact])
+        self.conn.execute("DROP TABLE IF EXISTS temp.star_stage;")
+        self.conn.execute(f"CREATE TEMP TABLE star_stage AS SELECT * FROM main.{fact} WHERE 0;")
+        staged = _insert_batches(
+            self.conn, _insert_sql(fact, into="temp.star_stage"), self.partition_rows(partition), self.batch_size
+        )
+
+        table_rows = self.conn.execute(f"SELECT count(*) FROM main.{fact};").fetchone()[0]
+        rebuild_indexes = staged > REBUILD_INDEX_SHARE * table_rows
+        if rebuild_indexes:
+            _drop_secondary_indexes(self.conn, fact)
+
+        changes = self.conn.total_changes
+        self.conn.execute(_upsert_sql(fact, f"SELECT {', '.join(STAR_COLUMNS[fact])} FROM temp.star_stage"))
+        written = self.conn.total_changes - changes
+        if partition.subject is not None:
+            where, params = "subject_key = ?", (self.subject_key(partition),)
+        else:
+            where, params = "1", ()
+        deleted = self.conn.execute(
+            f"DELETE FROM main.{fact} WHERE {where} "
+            f"AND ({natural_key}) NOT IN (SELECT {natural_key} FROM temp.star_stage);",
+            params,
+        ).rowcount
+        self.conn.execute("DROP TABLE temp.star_stage;")
+
+        if rebuild_indexes:
+            _create_indexes(self.conn, (fact,), secondary_only=True)
+        refresh = PartitionRefresh(partition.name, staged, written, deleted, time.perf_counter() - started)
+        emit(
+            "transform.partition",
+            f"[STAR] {partition.name} -> {fact}: {staged:,} rows, {written:,} written, {deleted:,} deleted "
+            f"in {refresh.seconds:.2f}s{' (indexes rebuilt)' if rebuild_indexes else ''}",
+            partition=partition.name,
+            table=fact,
+            rows=staged,
+            written=written,
+            deleted=deleted,
+            seconds=refresh.seconds,
+        )
+        return refresh
+
+    def upsert_dimensions(self) -> List[str]:
+        """
+        Upsert the dimension rows this load used and delete the keys it did
+        not use; returns the dimensions that changed. Only correct after
+        every partition was read (see digest), the dimensions then equal
+        those of a full build.
+        """
+        changed = []
+        for table, rows in self.dimension_rows().items():
+            changes = self.conn.total_changes
+            self.conn.executemany(_upsert_sql(table), rows)
+            key = NATURAL_KEYS[table][0]
+            used = {row[0] for row in rows}
+            stale = [(k,) for (k,) in self.conn.execute(f"SELECT {key} FROM main.{table};") if k not in used]
+            self.conn.executemany(f"DELETE FROM main.{table} WHERE {key} = ?;", stale)
+            if self.conn.total_changes > changes:
+                changed.append(table)
+        return changed
+
+
+def _source_paths(source_paths: Optional[Dict[DataLink, Path]]) -> Dict[DataLink, Path]:
+    source_paths = source_paths or {dl: get_datalink_sqlite_path(dl) for dl in STAR_SOURCES}
+    for dl in STAR_SOURCES:
+        if not Path(source_paths[dl]).exists():
+            raise FileNotFoundError(
+                f"Baseline SQLite for {dl.folder_name} not found at {source_paths[dl]}; convert it first (see load.convert_to_sqlite)."
+            )
+    return source_paths
+
+
+def _attach_sources(conn: sqlite3.Connection, source_paths: Dict[DataLink, Path]) -> None:
+    for dl in STAR_SOURCES:
+        conn.execute("ATTACH DATABASE ? AS ?;", (str(source_paths[dl]), dl.folder_name))
+
+
+def _detach_sources(conn: sqlite3.Connection) -> None:
+    for dl in STAR_SOURCES:
+        conn.execute("DETACH DATABASE ?;", (dl.folder_name,))
+
+
+def build_star_schema(
+    out_path: Optional[Path] = None,
+    source_paths: Optional[Dict[DataLink, Path]] = None,
+    batch_size: int = 50_000,
+) -> List[TableLoad]:
+    """
+    Build the star schema at out_path (AppConfig.star_schema_db by default)
+    from the STAR_SOURCES baseline files (get_datalink_sqlite_path by default,
+    they must exist). An existing star schema is replaced. Returns the load
+    of every table.
+    """
+    out_path = Path(out_path or AppConfig.star_schema_db)
+    source_paths = _source_paths(source_paths)
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    partial = out_path.with_name(out_path.name + ".partial")
+    partial.unlink(missing_ok=True)
+    emit("transform.start", f"[STAR] building {out_path} from {', '.join(dl.folder_name for dl in STAR_SOURCES)}")
+    started = time.perf_counter()
+
+    conn = sqlite3.connect(str(partial), isolation_level=None)
+    try:
+        # a fresh file nobody else reads: no journal, no fsync, large page cache
+        conn.execute("PRAGMA journal_mode=OFF;")
+        conn.execute("PRAGMA synchronous=OFF;")
+        conn.execute("PRAGMA cache_size=-262144;")
+        conn.execute("PRAGMA temp_store=MEMORY;")
+        _attach_sources(conn, source_paths)
+
+        conn.executescript(STAR_SCHEMA_SQL)
+        conn.execute("BEGIN;")
+        loads = StarSchemaBuilder(conn, batch_size).load()
+        conn.execute("COMMIT;")
+        _detach_sources(conn)
+
+        index_started = time.perf_counter()
+        for fact in FACT_TABLES:
+            duplicates = _drop_duplicates(conn, fact)
+            if duplicates:
+                emit(
+                    "transform.duplicates",
+                    f"[STAR] {fact}: dropped {duplicates:,} rows with a duplicate natural key",
+                    level="warn",
+                )
+        _create_indexes(conn, STAR_TABLES)
+        conn.execute("ANALYZE;")
+        emit("transform.index", f"[STAR] indexes + ANALYZE in {time.perf_counter() - index_started:.2f}s")
+    finally:
+        conn.close()
+    partial.replace(out_path)
+
+    total_rows = sum(load.rows for load in loads)
+    seconds = time.perf_counter() - started
+    emit(
+        "transform.done",
+        f"[STAR] {out_path}: {total_rows:,} rows in {seconds:.2f}s ({total_rows / seconds if seconds else 0:,.0f} rows/s)",
+        path=str(out_path),
+        rows=total_rows,
+        seconds=seconds,
+    )
+    return loads
+
+
+def _has_manifest(path: Path) -> bool:
+    conn = sqlite3.connect(str(path))
+    try:
+        row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'etl_manifest';").fetchone()
+        return row is not None
+    finally:
+        conn.close()
+
+
+def refresh_star_schema(
+    out_path: Optional[Path] = None,
+    source_paths: Optional[Dict[DataLink, Path]] = None,
+    batch_size: int = 50_000,
+) -> List[str]:
+    """
+    Bring the star schema at out_path up to date with its sources, reloading
+    only the partitions whose source row count or checksum differs from
+    etl_manifest (see the module docstring). Without a star schema, or with
+    one built before the manifest existed, this is a full build_star_schema.
+    Returns the names of the reloaded partitions.
+    """
+    out_path = Path(out_path or AppConfig.star_schema_db)
+    source_paths = _source_paths(source_paths)
+    if not out_path.exists() or not _has_manifest(out_path):
+        build_star_schema(out_path, source_paths, batch_size)
+        return [p.name for p in STAR_PARTITIONS]
+
+    started = time.perf_counter()
+    conn = sqlite3.connect(str(out_path), isolation_level=None)
+    try:
+        # unlike a fresh build this file is in use: keep the journal so a failed refresh rolls back
+        conn.execute("PRAGMA synchronous=NORMAL;")
+        conn.execute("PRAGMA cache_size=-262144;")
+        conn.execute("PRAGMA temp_store=MEMORY;")
+        _attach_sources(conn, source_paths)
+
+        builder = StarSchemaBuilder(conn, batch_size)
+        builder.use_existing_keys()
+        manifest = {
+            name: (row_count, checksum)
+            for name, row_count, checksum in conn.execute("SELECT partition_name, row_count, checksum FROM etl_manifest;")
+        }
+        changed = []
+        for partition in STAR_PARTITIONS:
+            digest = builder.digest(partition)
+            if digest is not None and manifest.get(partition.name) != (digest.rows, digest.hexdigest()):
+                changed.append(partition)
+        if not changed:
+            emit(
+                "transform.done",
+                f"[STAR] {out_path} is up to date (checked in {time.perf_counter() - started:.2f}s)",
+                path=str(out_path),
+                partitions=[],
+            )
+            return []
+        emit("transform.start", f"[STAR] refreshing {out_path}: {', '.join(p.name for p in changed)} changed")
+
+        conn.execute("BEGIN IMMEDIATE;")
+        try:
+            refreshes = [builder.refresh_partition(p) for p in changed]
+            changed_dims = builder.upsert_dimensions()
+            builder.write_manifest()
+            conn.execute("COMMIT;")
+        except BaseException:
+            conn.execute("ROLLBACK;")
+            raise
+        _detach_sources(conn)
+
+        analyze_started = time.perf_counter()
+        touched = sorted({p.fact for p, r in zip(changed, refreshes) if r.written or r.deleted} | set(changed_dims))
+        for table in touched:
+            conn.execute(f"ANALYZE main.{table};")
+        if touched:
+            emit("transform.index", f"[STAR] ANALYZE {', '.join(touched)} in {time.perf_counter() - analyze_started:.2f}s")
+    finally:
+        conn.close()
+
+    seconds = time.perf_counter() - started
+    emit(
+        "transform.done",
+        f"[STAR] {out_path}: {len(refreshes)} partition(s) refreshed, {sum(r.written for r in refreshes):,} rows written, "
+        f"{sum(r.deleted for r in refreshes):,} deleted in {seconds:.2f}s",
+        path=str(out_path),
+        partitions=[r.partition for r in refreshes],
+        seconds=seconds,
+    )
+    return [r.partition for r in refreshes]
+
+
+def build_star_schema_cli() -> None:
+    """
+    CLI entry point for build_star.
+
+    Example:
+        build_star
+        build_star --full --batch-size 100000
+    """
+    parser = argparse.ArgumentParser(
+        description="Build the star schema database from the baseline SQLite files, "
+        "or refresh the partitions whose source tables changed."
+    )
+    parser.add_argument("--out", default=AppConfig.star_schema_db, help=f"Output path (default: {AppConfig.star_schema_db})")
+    parser.add_argument("--batch-size", type=int, default=50_000, help="Rows per executemany batch (default: 50000)")
+    parser.add_argument("--full", action="store_true", help="Rebuild everything instead of refreshing changed partitions")
+    args = parser.parse_args()
+
+    exec_config = AppConfig.load_execution_config()
+    configure_events(exec_config.event_sinks, exec_config.event_log_path)
+    try:
+        if args.full:
+            build_star_schema(Path(args.out), batch_size=args.batch_size)
+        else:
+            refresh_star_schema(Path(args.out), batch_size=args.batch_size)
+    except FileNotFoundError as e:
+        parser.error(str(e))
+    finally:
+        flush_events()
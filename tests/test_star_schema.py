@@ -0,0 +1,98 @@
+"""A refresh of the star schema must end with the same rows as a full build."""
+import sqlite3
+
+from app.datasets import REPORT_CARD_23_24, STUDENT_EDUCATOR_DATABASE_23_24
+from app.events import configure_events
+from transform.star_schema import build_star_schema, refresh_star_schema
+
+ASSESSMENT_COLUMNS = (
+    "ENTITY_CD", "ENTITY_NAME", "INSTITUTION_ID", "YEAR", "SUBGROUP_NAME",
+    "ASSESSMENT_NAME", "TOTAL_COUNT", "NUM_TESTED", "NUM_PROF",
+)
+ATTENDANCE_COLUMNS = ("ENTITY_CD", "ENTITY_NAME", "YEAR", "ATTENDANCE_RATE", "ENROLLMENT")
+
+MATH_ROWS = [
+    ("0101", "Lincoln Elementary", "800001", "2024", "All Students", "MATH3", "40", "38", "20"),
+    ("0101", "Lincoln Elementary", "800001", "2024", "White", "MATH3", "12", "12", "7"),
+    ("0202", "Roosevelt Middle", "800002", "2024", "All Students", "MATH7", "90", "85", "41"),
+]
+ELA_ROWS = [
+    ("0101", "Lincoln Elementary", "800001", "2024", "All Students", "ELA3", "40", "39", "25"),
+    ("0303", "Jefferson High", "800003", "2024", "Economically Disadvantaged", "ELA8", "15", "15", "6"),
+]
+# attendance spells the names differently and has no INSTITUTION_ID
+ATTENDANCE_ROWS = [
+    ("0101", "LINCOLN ELEM", "2024", "95.1", "310"),
+    ("0202", "ROOSEVELT MS", "2024", "93.4", "540"),
+    ("0404", "WASHINGTON ACADEMY", "2024", "91.0", "120"),
+]
+
+
+def _write_table(path, table, columns, rows):
+    conn = sqlite3.connect(str(path))
+    conn.execute(f'DROP TABLE IF EXISTS "{table}";')
+    conn.execute(f'CREATE TABLE "{table}" ({", ".join(f"{c} TEXT" for c in columns)});')
+    conn.executemany(f'INSERT INTO "{table}" VALUES ({", ".join("?" * len(columns))});', rows)
+    conn.commit()
+    conn.close()
+
+
+def _sources(tmp_path, attendance_rows, math_rows=MATH_ROWS):
+    report_card = tmp_path / "report_card.db"
+    student_educator = tmp_path / "student_educator.db"
+    _write_table(report_card, "Annual EM MATH", ASSESSMENT_COLUMNS, math_rows)
+    _write_table(report_card, "Annual EM ELA", ASSESSMENT_COLUMNS, ELA_ROWS)
+    _write_table(student_educator, "Attendance", ATTENDANCE_COLUMNS, attendance_rows)
+    return {REPORT_CARD_23_24: report_card, STUDENT_EDUCATOR_DATABASE_23_24: student_educator}
+
+
+def _contents(path):
+    """Every table by natural values; surrogate keys may differ between a build and a refresh."""
+    conn = sqlite3.connect(str(path))
+    try:
+        return {
+            "dim_school": conn.execute(
+                "SELECT school_id, school_name, institution_id FROM dim_school ORDER BY 1;"
+            ).fetchall(),
+            "dim_year": conn.execute("SELECT year_key, school_year_label FROM dim_year ORDER BY 1;").fetchall(),
+            "dim_subject": conn.execute("SELECT subject_id, subject_name FROM dim_subject ORDER BY 1;").fetchall(),
+            "dim_subgroup": conn.execute("SELECT subgroup_id, subgroup_name FROM dim_subgroup ORDER BY 2;").fetchall(),
+            "fact_assessment": conn.execute(
+                "SELECT s.school_id, f.year_key, j.subject_id, g.subgroup_name, f.assessment_name, "
+                "f.total_count, f.tested, f.n_qual FROM fact_assessment f "
+                "JOIN dim_school s USING (school_key) JOIN dim_subject j USING (subject_key) "
+                "JOIN dim_subgroup g USING (subgroup_key) ORDER BY 1, 2, 3, 4, 5;"
+            ).fetchall(),
+            "fact_attendance": conn.execute(
+                "SELECT s.school_id, f.year_key, g.subgroup_name, f.attendance_rate, f.absence_rate, f.enrollment "
+                "FROM fact_attendance f JOIN dim_school s USING (school_key) "
+                "JOIN dim_subgroup g USING (subgroup_key) ORDER BY 1, 2, 3;"
+            ).fetchall(),
+        }
+    finally:
+        conn.close()
+
+
+def test_refresh_equals_full_build(tmp_path):
+    configure_events(["silent"])
+    (tmp_path / "before").mkdir()
+    sources = _sources(tmp_path / "before", ATTENDANCE_ROWS)
+    refreshed = tmp_path / "refreshed.db"
+    build_star_schema(refreshed, sources)
+
+    # one rate changes, a school leaves the math table and another one leaves attendance
+    (tmp_path / "after").mkdir()
+    attendance = [ATTENDANCE_ROWS[0][:3] + ("96.0",) + ATTENDANCE_ROWS[0][4:], ATTENDANCE_ROWS[1]]
+    sources = _sources(tmp_path / "after", attendance, math_rows=MATH_ROWS[:2])
+    assert refresh_star_schema(refreshed, sources) == [
+        f"{REPORT_CARD_23_24.folder_name}.Annual EM MATH",
+        f"{STUDENT_EDUCATOR_DATABASE_23_24.folder_name}.Attendance",
+    ]
+
+    built = tmp_path / "built.db"
+    build_star_schema(built, sources)
+    expected = _contents(built)
+    assert _contents(refreshed) == expected
+    # the report card attributes win, like in a full build
+    assert ("0101", "Lincoln Elementary", "800001") in expected["dim_school"]
+    assert refresh_star_schema(refreshed, sources) == []